@@ -0,0 +1,132 @@
+import heapq
+import threading
+from collections import defaultdict
+
+import cache
+import db
+
+# ---------------------- Room Allocator ----------------------
+# Free rooms are indexed by (building, floor) with None as a wildcard, and
+# inside each key bucketed by number of free slots.  Room capacities are
+# small, so a lookup walks a handful of buckets instead of every room.
+# Rooms with the fewest free slots are offered first, which fills partly
+# occupied rooms before opening empty ones.
+
+
+class RoomAllocator:
+    def __init__(self, rooms=()):
+        self._rooms = {}                                        # id -> (building_id, floor, free)
+        self._index = defaultdict(lambda: defaultdict(set))     # key -> free -> {room ids}
+        self._lock = threading.Lock()
+        for room in rooms:
+            self._rooms[room["id"]] = (room["building_id"], room["floor"], room["free"])
+            self._add(room["id"])
+
+    @classmethod
+    def load(cls):
+        # Served by the index on room.free_slots instead of a full scan
+        with db.cursor() as cursor:
+            cursor.execute(
+                "SELECT id, building_id, floor, free_slots AS free FROM room WHERE free_slots > 0"
+            )
+            return cls(cursor.fetchall())
+
+    @staticmethod
+    def _keys(building_id, floor):
+        return ((building_id, floor), (building_id, None), (None, floor), (None, None))
+
+    def _add(self, room_id):
+        building_id, floor, free = self._rooms[room_id]
+        if free > 0:
+            for key in self._keys(building_id, floor):
+                self._index[key][free].add(room_id)
+
+    def _remove(self, room_id):
+        building_id, floor, free = self._rooms[room_id]
+        if free > 0:
+            for key in self._keys(building_id, floor):
+                buckets = self._index[key]
+                buckets[free].discard(room_id)
+                if not buckets[free]:
+                    del buckets[free]
+                if not buckets:
+                    del self._index[key]
+
+    def _search_order(self, building_id, floor):
+        order = [(building_id, floor), (building_id, None), (None, floor), (None, None)]
+        return list(dict.fromkeys(order))
+
+    def _room(self, room_id):
+        building_id, floor, free = self._rooms[room_id]
+        return {"id": room_id, "building_id": building_id, "floor": floor, "free": free}
+
+    def candidates(self, building_id=None, floor=None, limit=20):
+        # Best rooms first: exact building+floor, then same building, then
+        # same floor anywhere, then any room.
+        found = []
+        with self._lock:
+            for key in self._search_order(building_id, floor):
+                buckets = self._index.get(key)
+                if not buckets:
+                    continue
+                for free in sorted(buckets):
+                    for room_id in heapq.nsmallest(limit + len(found), buckets[free]):
+                        if room_id not in found:
+                            found.append(room_id)
+                        if len(found) >= limit:
+                            return [self._room(r) for r in found]
+            return [self._room(r) for r in found]
+
+    def best_room(self, building_id=None, floor=None):
+        rooms = self.candidates(building_id, floor, limit=1)
+        return rooms[0] if rooms else None
+
+    def free_slots(self, room_id):
+        room = self._rooms.get(room_id)
+        return room[2] if room else 0
+
+    def reserve(self, room_id, slots=1):
+        with self._lock:
+            if self.free_slots(room_id) < slots:
+                return False
+            self._remove(room_id)
+            building_id, floor, free = self._rooms[room_id]
+            self._rooms[room_id] = (building_id, floor, free - slots)
+            self._add(room_id)
+            return True
+
+    def release(self, room_id, slots=1):
+        with self._lock:
+            if room_id not in self._rooms:
+                return
+            self._remove(room_id)
+            building_id, floor, free = self._rooms[room_id]
+            self._rooms[room_id] = (building_id, floor, free + slots)
+            self._add(room_id)
+
+    def assign(self, students):
+        # Batch auto-assignment.  Each student dict may carry room_id (an
+        # explicit request), building_id and floor (preferences).  Returns
+        # [(student, room_id or None)] in input order and reserves the slots.
+        assigned = []
+        for student in students:
+            requested = student.get("room_id")
+            if requested is not None:
+                assigned.append((student, requested if self.reserve(requested) else None))
+                continue
+            room = self.best_room(student.get("building_id"), student.get("floor"))
+            if room is not None and self.reserve(room["id"]):
+                assigned.append((student, room["id"]))
+            else:
+                assigned.append((student, None))
+        return assigned
+
+    def copy(self):
+        with self._lock:
+            return RoomAllocator(self._room(r) for r in self._rooms)
+
+
+def get_allocator():
+    # Shared snapshot, rebuilt after any committed write to room.  Callers
+    # that reserve slots work on a copy().
+    return cache.cached(("room",), ("allocator",), RoomAllocator.load)
@@ -0,0 +1,267 @@
+import re
+import sqlite3
+from datetime import date, datetime
+
+import mysql.connector
+
+# ---------------------- Storage Backends ----------------------
+# The app talks to a DB-API connection shaped like mysql.connector's
+# (cursor(dictionary=...), start_transaction(), ping(), in_transaction,
+# %s placeholders).  Each backend opens such connections and owns the few
+# statements its engine spells differently; everything else in the app is
+# written once against the portable subset of SQL both engines accept.
+#
+#   mysql  - the remote server, configured by the [mysql] secrets section
+#   sqlite - an embedded database file, for small sites and for CI.  Reads
+#            are in-process calls; WAL lets readers carry on while the one
+#            writer commits.
+
+# Exception types raised by either engine, for `except` clauses
+Error = (mysql.connector.Error, sqlite3.Error)
+IntegrityError = (mysql.connector.IntegrityError, sqlite3.IntegrityError)
+
+
+def is_duplicate(err):
+    # Primary key or UNIQUE violation
+    return "Duplicate entry" in str(err) or "UNIQUE constraint failed" in str(err)
+
+
+def is_missing_reference(err):
+    # The row points at a parent that doesn't exist
+    return "foreign key" in str(err).lower()
+
+
+# ---------------------- MySQL ----------------------
+class MySQLBackend:
+    name = "mysql"
+
+    # Server gone away, lost connection, lost connection while reading
+    LOST_CONNECTION_ERRORS = {2006, 2013, 2055}
+    # Deadlock and lock wait timeout, plus the above
+    TRANSIENT_ERRORS = {1205, 1213} | LOST_CONNECTION_ERRORS
+
+    # Skipped while loading rows that are consistent by construction
+    CHECKS_OFF = "SET unique_checks = 0, foreign_key_checks = 0"
+    CHECKS_ON = "SET unique_checks = 1, foreign_key_checks = 1"
+
+    # One GROUP BY pass over student; only drifted rooms are rewritten
+    RECONCILE_OCCUPANCY = (
+        "UPDATE room r "
+        "LEFT JOIN (SELECT room_id, COUNT(*) AS total FROM student GROUP BY room_id) s "
+        "ON s.room_id = r.id "
+        "SET r.current_occupancy = COALESCE(s.total, 0) "
+        "WHERE r.current_occupancy <> COALESCE(s.total, 0)"
+    )
+
+    def __init__(self, **connect_args):
+        self.connect_args = connect_args
+
+    def connect(self, **options):
+        return mysql.connector.connect(**self.connect_args, **options)
+
+    @classmethod
+    def is_lost_connection(cls, err):
+        return getattr(err, "errno", None) in cls.LOST_CONNECTION_ERRORS
+
+    @classmethod
+    def is_transient(cls, err):
+        return getattr(err, "errno", None) in cls.TRANSIENT_ERRORS
+
+    @staticmethod
+    def truncate(table):
+        return f"TRUNCATE TABLE {table}"
+
+    @staticmethod
+    def add_counts(table, keys, counters, source):
+        # INSERT the rows produced by `source` (VALUES or SELECT), adding
+        # their counters onto rows that already exist for the same keys
+        updates = ", ".join(f"{c} = {c} + VALUES({c})" for c in counters)
+        return (f"INSERT INTO {table} ({', '.join(keys + counters)}) {source} "
+                f"ON DUPLICATE KEY UPDATE {updates}")
+
+    @staticmethod
+    def upsert(table, keys, columns, source):
+        # INSERT the rows produced by `source`, overwriting `columns` on
+        # rows that already exist for the same keys
+        updates = ", ".join(f"{c} = VALUES({c})" for c in columns)
+        return (f"INSERT INTO {table} ({', '.join(keys + columns)}) {source} "
+                f"ON DUPLICATE KEY UPDATE {updates}")
+
+    @staticmethod
+    def estimate_rows(cursor, table):
+        # InnoDB's statistics; None when the table is unknown
+        cursor.execute(
+            "SELECT TABLE_ROWS AS estimate FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND LOWER(TABLE_NAME) = %s",
+            (table,)
+        )
+        row = cursor.fetchone()
+        return row["estimate"] if row else None
+
+
+# ---------------------- SQLite ----------------------
+# sqlite3 has no TIMESTAMP type; store the same "YYYY-MM-DD HH:MM:SS" text
+# MySQL would show, so range filters compare correctly as strings.
+sqlite3.register_adapter(datetime, lambda value: value.strftime("%Y-%m-%d %H:%M:%S"))
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+
+# BEGIN IMMEDIATE already holds the database's write lock for the whole
+# transaction, so row locks (and skipping locked rows) have nothing left to add.
+_FOR_UPDATE = re.compile(r"\s+FOR\s+UPDATE(\s+SKIP\s+LOCKED)?\b", re.IGNORECASE)
+
+
+class SQLiteCursor:
+    def __init__(self, conn, dictionary=False):
+        self._cursor = conn.cursor()
+        self.dictionary = dictionary
+
+    @staticmethod
+    def _translate(sql):
+        return _FOR_UPDATE.sub("", sql).replace("%s", "?")
+
+    def _row(self, row):
+        if row is None or not self.dictionary:
+            return row
+        return dict(zip((d[0] for d in self._cursor.description), row))
+
+    def execute(self, sql, params=()):
+        self._cursor.execute(self._translate(sql), tuple(params))
+
+    def executemany(self, sql, rows):
+        self._cursor.executemany(self._translate(sql), rows)
+
+    def fetchone(self):
+        return self._row(self._cursor.fetchone())
+
+    def fetchmany(self, size):
+        return [self._row(row) for row in self._cursor.fetchmany(size)]
+
+    def fetchall(self):
+        return [self._row(row) for row in self._cursor.fetchall()]
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    def __init__(self, path, busy_timeout):
+        # Pooled connections are handed between threads, one at a time
+        self._conn = sqlite3.connect(path, timeout=busy_timeout, check_same_thread=False,
+                                     isolation_level="DEFERRED")
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+
+    # Like mysql.connector, a connection opens its own transaction before
+    # the first write unless autocommit is on.
+    @property
+    def autocommit(self):
+        return self._conn.isolation_level is None
+
+    @autocommit.setter
+    def autocommit(self, value):
+        self._conn.isolation_level = None if value else "DEFERRED"
+
+    @property
+    def in_transaction(self):
+        return self._conn.in_transaction
+
+    def cursor(self, dictionary=False):
+        return SQLiteCursor(self._conn, dictionary)
+
+    def start_transaction(self):
+        self._conn.execute("BEGIN IMMEDIATE")
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def ping(self, reconnect=False):
+        self._conn.execute("SELECT 1")
+
+    def close(self):
+        self._conn.close()
+
+
+class SQLiteBackend:
+    name = "sqlite"
+
+    CHECKS_OFF = "PRAGMA foreign_keys = OFF"
+    CHECKS_ON = "PRAGMA foreign_keys = ON"
+
+    # No UPDATE ... JOIN; the correlated counts are served by idx_student_room
+    RECONCILE_OCCUPANCY = (
+        "UPDATE room SET current_occupancy = "
+        "(SELECT COUNT(*) FROM student WHERE student.room_id = room.id) "
+        "WHERE current_occupancy <> (SELECT COUNT(*) FROM student WHERE student.room_id = room.id)"
+    )
+
+    def __init__(self, path="dorm.db", busy_timeout=5.0):
+        self.path = path
+        self.busy_timeout = float(busy_timeout)
+
+    def connect(self, **options):
+        return SQLiteConnection(self.path, self.busy_timeout)
+
+    @staticmethod
+    def is_lost_connection(err):
+        return False
+
+    @staticmethod
+    def is_transient(err):
+        # Another writer held the lock for longer than busy_timeout
+        return isinstance(err, sqlite3.OperationalError) and "locked" in str(err)
+
+    @staticmethod
+    def truncate(table):
+        return f"DELETE FROM {table}"
+
+    @staticmethod
+    def add_counts(table, keys, counters, source):
+        # A SELECT source needs a WHERE clause here, or SQLite misreads ON CONFLICT
+        updates = ", ".join(f"{c} = {c} + excluded.{c}" for c in counters)
+        return (f"INSERT INTO {table} ({', '.join(keys + counters)}) {source} "
+                f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {updates}")
+
+    @staticmethod
+    def upsert(table, keys, columns, source):
+        updates = ", ".join(f"{c} = excluded.{c}" for c in columns)
+        return (f"INSERT INTO {table} ({', '.join(keys + columns)}) {source} "
+                f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {updates}")
+
+    @staticmethod
+    def estimate_rows(cursor, table):
+        # No cheap statistics to read; COUNT(*) walks the smallest index
+        return None
+
+
+BACKENDS = {backend.name: backend for backend in (MySQLBackend, SQLiteBackend)}
+
+
+def create(name, **settings):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown database backend '{name}' (expected one of: {', '.join(BACKENDS)})")
+    return BACKENDS[name](**settings)
+
+
+def dialect(handle):
+    # Backend class behind a connection or cursor, for the statements that
+    # differ between engines.  Profiled cursors are looked through.
+    handle = getattr(handle, "wrapped", handle)
+    if isinstance(handle, (SQLiteConnection, SQLiteCursor)):
+        return SQLiteBackend
+    return MySQLBackend
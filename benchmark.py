@@ -0,0 +1,359 @@
+import argparse
+import json
+import math
+import os
+import random
+import statistics
+import subprocess
+import time
+import tracemalloc
+import traceback
+from datetime import datetime
+
+import allocator
+import cache
+import db
+import frames
+import generate_data
+import maintenance
+import meal_plans
+import migrations
+import repository
+import rollups
+import search
+import tables
+from loader import DataLoader
+
+# ---------------------- Page Workload Benchmark ----------------------
+# Replays the queries each page of dorm_streamlit.py issues on one rerun,
+# against a local database loaded at several scales.  The query cache is
+# bypassed on purpose: the numbers are what a rerun costs right after a
+# write has invalidated it.  The student search index is the exception: it
+# is loaded during the warmup and patched in place by the writes, as in the app.
+#
+# The benchmark pool holds a single connection, so the server's own
+# per-session Questions counter gives the exact number of round trips.
+# That counter is MySQL's, so the benchmark always runs against MySQL.
+
+DEFAULT_SCALES = (1000, 100000, 1000000)
+AVERAGE_CAPACITY = 2.4      # mean of generate_data's default capacities
+FILL_RATIO = 0.85
+
+
+def table_page(table):
+    frames.fetch_page(table)
+    tables.count_rows(table)
+
+
+def random_student(rng, scale):
+    return rng.randint(1, scale)
+
+
+# ---------------------- Page Workloads ----------------------
+# Each workload takes (rng, scale, scratch) and issues one rerun's queries.
+# scratch collects rows written so they can be removed outside the timing.
+
+def student_page(rng, scale, scratch):
+    # Student page with the Add Student expander open and a contact typed
+    add_student_form(rng, scale, random_student(rng, scale), generate_data.phone(random_student(rng, scale), 0))
+
+
+def add_student_form(rng, scale, sid, contact):
+    table_page("student")
+    loader = DataLoader(use_cache=False)
+    loader.need_room_count()
+    loader.need_student(sid)
+    loader.need_contact(contact)
+    loader.room_count()
+    loader.student_by_contact(contact)
+    with db.cursor() as cursor:
+        cursor.execute("SELECT id, building_name FROM building ORDER BY id")
+        cursor.fetchall()
+    rooms = allocator.RoomAllocator.load()
+    rooms.candidates()
+    # On submit the same rerun re-checks ID and contact, answered by the loader
+    loader.student(sid)
+    loader.student_by_contact(contact)
+    return rooms
+
+
+def add_student_submit(rng, scale, scratch):
+    sid = scale * 10 + len(scratch["student"]) + 1
+    contact = f"09{sid % 10**9:09d}"
+    room = add_student_form(rng, scale, sid, contact).best_room()
+    with db.transaction() as cursor:
+        repository.insert_student(cursor, sid, "Bench Student", contact, room["id"],
+                                  dict.fromkeys(meal_plans.WEEKDAYS, "A"), None, None, None, datetime.now())
+    scratch["student"].append((sid, room["id"]))
+
+
+def penalty_search(rng, scale, scratch):
+    table_page("penalty")
+    with db.cursor() as cursor:
+        cursor.execute("SELECT * FROM penalty WHERE student_id = %s", (random_student(rng, scale),))
+        cursor.fetchall()
+
+
+def health_lookup(rng, scale, scratch):
+    table_page("health_issues")
+    DataLoader(use_cache=False).student(random_student(rng, scale))
+
+
+def maintenance_insert(rng, scale, scratch):
+    table_page("maintenancerequest")
+    with db.transaction() as cursor:
+        request_id = maintenance.create_request(cursor, 1, "Benchmark request")
+    scratch["maintenancerequest"].append(request_id)
+
+
+def meals_page(rng, scale, scratch):
+    table_page("meals")
+    DataLoader(use_cache=False).student(random_student(rng, scale))
+
+
+def student_search(rng, scale, scratch):
+    # A rerun of the finder: the shared index, already patched by any writes
+    index = search.get_index()
+    index.search(rng.choice(generate_data.FIRST_NAMES)[:3].lower())
+    index.search(generate_data.phone(random_student(rng, scale), 0)[:7])
+
+
+def room_page(rng, scale, scratch):
+    table_page("room")
+
+
+def building_page(rng, scale, scratch):
+    table_page("building")
+
+
+WORKLOADS = {
+    "student_page": student_page,
+    "add_student_submit": add_student_submit,
+    "penalty_search": penalty_search,
+    "health_lookup": health_lookup,
+    "maintenance_insert": maintenance_insert,
+    "meals_page": meals_page,
+    "student_search": student_search,
+    "room_page": room_page,
+    "building_page": building_page,
+}
+
+
+def cleanup(scratch):
+    with db.transaction() as cursor:
+        for sid, room_id in scratch["student"]:
+            cursor.execute("DELETE FROM student WHERE id = %s", (sid,))
+            cursor.execute(
+                "UPDATE room SET current_occupancy = current_occupancy - 1 WHERE id = %s", (room_id,)
+            )
+        search.students_changed(cursor, [sid for sid, _ in scratch["student"]])
+        for request_id in scratch["maintenancerequest"]:
+            cursor.execute("DELETE FROM maintenancerequest WHERE id = %s", (request_id,))
+        rollups.rebuild(cursor)
+    scratch["student"].clear()
+    scratch["maintenancerequest"].clear()
+
+
+# ---------------------- Measurement ----------------------
+def questions(pool):
+    with pool.connection() as conn:
+        cur = conn.cursor()
+        cur.execute("SHOW SESSION STATUS LIKE 'Questions'")
+        value = int(cur.fetchone()[1])
+        cur.close()
+    return value
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def current_rss_kb():
+    # Resident set size right now (Linux)
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError):
+        return None
+
+
+def measure(pool, workload, scale, iterations, warmup, seed):
+    rng = random.Random(seed)
+    scratch = {"student": [], "maintenancerequest": []}
+    for _ in range(warmup):
+        workload(rng, scale, scratch)
+
+    before = questions(pool)
+    workload(rng, scale, scratch)
+    # The status query itself is counted once
+    round_trips = questions(pool) - before - 1
+
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        workload(rng, scale, scratch)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    workload(rng, scale, scratch)
+    _, py_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    cleanup(scratch)
+
+    return {
+        "p50_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(percentile(timings, 95), 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "round_trips": round_trips,
+        "py_peak_kb": round(py_peak / 1024, 1),
+    }
+
+
+def run_workload(pool, workload, scale, iterations, warmup, seed):
+    # Each workload runs in a fresh forked process with its own connection,
+    # so the peak RSS that wait4() reports for it (ru_maxrss, KB on Linux)
+    # is that workload's alone, transient spikes included, rather than the
+    # benchmark's all-time high.  Growth is measured from the child's RSS
+    # when it started, so it is never negative.
+    read_end, write_end = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        status = 1
+        try:
+            os.close(read_end)
+            start_kb = current_rss_kb()
+            child_pool = db.ConnectionPool(size=1, timeout=pool.timeout, backend=pool.backend)
+            db.use_pool(child_pool)
+            stats = measure(child_pool, workload, scale, iterations, warmup, seed)
+            stats["start_rss_kb"] = start_kb
+            with os.fdopen(write_end, "w") as out:
+                json.dump(stats, out)
+            status = 0
+        except BaseException:
+            traceback.print_exc()
+        finally:
+            os._exit(status)
+
+    os.close(write_end)
+    with os.fdopen(read_end) as f:
+        output = f.read()
+    _, status, usage = os.wait4(pid, 0)
+    if status != 0 or not output:
+        raise RuntimeError(f"Workload {workload.__name__} failed (exit status {status})")
+    stats = json.loads(output)
+    start_kb = stats.pop("start_rss_kb")
+    stats["peak_rss_kb"] = usage.ru_maxrss
+    stats["peak_rss_growth_kb"] = usage.ru_maxrss - start_kb if start_kb is not None else None
+    return stats
+
+
+def load_scale(pool, students, seed, log):
+    rooms_needed = math.ceil(students / (AVERAGE_CAPACITY * FILL_RATIO))
+    buildings = max(2, math.ceil(rooms_needed / 1000))
+    floors = 10
+    rooms_per_floor = math.ceil(rooms_needed / (buildings * floors))
+    args = generate_data.build_parser().parse_args([
+        "--seed", str(seed),
+        "--students", str(students),
+        "--buildings", str(buildings),
+        "--floors", str(floors),
+        "--rooms-per-floor", str(rooms_per_floor),
+        "--as-of", "2026-01-01",
+    ])
+    with pool.connection() as conn:
+        generate_data.reset(conn)
+        generate_data.generate(conn, log=log, **generate_data.scale_from_args(args))
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(pool, scales, workloads, iterations, warmup, seed, load, log=print):
+    results = {
+        "commit": git_commit(),
+        "started": datetime.now().isoformat(timespec="seconds"),
+        "iterations": iterations,
+        "scales": {},
+    }
+    for scale in scales:
+        if load:
+            log(f"⏳ Loading {scale:,} students")
+            load_scale(pool, scale, seed, log)
+            cache.current_cache().clear()
+        results["scales"][str(scale)] = {}
+        for name in workloads:
+            stats = run_workload(pool, WORKLOADS[name], scale, iterations, warmup, seed)
+            results["scales"][str(scale)][name] = stats
+            log(f"{scale:>9,} {name:<20} p50 {stats['p50_ms']:>8.2f} ms  p95 {stats['p95_ms']:>8.2f} ms  "
+                f"{stats['round_trips']:>3} round trips")
+    return results
+
+
+def compare(old, new, log=print):
+    # Prints p50/p95 ratios (new / old) for every scale and workload in both files
+    for scale, pages in new["scales"].items():
+        for name, stats in pages.items():
+            before = old.get("scales", {}).get(scale, {}).get(name)
+            if not before:
+                continue
+            log(f"{int(scale):>9,} {name:<20} p50 x{stats['p50_ms'] / before['p50_ms']:.2f}  "
+                f"p95 x{stats['p95_ms'] / before['p95_ms']:.2f}  "
+                f"round trips {before['round_trips']} -> {stats['round_trips']}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark per-page query workloads")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3306)
+    parser.add_argument("--user", default="root")
+    parser.add_argument("--password", default="")
+    parser.add_argument("--database", default="dorm_bench")
+    parser.add_argument("--scales", default=",".join(str(s) for s in DEFAULT_SCALES),
+                        help="comma-separated student counts")
+    parser.add_argument("--workloads", default=",".join(WORKLOADS))
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-load", action="store_true",
+                        help="benchmark the data already in the database (single scale)")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    pool = db.ConnectionPool(
+        size=1, timeout=5,
+        host=args.host, port=args.port, user=args.user,
+        password=args.password, database=args.database,
+    )
+    db.use_pool(pool)
+    cache.use_cache(cache.QueryCache())
+    with pool.connection() as conn:
+        migrations.migrate(conn)
+
+    results = run(
+        pool,
+        scales=[int(s) for s in args.scales.split(",")],
+        workloads=args.workloads.split(","),
+        iterations=args.iterations,
+        warmup=args.warmup,
+        seed=args.seed,
+        load=not args.no_load,
+    )
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"✅ Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), results)
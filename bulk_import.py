@@ -0,0 +1,259 @@
+from datetime import datetime
+
+import pandas as pd
+from pytz import timezone
+
+import allocator
+import db
+import health
+import meal_plans
+import occupancy
+import rollups
+import search
+import writes
+
+# ---------------------- Bulk Student Import ----------------------
+# The whole file is validated in memory, conflicts are checked with a few
+# IN (...) queries, rooms are handed out from an in-memory free-slot map and
+# each chunk is written with executemany in a single transaction.
+# building_id / floor are optional placement preferences for students
+# without an explicit room_id.
+
+REQUIRED_COLUMNS = ("id", "student_Name", "contact")
+OPTIONAL_COLUMNS = (
+    "room_id", "building_id", "floor", "meal_type", "weekday",
+    "description", "prescription", "guardian_contact", "graduation_year",
+)
+MEAL_TYPES = meal_plans.MEAL_TYPES
+WEEKDAYS = meal_plans.WEEKDAYS
+
+DEFAULT_CHUNK_SIZE = 500
+LOOKUP_BATCH = 1000
+
+
+def read_file(uploaded):
+    # .xlsx is read with openpyxl; old .xls workbooks would need xlrd
+    name = getattr(uploaded, "name", str(uploaded)).lower()
+    if name.endswith(".xlsx"):
+        df = pd.read_excel(uploaded, dtype=str, engine="openpyxl")
+    elif name.endswith(".csv"):
+        df = pd.read_csv(uploaded, dtype=str)
+    else:
+        raise ValueError("Upload a .csv or .xlsx file")
+    df.columns = [c.strip() for c in df.columns]
+    return df.fillna("")
+
+
+def _is_phone(value):
+    return len(value) == 11 and value.isdigit()
+
+
+def validate(df):
+    # Returns (rows, errors); rows are dicts ready for insertion, errors are
+    # (file line, message) pairs.  Line numbers count the header as line 1.
+    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+    if missing:
+        return [], [(1, f"Missing column(s): {', '.join(missing)}")]
+
+    rows, errors = [], []
+    seen_ids, seen_contacts = {}, {}
+    columns = [c for c in REQUIRED_COLUMNS + OPTIONAL_COLUMNS if c in df.columns]
+    for index, values in enumerate(df[columns].itertuples(index=False, name=None)):
+        line = index + 2
+        raw = {c: str(v).strip() for c, v in zip(columns, values)}
+        problems = []
+
+        try:
+            sid = int(raw["id"])
+            if sid < 1:
+                raise ValueError
+        except ValueError:
+            problems.append("Student ID must be a positive whole number")
+            sid = None
+        if not raw["student_Name"]:
+            problems.append("Student Name is required")
+        contact = raw["contact"]
+        if not _is_phone(contact):
+            problems.append("Contact number must be exactly 11 digits")
+
+        placement = {}
+        for column, label in (("room_id", "Room ID"), ("building_id", "Building ID"), ("floor", "Floor"),
+                              ("graduation_year", "Graduation year")):
+            placement[column] = None
+            if raw.get(column):
+                try:
+                    placement[column] = int(raw[column])
+                except ValueError:
+                    problems.append(f"{label} must be a whole number")
+
+        meal_type, weekday = raw.get("meal_type", ""), raw.get("weekday", "").capitalize()
+        if meal_type or weekday:
+            if meal_type not in MEAL_TYPES:
+                problems.append("Meal type must be A or B")
+            if weekday not in WEEKDAYS:
+                problems.append("Weekday must be a full day name")
+
+        description, prescription = raw.get("description", ""), raw.get("prescription", "")
+        guardian = raw.get("guardian_contact", "")
+        if description or prescription or guardian:
+            if not guardian:
+                problems.append("Guardian Contact is required when adding health issues")
+            elif not _is_phone(guardian):
+                problems.append("Guardian contact must be exactly 11 digits")
+
+        if sid is not None:
+            if sid in seen_ids:
+                problems.append(f"Duplicate Student ID (also on line {seen_ids[sid]})")
+            else:
+                seen_ids[sid] = line
+        if contact:
+            if contact in seen_contacts:
+                problems.append(f"Duplicate contact (also on line {seen_contacts[contact]})")
+            else:
+                seen_contacts[contact] = line
+
+        if problems:
+            errors.extend((line, p) for p in problems)
+            continue
+        rows.append({
+            "line": line,
+            "id": sid,
+            "student_Name": raw["student_Name"],
+            "contact": contact,
+            "room_id": placement["room_id"],
+            "building_id": placement["building_id"],
+            "floor": placement["floor"],
+            "graduation_year": placement["graduation_year"],
+            "meal_type": meal_type or None,
+            "weekday": weekday or None,
+            "description": description or None,
+            "prescription": prescription or None,
+            "guardian_contact": guardian or None,
+        })
+    return rows, errors
+
+
+def _existing(cursor, column, values):
+    found = set()
+    values = list(values)
+    for start in range(0, len(values), LOOKUP_BATCH):
+        batch = values[start:start + LOOKUP_BATCH]
+        cursor.execute(f"SELECT {column} FROM student WHERE {column} IN ({db.placeholders(batch)})", batch)
+        found.update(row[column] for row in cursor.fetchall())
+    return found
+
+
+def find_conflicts(rows):
+    with db.cursor() as cursor:
+        taken_ids = _existing(cursor, "id", (r["id"] for r in rows))
+        taken_contacts = _existing(cursor, "contact", (r["contact"] for r in rows))
+    errors = []
+    clean = []
+    for row in rows:
+        if row["id"] in taken_ids:
+            errors.append((row["line"], f"Student ID {row['id']} already exists"))
+        elif row["contact"] in taken_contacts:
+            errors.append((row["line"], "This contact number is already registered"))
+        else:
+            clean.append(row)
+    return clean, errors
+
+
+def allocate_rooms(rows):
+    # Requested rooms are served first so auto-placed students can't take
+    # their slots; everyone else goes through the allocator's preferences.
+    # Works on a private copy of one snapshot of free capacity.
+    rooms = allocator.get_allocator().copy()
+    requested = [r for r in rows if r["room_id"] is not None]
+    others = [r for r in rows if r["room_id"] is None]
+
+    errors, placed = [], []
+    for row, room_id in rooms.assign(requested) + rooms.assign(others):
+        if room_id is None:
+            if row["room_id"] is not None:
+                errors.append((row["line"], f"Room {row['room_id']} is full or does not exist"))
+            else:
+                errors.append((row["line"], "No rooms with available space left"))
+            continue
+        row["room_id"] = room_id
+        placed.append(row)
+    placed.sort(key=lambda r: r["line"])
+    return placed, errors
+
+
+INVALIDATES = ("student", "meals", "penalty", "health_issues", "room")
+
+
+def write_chunk(cursor, rows, now):
+    # Follows occupancy.py's lock order: every room is guarded and counted
+    # (in id order) before a single row goes in, so a room that filled up
+    # since the snapshot fails the chunk before anything was inserted, and
+    # the student foreign keys find rows this transaction already holds.
+    room_deltas = {}
+    for row in rows:
+        room_deltas[row["room_id"]] = room_deltas.get(row["room_id"], 0) + 1
+    for room_id in sorted(room_deltas):
+        cursor.execute(
+            "UPDATE room SET current_occupancy = current_occupancy + %s "
+            "WHERE id = %s AND current_occupancy + %s <= capacity",
+            (room_deltas[room_id], room_id, room_deltas[room_id])
+        )
+        if cursor.rowcount != 1:
+            raise occupancy.RoomFullError(room_id)
+
+    cursor.executemany(
+        "INSERT INTO student (id, student_Name, contact, room_id, graduation_year) VALUES (%s, %s, %s, %s, %s)",
+        [(r["id"], r["student_Name"], r["contact"], r["room_id"], r["graduation_year"]) for r in rows]
+    )
+    meals = [(r["id"], r["meal_type"], r["weekday"]) for r in rows if r["meal_type"]]
+    if meals:
+        cursor.executemany(
+            "INSERT INTO meals (student_id, meal_type, weekday) VALUES (%s, %s, %s)", meals
+        )
+    cursor.executemany(
+        "INSERT INTO penalty (student_id, total_points, last_updated) VALUES (%s, %s, %s)",
+        [(r["id"], 0, now) for r in rows]
+    )
+    records = [
+        (r["id"], r["description"], r["prescription"], r["guardian_contact"])
+        for r in rows if r["guardian_contact"]
+    ]
+    if records:
+        cursor.executemany(
+            "INSERT INTO health_issues (student_id, description, prescription, guardian_contact) "
+            "VALUES (%s, %s, %s, %s)",
+            records
+        )
+    search.students_changed(cursor, [r["id"] for r in rows])
+    health.students_changed(cursor, [r[0] for r in records])
+
+    occupancy.floor_changed(cursor, room_deltas)
+    rollups.penalty_changed(cursor, None, 0, students=len(rows))
+
+
+def import_students(df, chunk_size=DEFAULT_CHUNK_SIZE, progress=None,
+                    retries=writes.DEFAULT_RETRIES, backoff=writes.DEFAULT_BACKOFF):
+    # Returns (number imported, sorted list of (line, message) errors).
+    # Each chunk is one transaction, retried on deadlocks and lock timeouts.
+    # `progress(done, total)` is called after every chunk.
+    rows, errors = validate(df)
+    if rows:
+        rows, conflict_errors = find_conflicts(rows)
+        errors.extend(conflict_errors)
+    if rows:
+        rows, room_errors = allocate_rooms(rows)
+        errors.extend(room_errors)
+
+    now = datetime.now(timezone("Africa/Cairo"))
+    imported = 0
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        try:
+            writes.run_transaction(lambda cursor: write_chunk(cursor, chunk, now), INVALIDATES, retries, backoff)
+            imported += len(chunk)
+        except (*db.Error, occupancy.RoomFullError) as err:
+            errors.extend((r["line"], f"Chunk rolled back: {err}") for r in chunk)
+        if progress:
+            progress(start + len(chunk), len(rows))
+    errors.sort()
+    return imported, errors
@@ -0,0 +1,158 @@
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+
+import streamlit as st
+
+# ---------------------- Query Result Cache ----------------------
+# Shared by every session of the server process.  Each entry records the
+# tables it was read from; a committed write invalidates exactly those
+# entries (see db.transaction(invalidates=...)).  TTL bounds staleness from
+# writers outside this process, the LRU bound keeps memory flat.
+# Cached values are shared between sessions, so callers treat them as
+# read-only.
+
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_TTL = 300   # seconds
+
+
+class QueryCache:
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()           # key -> (expires_at, tables, value)
+        self._keys_by_table = defaultdict(set)
+        self._generations = defaultdict(int)    # bumped on every invalidation
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    def _drop(self, key):
+        _, tables, _ = self._entries.pop(key)
+        for table in tables:
+            keys = self._keys_by_table[table]
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_table[table]
+
+    def get_or_load(self, tables, key, loader):
+        tables = tuple(tables)
+        key = (tables, key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return entry[2]
+                self._drop(key)
+                self._stats["expirations"] += 1
+            self._stats["misses"] += 1
+            generations = [self._generations[t] for t in tables]
+
+        value = loader()
+
+        with self._lock:
+            # A write committed while we were loading: don't keep a result
+            # that may predate it.
+            if [self._generations[t] for t in tables] != generations:
+                return value
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl, tables, value)
+            for table in tables:
+                self._keys_by_table[table].add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+        return value
+
+    def invalidate(self, *tables):
+        with self._lock:
+            for table in tables:
+                self._generations[table] += 1
+                for key in list(self._keys_by_table.get(table, ())):
+                    self._drop(key)
+                    self._stats["invalidations"] += 1
+
+    def update(self, tables, key, change):
+        # For values kept current in place (the search and health indexes):
+        # calls change(value) on the cached entry, if any, instead of
+        # dropping it.  Loads already in flight are not kept, as on
+        # invalidate(), since they may predate the change.
+        tables = tuple(tables)
+        key = (tables, key)
+        with self._lock:
+            for table in tables:
+                self._generations[table] += 1
+            entry = self._entries.get(key)
+            if entry is not None:
+                change(entry[2])
+
+    def clear(self):
+        with self._lock:
+            for table in list(self._generations):
+                self._generations[table] += 1
+            self._entries.clear()
+            self._keys_by_table.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        stats["max_entries"] = self.max_entries
+        stats["ttl"] = self.ttl
+        return stats
+
+
+@st.cache_resource
+def get_cache():
+    config = st.secrets.get("cache", {})
+    return QueryCache(
+        max_entries=int(config.get("max_entries", DEFAULT_MAX_ENTRIES)),
+        ttl=float(config.get("ttl", DEFAULT_TTL)),
+    )
+
+
+_cache_override = None
+_bound = threading.local()
+
+
+def use_cache(query_cache):
+    # Like db.use_pool: an explicit cache instead of the one configured from
+    # st.secrets (tests and other scripts)
+    global _cache_override
+    _cache_override = query_cache
+
+
+@contextmanager
+def bind(query_cache):
+    # current_cache() on this thread only, for the block: write pipeline
+    # workers have no Streamlit context to look the cache up themselves
+    outer = getattr(_bound, "cache", None)
+    _bound.cache = query_cache
+    try:
+        yield query_cache
+    finally:
+        _bound.cache = outer
+
+
+def current_cache():
+    bound = getattr(_bound, "cache", None)
+    if bound is not None:
+        return bound
+    return _cache_override if _cache_override is not None else get_cache()
+
+
+def cached(tables, key, loader):
+    return current_cache().get_or_load(tables, key, loader)
+
+
+def invalidate(*tables):
+    current_cache().invalidate(*tables)
+
+
+def update(tables, key, change):
+    current_cache().update(tables, key, change)
@@ -0,0 +1,198 @@
+import argparse
+from datetime import datetime
+
+import db
+import health
+import rollups
+import search
+import writes
+
+# ---------------------- Bulk Checkout ----------------------
+# End-of-semester checkout for a list of students, a building, or everyone
+# graduating in or before a year.  The students are resolved once, then
+# removed in chunks of `chunk_size`, one short transaction per chunk, so
+# the live app only ever waits on a few hundred rows:
+#
+#   1. lock the chunk's students, then their rooms (the order in occupancy.py)
+#   2. optionally copy every row about to go into the *_archive tables
+#   3. DELETE ... WHERE student_id IN (...) from each dependent table, then student
+#   4. recount the chunk's rooms with one UPDATE and move the rollups
+#
+#   python checkout.py --graduating 2026
+#   python checkout.py --building 3 --no-archive
+
+DEFAULT_CHUNK_SIZE = 500
+
+# Children first; every table keyed by the student it belongs to
+DEPENDENTS = ("penalty_event", "meals", "health_issues", "penalty")
+ARCHIVED = {
+    "penalty_event": ("student_id", ("id", "student_id", "delta", "reason", "actor", "created_at")),
+    "meals": ("student_id", ("student_id", "meal_type", "weekday")),
+    "health_issues": ("student_id", ("student_id", "description", "prescription", "guardian_contact")),
+    "penalty": ("student_id", ("student_id", "total_points", "last_updated")),
+    "student": ("id", ("id", "student_Name", "contact", "room_id", "graduation_year")),
+}
+INVALIDATES = ("student", "meals", "penalty", "health_issues", "room")
+
+# Same DDL on both backends; checked_out_at is the time of the checkout run
+ARCHIVE_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS student_archive(
+            id INT NOT NULL,
+            student_Name VARCHAR(100),
+            contact VARCHAR(11) NOT NULL,
+            room_id INT NOT NULL,
+            graduation_year INT,
+            checked_out_at TIMESTAMP NOT NULL,
+            PRIMARY KEY (id, checked_out_at)
+    )""",
+    """CREATE TABLE IF NOT EXISTS penalty_archive(
+            student_id INT NOT NULL,
+            total_points INT,
+            last_updated TIMESTAMP NULL,
+            checked_out_at TIMESTAMP NOT NULL,
+            PRIMARY KEY (student_id, checked_out_at)
+    )""",
+    """CREATE TABLE IF NOT EXISTS penalty_event_archive(
+            id INT NOT NULL,
+            student_id INT NOT NULL,
+            delta INT NOT NULL,
+            reason VARCHAR(200) NOT NULL,
+            actor VARCHAR(100),
+            created_at TIMESTAMP NULL,
+            checked_out_at TIMESTAMP NOT NULL,
+            PRIMARY KEY (student_id, id)
+    )""",
+    """CREATE TABLE IF NOT EXISTS meals_archive(
+            student_id INT NOT NULL,
+            meal_type VARCHAR(1) NOT NULL,
+            weekday VARCHAR(10) NOT NULL,
+            checked_out_at TIMESTAMP NOT NULL,
+            PRIMARY KEY (student_id, weekday, checked_out_at)
+    )""",
+    """CREATE TABLE IF NOT EXISTS health_issues_archive(
+            student_id INT NOT NULL,
+            description TEXT,
+            prescription TEXT,
+            guardian_contact VARCHAR(11) NOT NULL,
+            checked_out_at TIMESTAMP NOT NULL,
+            PRIMARY KEY (student_id, checked_out_at)
+    )""",
+]
+ARCHIVE_TABLES = [f"{table}_archive" for table in ARCHIVED]
+
+
+# ---------------------- Selecting ----------------------
+def select_students(student_ids=(), building_id=None, graduating=None):
+    # Sorted ids of the existing students matching every filter given
+    clauses, params = [], []
+    if student_ids:
+        ids = sorted(set(student_ids))
+        clauses.append(f"s.id IN ({db.placeholders(ids)})")
+        params.extend(ids)
+    if building_id is not None:
+        clauses.append("s.room_id IN (SELECT id FROM room WHERE building_id = %s)")
+        params.append(building_id)
+    if graduating is not None:
+        clauses.append("s.graduation_year <= %s")
+        params.append(graduating)
+    if not clauses:
+        raise ValueError("Pick students by ID, building or graduation year")
+    with db.cursor(dictionary=False) as cursor:
+        cursor.execute(f"SELECT s.id FROM student s WHERE {' AND '.join(clauses)} ORDER BY s.id", params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+# ---------------------- Removing ----------------------
+def checkout_chunk(cursor, student_ids, archive=True, now=None):
+    # Removes the given students and everything that hangs off them;
+    # returns how many were removed.  Needs a dictionary cursor.
+    now = now or datetime.now()
+    ids = sorted(set(student_ids))
+    cursor.execute(f"SELECT id, room_id FROM student WHERE id IN ({db.placeholders(ids)}) ORDER BY id FOR UPDATE", ids)
+    students = cursor.fetchall()
+    if not students:
+        return 0
+    ids = [row["id"] for row in students]
+    in_ids = f"IN ({db.placeholders(ids)})"
+    rooms = sorted({row["room_id"] for row in students})
+    in_rooms = f"IN ({db.placeholders(rooms)})"
+    cursor.execute(f"SELECT id, current_occupancy FROM room WHERE id {in_rooms} ORDER BY id FOR UPDATE", rooms)
+    before = {row["id"]: row["current_occupancy"] for row in cursor.fetchall()}
+
+    cursor.execute(
+        f"SELECT total_points, COUNT(*) AS students FROM penalty WHERE student_id {in_ids} GROUP BY total_points",
+        ids
+    )
+    totals = cursor.fetchall()
+    if archive:
+        for table, (key, columns) in ARCHIVED.items():
+            cursor.execute(
+                f"INSERT INTO {table}_archive ({', '.join(columns)}, checked_out_at) "
+                f"SELECT {', '.join(columns)}, %s FROM {table} WHERE {key} {in_ids}",
+                [now] + ids
+            )
+    for table in DEPENDENTS:
+        cursor.execute(f"DELETE FROM {table} WHERE student_id {in_ids}", ids)
+    cursor.execute(f"DELETE FROM student WHERE id {in_ids}", ids)
+    removed = cursor.rowcount
+    search.students_changed(cursor, ids)
+    health.students_changed(cursor, ids)
+
+    # One pass over the rooms the chunk lived in, whatever their counts were
+    cursor.execute(
+        "UPDATE room SET current_occupancy = "
+        "(SELECT COUNT(*) FROM student WHERE student.room_id = room.id) "
+        f"WHERE id {in_rooms}",
+        rooms
+    )
+    cursor.execute(f"SELECT id, current_occupancy FROM room WHERE id {in_rooms}", rooms)
+    deltas = {row["id"]: row["current_occupancy"] - before[row["id"]] for row in cursor.fetchall()}
+    deltas = {room_id: delta for room_id, delta in deltas.items() if delta}
+    if deltas:
+        rollups.occupancy_changed_many(cursor, deltas)
+    for row in totals:
+        rollups.penalty_changed(cursor, row["total_points"], None, students=row["students"])
+    return removed
+
+
+def checkout(student_ids, archive=True, chunk_size=DEFAULT_CHUNK_SIZE, progress=None, now=None,
+             retries=writes.DEFAULT_RETRIES, backoff=writes.DEFAULT_BACKOFF):
+    # Returns (number removed, [(first id, last id, error)] for failed chunks).
+    # A failed chunk is rolled back alone; running the checkout again
+    # picks up whoever is still there.  `progress(done, total)` is called
+    # after every chunk.
+    now = now or datetime.now()
+    ids = sorted(set(student_ids))
+    removed, errors = 0, []
+    for start in range(0, len(ids), chunk_size):
+        chunk = ids[start:start + chunk_size]
+        try:
+            removed += writes.run_transaction(
+                lambda cursor: checkout_chunk(cursor, chunk, archive, now), INVALIDATES, retries, backoff
+            )
+        except db.Error as err:
+            errors.append((chunk[0], chunk[-1], str(err)))
+        if progress:
+            progress(start + len(chunk), len(ids))
+    return removed, errors
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check out students in bulk")
+    parser.add_argument("--ids", help="comma separated student IDs")
+    parser.add_argument("--building", type=int)
+    parser.add_argument("--graduating", type=int, help="graduation year, this one or earlier")
+    parser.add_argument("--no-archive", action="store_true", help="delete without copying to *_archive")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    try:
+        selected = select_students(
+            [int(i) for i in args.ids.split(",")] if args.ids else (), args.building, args.graduating
+        )
+    except ValueError as err:
+        parser.error(str(err))
+    removed, failed = checkout(selected, archive=not args.no_archive, chunk_size=args.chunk_size)
+    for first, last, message in failed:
+        print(f"❌ Students {first}–{last} rolled back: {message}")
+    print(f"✅ Checked out {removed:,} of {len(selected):,} students")
@@ -0,0 +1,279 @@
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+import mysql.connector
+import streamlit as st
+
+import backends
+import cache
+import profiling
+
+# ---------------------- Connection Pool ----------------------
+# Streamlit re-executes the whole script on every widget interaction, so the
+# app must not open a fresh SSL connection per rerun.  One pool is shared by
+# every rerun and every session of the server process (see get_pool below).
+# Connections come from the backend picked in st.secrets (see backends.py).
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_POOL_TIMEOUT = 10       # seconds a rerun may wait for a free connection
+DEFAULT_PING_INTERVAL = 30      # idle seconds before a connection is re-checked
+
+# Pool settings that may sit in the backend's secrets section
+POOL_SETTINGS = ("pool_size", "pool_timeout", "ping_interval")
+
+# Backend-neutral error handling for callers
+Error = backends.Error
+IntegrityError = backends.IntegrityError
+is_duplicate = backends.is_duplicate
+is_missing_reference = backends.is_missing_reference
+
+
+class PoolExhausted(mysql.connector.Error):
+    pass
+
+
+class ConnectionPool:
+    def __init__(self, size=DEFAULT_POOL_SIZE, timeout=DEFAULT_POOL_TIMEOUT,
+                 ping_interval=DEFAULT_PING_INTERVAL, backend=None, profiler=None, **connect_args):
+        # Without an explicit backend, connect_args are MySQL connection arguments.
+        # With a profiler, every cursor handed out is instrumented (see profiling.py).
+        self.size = size
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+        self.backend = backend or backends.MySQLBackend(**connect_args)
+        self.profiler = profiler
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._stats = {
+            "hits": 0,          # served straight from an idle connection
+            "misses": 0,        # a new connection had to be opened
+            "waits": 0,         # had to wait for another session to release
+            "wait_time": 0.0,
+            "timeouts": 0,
+            "reconnects": 0,    # stale connection replaced after a failed ping
+            "in_use": 0,
+        }
+
+    def _connect(self):
+        conn = self.backend.connect()
+        # Plain reads must never sit inside an open snapshot on a pooled
+        # connection; writes opt in through transaction().
+        conn.autocommit = True
+        return conn
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self._stats[key] += amount
+
+    def _reserve_slot(self):
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                return True
+            return False
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Error:
+            pass
+        with self._lock:
+            self._created -= 1
+
+    def _check_alive(self, conn, last_used):
+        if time.monotonic() - last_used < self.ping_interval:
+            return conn
+        try:
+            conn.ping(reconnect=False)
+            return conn
+        except Error:
+            self._count("reconnects")
+            try:
+                conn.close()
+            except Error:
+                pass
+            fresh = self._connect()
+            return fresh
+
+    def acquire(self):
+        try:
+            conn, last_used = self._idle.get_nowait()
+            self._count("hits")
+        except queue.Empty:
+            if self._reserve_slot():
+                try:
+                    conn = self._connect()
+                except Error:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+                self._count("misses")
+                self._count("in_use")
+                return conn
+            self._count("waits")
+            started = time.monotonic()
+            try:
+                conn, last_used = self._idle.get(timeout=self.timeout)
+            except queue.Empty:
+                self._count("timeouts")
+                raise PoolExhausted(
+                    msg=f"No database connection became free within {self.timeout}s "
+                        f"(pool size {self.size})"
+                )
+            finally:
+                self._count("wait_time", time.monotonic() - started)
+        try:
+            conn = self._check_alive(conn, last_used)
+        except Error:
+            with self._lock:
+                self._created -= 1
+            raise
+        self._count("in_use")
+        return conn
+
+    def release(self, conn):
+        self._count("in_use", -1)
+        if conn.in_transaction:
+            try:
+                conn.rollback()
+            except Error:
+                self._discard(conn)
+                return
+        self._idle.put((conn, time.monotonic()))
+
+    def cursor(self, conn, dictionary=True):
+        cur = conn.cursor(dictionary=dictionary)
+        return self.profiler.wrap(cur) if self.profiler else cur
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        except Error as err:
+            if self.backend.is_lost_connection(err):
+                # Don't hand a dead connection to the next caller
+                self._count("in_use", -1)
+                self._discard(conn)
+            else:
+                self.release(conn)
+            raise
+        except BaseException:
+            self.release(conn)
+            raise
+        else:
+            self.release(conn)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = self.size
+            stats["open"] = self._created
+        stats["idle"] = self._idle.qsize()
+        return stats
+
+
+def _backend_config():
+    # `backend = "sqlite"` at the top of secrets.toml switches engines; the
+    # section named after the backend holds its settings.
+    name = st.secrets.get("backend", "mysql")
+    return name, dict(st.secrets[name])
+
+
+def configured_backend():
+    name, config = _backend_config()
+    for key in POOL_SETTINGS:
+        config.pop(key, None)
+    return backends.create(name, **config)
+
+
+@st.cache_resource
+def get_pool():
+    _, config = _backend_config()
+    return ConnectionPool(
+        size=int(config.get("pool_size", DEFAULT_POOL_SIZE)),
+        timeout=float(config.get("pool_timeout", DEFAULT_POOL_TIMEOUT)),
+        ping_interval=float(config.get("ping_interval", DEFAULT_PING_INTERVAL)),
+        backend=configured_backend(),
+        profiler=profiling.from_settings(st.secrets.get("profiling", {})),
+    )
+
+
+_pool_override = None
+
+
+def use_pool(pool):
+    # Points the helpers below at an explicit pool instead of the one built
+    # from st.secrets (benchmarks, load tests and other scripts)
+    global _pool_override
+    _pool_override = pool
+
+
+def current_pool():
+    return _pool_override if _pool_override is not None else get_pool()
+
+
+# ---------------------- Cursor Helpers ----------------------
+def placeholders(values):
+    # "%s, %s, %s" for an IN (...) list of len(values) parameters
+    return ", ".join(["%s"] * len(values))
+
+
+@contextmanager
+def cursor(dictionary=True, pool=None):
+    pool = pool or current_pool()
+    with pool.connection() as conn:
+        cur = pool.cursor(conn, dictionary)
+        try:
+            yield cur
+        finally:
+            cur.close()
+
+
+# Callbacks for the transaction open on each thread (see after_commit)
+_pending = threading.local()
+
+
+@contextmanager
+def transaction(dictionary=True, invalidates=(), pool=None):
+    # Commits when the block finishes, rolls back on any error (including
+    # Streamlit's rerun/stop control flow, so call st.rerun() after the block).
+    # `invalidates` names the tables written, whose cached reads are dropped
+    # once the commit succeeds.
+    pool = pool or current_pool()
+    outer = getattr(_pending, "callbacks", None)
+    _pending.callbacks = callbacks = []
+    try:
+        with pool.connection() as conn:
+            conn.start_transaction()
+            cur = pool.cursor(conn, dictionary)
+            try:
+                yield cur
+                conn.commit()
+            except BaseException:
+                try:
+                    conn.rollback()
+                except Error:
+                    pass    # the original error is the one worth reporting
+                raise
+            finally:
+                cur.close()
+    finally:
+        _pending.callbacks = outer
+    if invalidates:
+        cache.invalidate(*invalidates)
+    for callback in callbacks:
+        callback()
+
+
+def after_commit(callback):
+    # Runs callback() once this thread's open transaction() commits, never
+    # if it rolls back.  For in-memory state patched from a write (the
+    # search and health indexes) rather than dropped and reloaded.
+    callbacks = getattr(_pending, "callbacks", None)
+    if callbacks is None:
+        raise RuntimeError("after_commit() needs an open transaction()")
+    callbacks.append(callback)
@@ -0,0 +1,201 @@
+import argparse
+import csv
+import io
+import os
+from datetime import datetime, timedelta
+
+import db
+import migrations
+import tables
+
+# ---------------------- Streaming Export ----------------------
+# Any table, whole or filtered, to CSV or Parquet with bounded memory: rows
+# come off an unbuffered cursor (MySQL streams them from the server as they
+# are fetched, SQLite steps its statement) in chunks of `chunk_size`, and
+# each chunk is written out before the next is read.  Parquet gets one row
+# group per chunk.  Rows are exported in primary key order, which both
+# engines read straight off the clustered index.
+#
+# Streamlit serves a download from memory, so the app only offers one for
+# exports of up to DOWNLOAD_MAX_ROWS rows; bigger ones are saved to a file
+# in an export directory on the server (see save).
+#
+#   python export.py maintenancerequest --format parquet --since 2023-01-01 -o mr.parquet
+
+FORMATS = ("csv", "parquet")
+DEFAULT_CHUNK_SIZE = 5000
+DOWNLOAD_MAX_ROWS = 100000
+DEFAULT_DIRECTORY = "exports"
+
+# The column each table's date range applies to, where it has one
+DATE_COLUMNS = {
+    table: column
+    for table, columns in tables.TABLE_COLUMNS.items()
+    for column, kind in columns.items() if kind == "timestamp"
+}
+
+
+def _query(table, columns, filters, since, until):
+    if table not in tables.TABLE_COLUMNS:
+        raise ValueError(f"Unknown table '{table}'")
+    columns = [c for c in (columns or tables.TABLE_COLUMNS[table]) if c in tables.TABLE_COLUMNS[table]]
+    if not columns:
+        raise ValueError("Select at least one column to export")
+    where, params = tables.build_where(table, filters)
+    if since or until:
+        if table not in DATE_COLUMNS:
+            raise ValueError(f"'{table}' has no date column to filter on")
+        clauses = [where[len(" WHERE "):]] if where else []
+        if since:
+            clauses.append(f"{DATE_COLUMNS[table]} >= %s")
+            params.append(since)
+        if until:
+            # until is inclusive: everything before the following midnight
+            clauses.append(f"{DATE_COLUMNS[table]} < %s")
+            params.append(until + timedelta(days=1))
+        where = f" WHERE {' AND '.join(clauses)}"
+    sql = f"SELECT {', '.join(columns)} FROM {table}{where} ORDER BY {', '.join(tables.PRIMARY_KEYS[table])}"
+    return columns, sql, params
+
+
+def stream_rows(cursor, table, columns=None, filters=None, since=None, until=None,
+                chunk_size=DEFAULT_CHUNK_SIZE, max_rows=None):
+    # Yields the column list, then lists of up to chunk_size row tuples.
+    # `cursor` must be a plain (tuple, unbuffered) cursor.  Raises
+    # ValueError as soon as more than max_rows rows have come in.
+    columns, sql, params = _query(table, columns, filters, since, until)
+    cursor.execute(sql, params)
+    yield columns
+    done = False
+    total = 0
+    try:
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                done = True
+                return
+            total += len(rows)
+            if max_rows is not None and total > max_rows:
+                raise ValueError(f"More than {max_rows:,} rows to export: save the export on the server instead")
+            yield rows
+    finally:
+        if not done:
+            # An abandoned export must not leave unread rows on a pooled connection
+            while cursor.fetchmany(chunk_size):
+                pass
+
+
+def write_csv(out, chunks):
+    # out: a text file opened with newline=""; returns the number of rows
+    writer = csv.writer(out)
+    writer.writerow(next(chunks))
+    total = 0
+    for rows in chunks:
+        writer.writerows(rows)
+        total += len(rows)
+    return total
+
+
+def _arrow_schema(table, columns):
+    import pyarrow as pa
+
+    types = {"int": pa.int64(), "text": pa.string(), "enum": pa.string(), "timestamp": pa.timestamp("us")}
+    return pa.schema([(c, types[tables.TABLE_COLUMNS[table][c]]) for c in columns])
+
+
+def write_parquet(out, table, chunks):
+    # out: a path or binary file; returns the number of rows
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    columns = next(chunks)
+    schema = _arrow_schema(table, columns)
+    total = 0
+    with pq.ParquetWriter(out, schema) as writer:
+        for rows in chunks:
+            # Strings cast to timestamp too, for SQLite's TEXT timestamps
+            arrays = [pa.array(values).cast(field.type) for values, field in zip(zip(*rows), schema)]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            total += len(rows)
+    return total
+
+
+def export(cursor, out, table, fmt="csv", columns=None, filters=None, since=None, until=None,
+           chunk_size=DEFAULT_CHUNK_SIZE, max_rows=None):
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}' (expected one of: {', '.join(FORMATS)})")
+    chunks = stream_rows(cursor, table, columns, filters, since, until, chunk_size, max_rows)
+    try:
+        if fmt == "csv":
+            return write_csv(out, chunks)
+        return write_parquet(out, table, chunks)
+    finally:
+        chunks.close()
+
+
+def download(table, fmt="csv", columns=None, filters=None, since=None, until=None,
+             chunk_size=DEFAULT_CHUNK_SIZE, max_rows=DOWNLOAD_MAX_ROWS, pool=None):
+    # The file's bytes, for st.download_button, which holds them in memory
+    # anyway; so it is capped at max_rows and bigger exports go through save()
+    out = io.BytesIO()
+    with db.cursor(dictionary=False, pool=pool) as cursor:
+        if fmt == "csv":
+            text = io.TextIOWrapper(out, encoding="utf-8", newline="")
+            export(cursor, text, table, fmt, columns, filters, since, until, chunk_size, max_rows)
+            text.detach()
+        else:
+            export(cursor, out, table, fmt, columns, filters, since, until, chunk_size, max_rows)
+    return out.getvalue()
+
+
+def save(table, fmt="csv", columns=None, filters=None, since=None, until=None,
+         chunk_size=DEFAULT_CHUNK_SIZE, directory=DEFAULT_DIRECTORY, pool=None):
+    # Streams the export to a new file in `directory` on the server, with
+    # memory bounded by chunk_size; returns (path, number of rows).  The file
+    # only appears under its final name once it is complete.
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{table}-{datetime.now():%Y%m%d-%H%M%S}.{fmt}")
+    partial_path = f"{path}.part"
+    try:
+        with db.cursor(dictionary=False, pool=pool) as cursor:
+            if fmt == "csv":
+                with open(partial_path, "w", newline="", encoding="utf-8") as out:
+                    total = export(cursor, out, table, fmt, columns, filters, since, until, chunk_size)
+            else:
+                total = export(cursor, partial_path, table, fmt, columns, filters, since, until, chunk_size)
+        os.replace(partial_path, path)
+    except BaseException:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+    return path, total
+
+
+def _date(value):
+    return datetime.strptime(value, "%Y-%m-%d")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export a table to CSV or Parquet")
+    parser.add_argument("table", choices=sorted(tables.TABLE_COLUMNS))
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("-o", "--output", required=True)
+    parser.add_argument("--columns", help="comma separated, default all")
+    parser.add_argument("--since", type=_date, help="YYYY-MM-DD, inclusive")
+    parser.add_argument("--until", type=_date, help="YYYY-MM-DD, inclusive")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    conn = migrations.connect()
+    try:
+        cursor = conn.cursor()
+        columns = args.columns.split(",") if args.columns else None
+        if args.format == "csv":
+            with open(args.output, "w", newline="", encoding="utf-8") as out:
+                total = export(cursor, out, args.table, "csv", columns, None, args.since, args.until, args.chunk_size)
+        else:
+            total = export(cursor, args.output, args.table, "parquet", columns, None, args.since, args.until, args.chunk_size)
+        cursor.close()
+    finally:
+        conn.close()
+    print(f"✅ Exported {total:,} rows from {args.table} to {args.output}")
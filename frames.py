@@ -0,0 +1,95 @@
+from importlib.util import find_spec
+
+import numpy as np
+import pandas as pd
+
+import db
+import maintenance
+import meal_plans
+import tables
+
+# ---------------------- Compact DataFrames ----------------------
+# Table pages are fetched as plain tuples and turned into one typed column
+# at a time, instead of a dict per row that pandas then infers dtypes from.
+# Each table has a dtype map: enums become categoricals, small counts and
+# ids get the narrowest integer type their SQL type allows, timestamps
+# become datetime64 (SQLite hands them over as text) and text uses Arrow
+# strings where pyarrow is installed.  Integers are pandas' nullable types,
+# so a NULL doesn't turn a column into floats.
+#
+# A value a narrow type can't hold (a building id over 32767, say) makes
+# that column fall back to what pandas infers, never to a wrong number.
+
+STRING = "string[pyarrow]" if find_spec("pyarrow") else object
+
+# Dtypes per column kind (see tables.TABLE_COLUMNS); an SQL INT fits Int32
+KIND_DTYPES = {
+    "int": "Int32",
+    "text": STRING,
+    "enum": "category",
+    "timestamp": "datetime64[ns]",
+}
+
+STATUSES = pd.CategoricalDtype(maintenance.STATUSES)
+MEAL_TYPES = pd.CategoricalDtype(meal_plans.MEAL_TYPES)
+WEEKDAYS = pd.CategoricalDtype(meal_plans.WEEKDAYS, ordered=True)
+
+# Where a table's columns differ from their kind's dtype
+TABLE_DTYPES = {
+    "student": {"graduation_year": "Int16"},
+    "maintenancerequest": {"statues": STATUSES},
+    "meals": {"meal_type": MEAL_TYPES, "weekday": WEEKDAYS},
+    "room": {"floor": "Int16", "building_id": "Int16", "capacity": "Int8", "current_occupancy": "Int8"},
+}
+
+
+def dtype(table, column):
+    return TABLE_DTYPES.get(table, {}).get(column) or KIND_DTYPES[tables.TABLE_COLUMNS[table][column]]
+
+
+def _categorical(values, kind):
+    # Codes looked up in a dict, then one from_codes; unknown values fall back
+    codes = {category: code for code, category in enumerate(kind.categories)}
+    codes[None] = -1
+    try:
+        return pd.Categorical.from_codes(np.fromiter((codes[v] for v in values), np.int8, len(values)), dtype=kind)
+    except KeyError:
+        return pd.Categorical(values)
+
+
+def _column(values, kind):
+    if kind == "datetime64[ns]":
+        return pd.to_datetime(pd.Series(values, dtype=object), format="ISO8601", errors="coerce").array
+    if isinstance(kind, pd.CategoricalDtype):
+        return _categorical(values, kind)
+    try:
+        return pd.array(values, dtype=kind)
+    except (TypeError, ValueError, OverflowError):
+        return pd.array(values)
+
+
+def to_frame(table, columns, rows, only=None):
+    # rows: tuples in `columns` order; `only` picks and orders the columns kept.
+    # Each column is gathered straight from the rows: transposing with
+    # zip(*rows) builds a tuple per column the size of the whole page.
+    position = {column: i for i, column in enumerate(columns)}
+    return pd.DataFrame({
+        column: _column([row[position[column]] for row in rows], dtype(table, column))
+        for column in (only or columns)
+    })
+
+
+def fetch_page(table, columns=None, filters=None, after=None, page_size=tables.DEFAULT_PAGE_SIZE):
+    # Like tables.fetch_page, but returns (DataFrame of `columns`, next_key)
+    keys = tables.PRIMARY_KEYS[table]
+    select, sql, params = tables.page_query(table, columns, filters, after, page_size)
+    with db.cursor(dictionary=False) as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    next_key = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_key = tuple(rows[-1][select.index(k)] for k in keys)
+    shown = [c for c in (columns or tables.TABLE_COLUMNS[table]) if c in tables.TABLE_COLUMNS[table]]
+    return to_frame(table, select, rows, only=shown), next_key
@@ -0,0 +1,306 @@
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import backends
+import checkout
+import db
+import migrations
+import penalties
+import rollups
+
+# ---------------------- Synthetic Data Generator ----------------------
+# Produces a consistent dormitory at any scale: every FK resolves, room
+# occupancy matches the students placed in it and contacts are unique.
+# The same seed and parameters always produce the same rows.
+
+FIRST_NAMES = [
+    "Ahmed", "Mohamed", "Omar", "Youssef", "Mostafa", "Karim", "Hassan", "Ali",
+    "Mariam", "Nour", "Salma", "Farida", "Habiba", "Laila", "Yasmin", "Sara",
+]
+LAST_NAMES = [
+    "Hassan", "Ibrahim", "Mahmoud", "Saad", "Fathy", "Khalil", "Naguib", "Adel",
+    "Samir", "Farouk", "Mansour", "Zaki", "Ragab", "Hamdy", "Shawky", "Ezzat",
+]
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+CONDITIONS = [
+    ("Asthma", "Inhaler"), ("Peanut allergy", "EpiPen"), ("Diabetes", "Insulin"),
+    ("Migraine", "Ibuprofen"), ("Lactose intolerance", None), ("Hypertension", "Amlodipine"),
+]
+ISSUES = [
+    "Leaky faucet", "Broken light bulb", "Door lock stuck", "No hot water",
+    "Window won't close", "AC not cooling", "Clogged drain", "Broken chair",
+]
+
+# Tables in FK order, parents first
+TABLES = ["building", "room", "student", "penalty", "meals", "health_issues", "maintenancerequest"]
+# Filled by the app only, emptied by reset() along with the rest
+APP_TABLES = ["maintenance_status_history", "penalty_event"] + checkout.ARCHIVE_TABLES
+
+COLUMNS = {
+    "building": ("id", "building_name"),
+    "room": ("id", "floor", "building_id", "capacity", "current_occupancy"),
+    "student": ("id", "student_Name", "contact", "room_id", "graduation_year"),
+    "penalty": ("student_id", "total_points", "last_updated"),
+    "meals": ("student_id", "meal_type", "weekday"),
+    "health_issues": ("student_id", "description", "prescription", "guardian_contact"),
+    "maintenancerequest": ("id", "statues", "room_id", "description", "date_created"),
+}
+
+
+def parse_distribution(text):
+    # "0:80,1:10,5:10" -> ([0, 1, 5], [80, 10, 10])
+    points, weights = [], []
+    for part in text.split(","):
+        value, weight = part.split(":")
+        points.append(int(value))
+        weights.append(float(weight))
+    return points, weights
+
+
+def phone(n, offset):
+    # Multiplying by a number coprime with 10**9 is a bijection mod 10**9,
+    # so distinct n always give distinct numbers.
+    return f"01{(n * 7919 + offset) % 10**9:09d}"
+
+
+# ---------------------- Row Generators ----------------------
+def build_rooms(rng, buildings, floors, rooms_per_floor, capacities):
+    rooms = []
+    room_id = 0
+    for building_id in range(1, buildings + 1):
+        for floor in range(1, floors + 1):
+            for _ in range(rooms_per_floor):
+                room_id += 1
+                rooms.append([room_id, floor, building_id, rng.choice(capacities), 0])
+    return rooms
+
+
+def place_students(rng, rooms, students):
+    total = sum(r[3] for r in rooms)
+    if students > total:
+        raise ValueError(f"{students:,} students do not fit in {total:,} beds")
+    order = list(range(len(rooms)))
+    rng.shuffle(order)
+    remaining = students
+    # Fill rooms in a shuffled order so occupancy is spread across buildings
+    for index in order:
+        if remaining == 0:
+            break
+        take = min(rooms[index][3], remaining)
+        rooms[index][4] = take
+        remaining -= take
+
+
+def student_rows(rooms):
+    student_id = 0
+    for room in rooms:
+        for _ in range(room[4]):
+            student_id += 1
+            yield student_id, room[0]
+
+
+def generate_rows(seed, buildings, floors, rooms_per_floor, capacities, students,
+                  maintenance_years, requests_per_room_year, penalty_distribution,
+                  health_share, meal_days, now):
+    # Yields (table, row) in FK order without holding per-student data in memory
+    rng = random.Random(seed)
+    rooms = build_rooms(rng, buildings, floors, rooms_per_floor, capacities)
+    place_students(rng, rooms, students)
+    points, weights = penalty_distribution
+
+    for building_id in range(1, buildings + 1):
+        yield "building", (building_id, f"Building {building_id}")
+    for room in rooms:
+        yield "room", tuple(room)
+
+    for student_id, room_id in student_rows(rooms):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        # Spread over the next four classes without another draw from rng
+        yield "student", (student_id, name, phone(student_id, 0), room_id, now.year + student_id % 4)
+        updated = now - timedelta(days=rng.randint(0, 365))
+        yield "penalty", (student_id, rng.choices(points, weights)[0], updated)
+        for weekday in rng.sample(WEEKDAYS, rng.randint(0, meal_days)):
+            yield "meals", (student_id, rng.choice("AB"), weekday)
+        if rng.random() < health_share:
+            description, prescription = rng.choice(CONDITIONS)
+            yield "health_issues", (student_id, description, prescription, phone(student_id, 500000000))
+
+    request_id = 0
+    days = max(1, int(365 * maintenance_years))
+    # Binomial(2n, 0.5) requests per room: mean n, some spread between rooms
+    trials = int(requests_per_room_year * maintenance_years * 2)
+    for room in rooms:
+        count = sum(1 for _ in range(trials) if rng.random() < 0.5)
+        for _ in range(count):
+            request_id += 1
+            age = rng.randint(0, days)
+            if age > 30:
+                status = "Resolved"
+            else:
+                status = rng.choice(["Pending", "In Progress", "Resolved"])
+            created = now - timedelta(days=age, seconds=rng.randint(0, 86399))
+            yield "maintenancerequest", (request_id, status, room[0], rng.choice(ISSUES), created)
+
+
+# ---------------------- Loaders ----------------------
+def _insert_sql(table):
+    columns = COLUMNS[table]
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({db.placeholders(columns)})"
+
+
+def load_executemany(conn, rows, chunk_size, log):
+    # executemany turns each chunk into one multi-row INSERT
+    cursor = conn.cursor()
+    buffers = {table: [] for table in TABLES}
+    counts = {table: 0 for table in TABLES}
+
+    def flush(table):
+        if buffers[table]:
+            cursor.executemany(_insert_sql(table), buffers[table])
+            conn.commit()
+            counts[table] += len(buffers[table])
+            buffers[table].clear()
+
+    try:
+        for table, row in rows:
+            buffers[table].append(row)
+            if len(buffers[table]) >= chunk_size:
+                flush(table)
+                if table == "student" and counts["student"] % (chunk_size * 20) == 0:
+                    log(f"… {counts['student']:,} students loaded")
+        for table in TABLES:
+            flush(table)
+    finally:
+        cursor.close()
+    return counts
+
+
+def load_infile(conn, rows, log):
+    # Spools each table to a CSV file and bulk loads it server-side; needs
+    # local_infile enabled on the server.
+    counts = {table: 0 for table in TABLES}
+    with tempfile.TemporaryDirectory() as folder:
+        files = {table: open(os.path.join(folder, f"{table}.csv"), "w", newline="") for table in TABLES}
+        writers = {table: csv.writer(f) for table, f in files.items()}
+        try:
+            for table, row in rows:
+                writers[table].writerow(["\\N" if v is None else v for v in row])
+                counts[table] += 1
+        finally:
+            for f in files.values():
+                f.close()
+        cursor = conn.cursor()
+        try:
+            for table in TABLES:
+                path = os.path.join(folder, f"{table}.csv").replace("\\", "/")
+                cursor.execute(
+                    f"LOAD DATA LOCAL INFILE '{path}' INTO TABLE {table} "
+                    "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' "
+                    f"LINES TERMINATED BY '\\r\\n' ({', '.join(COLUMNS[table])})"
+                )
+                conn.commit()
+                log(f"… {table}: {counts[table]:,} rows")
+        finally:
+            cursor.close()
+    return counts
+
+
+def reset(conn):
+    dialect = backends.dialect(conn)
+    cursor = conn.cursor()
+    try:
+        cursor.execute(dialect.CHECKS_OFF)
+        for table in APP_TABLES + TABLES[::-1]:
+            cursor.execute(dialect.truncate(table))
+        conn.commit()
+        cursor.execute(dialect.CHECKS_ON)
+    finally:
+        cursor.close()
+
+
+def generate(conn, method="executemany", chunk_size=5000, log=print, **scale):
+    dialect = backends.dialect(conn)
+    if method == "infile" and dialect.name != "mysql":
+        raise ValueError("--method infile needs the MySQL backend")
+    started = time.perf_counter()
+    rows = generate_rows(**scale)
+    cursor = conn.cursor()
+    # Rows are consistent by construction; skip per-row checks while loading
+    cursor.execute(dialect.CHECKS_OFF)
+    try:
+        if method == "infile":
+            counts = load_infile(conn, rows, log)
+        else:
+            counts = load_executemany(conn, rows, chunk_size, log)
+        # Dashboard rollups from scratch rather than row by row
+        rollups.rebuild(cursor)
+        penalties.open_balances(cursor)
+        conn.commit()
+    finally:
+        cursor.execute(dialect.CHECKS_ON)
+        cursor.close()
+    elapsed = time.perf_counter() - started
+    for table in TABLES:
+        log(f"{table}: {counts[table]:,} rows")
+    log(f"✅ Generated in {elapsed:.1f}s")
+    return counts
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Load a synthetic dormitory dataset")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--buildings", type=int, default=2)
+    parser.add_argument("--floors", type=int, default=3)
+    parser.add_argument("--rooms-per-floor", type=int, default=10)
+    parser.add_argument("--capacities", default="1,2,2,3,4",
+                        help="room capacities to draw from, repeat a value to weight it")
+    parser.add_argument("--students", type=int, default=100)
+    parser.add_argument("--maintenance-years", type=float, default=1.0)
+    parser.add_argument("--requests-per-room-year", type=float, default=2.0)
+    parser.add_argument("--penalty-distribution", default="0:80,1:8,2:5,3:3,5:2,10:2",
+                        help="points:weight pairs")
+    parser.add_argument("--health-share", type=float, default=0.1,
+                        help="fraction of students with a health record")
+    parser.add_argument("--meal-days", type=int, default=7,
+                        help="maximum meal preference days per student")
+    parser.add_argument("--as-of", default=None,
+                        help="YYYY-MM-DD the history is generated back from (default: today)")
+    parser.add_argument("--method", choices=["executemany", "infile"], default="executemany")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--reset", action="store_true", help="empty all tables first")
+    return parser
+
+
+def scale_from_args(args):
+    return dict(
+        seed=args.seed,
+        buildings=args.buildings,
+        floors=args.floors,
+        rooms_per_floor=args.rooms_per_floor,
+        capacities=[int(c) for c in args.capacities.split(",")],
+        students=args.students,
+        maintenance_years=args.maintenance_years,
+        requests_per_room_year=args.requests_per_room_year,
+        penalty_distribution=parse_distribution(args.penalty_distribution),
+        health_share=args.health_share,
+        meal_days=args.meal_days,
+        now=datetime.strptime(args.as_of, "%Y-%m-%d") if args.as_of else
+            datetime.now().replace(hour=0, minute=0, second=0, microsecond=0),
+    )
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    conn = migrations.connect(allow_local_infile=args.method == "infile")
+    try:
+        migrations.migrate(conn)
+        if args.reset:
+            reset(conn)
+        generate(conn, method=args.method, chunk_size=args.chunk_size, **scale_from_args(args))
+    finally:
+        conn.close()
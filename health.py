@@ -0,0 +1,209 @@
+import argparse
+import csv
+import html
+import io
+import re
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from functools import partial
+
+import cache
+import db
+
+# ---------------------- Health Lookup ----------------------
+# Every health record joined with its student, room and building, loaded
+# with one query and kept current like the student search index: writes to
+# a student's health record, or that add, delete or move students, report
+# them with students_changed() and their records are patched into the
+# cached index after the commit.  Rooms never change building and
+# buildings are never renamed, so room and building writes don't concern
+# it.  Records are indexed by
+#
+#   building and room    -> who lives there
+#   condition keyword    -> words of description and prescription, matched
+#                           by prefix, so "asth" finds "Asthma"
+#   guardian contact     -> every student a guardian is listed for
+#
+# so "everyone with condition X in building Y and their guardians" is a few
+# set intersections instead of a scan of student and health_issues.  A
+# roster comes out as CSV, or as a plain HTML page to print.
+#
+#   python health.py --condition asthma --building 2 -o roster.csv
+
+ROSTER_COLUMNS = (
+    "student_id", "student_Name", "contact", "building_name", "room_id", "floor",
+    "description", "prescription", "guardian_contact",
+)
+# Cached under its own name, like the search index
+TABLES = ("health_index",)
+
+_SELECT = (
+    "SELECT h.student_id, s.student_Name, s.contact, r.building_id, b.building_name, "
+    "s.room_id, r.floor, h.description, h.prescription, h.guardian_contact "
+    "FROM health_issues h JOIN student s ON s.id = h.student_id "
+    "JOIN room r ON r.id = s.room_id LEFT JOIN building b ON b.id = r.building_id"
+)
+
+_WORDS = re.compile(r"\w+")
+
+
+def keywords(text):
+    return set(_WORDS.findall((text or "").casefold()))
+
+
+class HealthIndex:
+    def __init__(self, records=()):
+        self._lock = threading.Lock()
+        self._records = {}                          # student id -> roster row
+        self._ids_by_building = defaultdict(set)
+        self._ids_by_room = defaultdict(set)
+        self._ids_by_keyword = defaultdict(set)
+        self._ids_by_guardian = defaultdict(set)
+        for record in records:
+            self._add(record)
+        # Sorted for prefix lookups with bisect
+        self._keywords = sorted(self._ids_by_keyword)
+
+    @classmethod
+    def load(cls, guardian=None):
+        # Everyone, or only one guardian's students (served by idx_health_guardian)
+        where, params = (" WHERE h.guardian_contact = %s", [guardian.strip()]) if guardian else ("", [])
+        with db.cursor() as cursor:
+            cursor.execute(_SELECT + where, params)
+            return cls(cursor.fetchall())
+
+    # ---------------------- Updating ----------------------
+    def _groups(self, record):
+        # (index, value) pairs a record is filed under
+        words = keywords(record["description"]) | keywords(record["prescription"])
+        return [(self._ids_by_building, record["building_id"]), (self._ids_by_room, record["room_id"]),
+                (self._ids_by_guardian, record["guardian_contact"])] + \
+            [(self._ids_by_keyword, word) for word in words]
+
+    def _add(self, record):
+        self._records[record["student_id"]] = record
+        for ids_by, value in self._groups(record):
+            ids_by[value].add(record["student_id"])
+
+    def apply(self, student_ids, records):
+        # The given students now have exactly these records (none if they
+        # have no health record or were deleted)
+        with self._lock:
+            for student_id in student_ids:
+                record = self._records.pop(student_id, None)
+                if record is None:
+                    continue
+                for ids_by, value in self._groups(record):
+                    ids_by[value].discard(student_id)
+                    if not ids_by[value]:
+                        del ids_by[value]
+            for record in records:
+                self._add(record)
+            self._keywords = sorted(self._ids_by_keyword)
+
+    def __len__(self):
+        return len(self._records)
+
+    def _by_keyword(self, word):
+        ids = set()
+        start = bisect_left(self._keywords, word)
+        for keyword in self._keywords[start:]:
+            if not keyword.startswith(word):
+                break
+            ids |= self._ids_by_keyword[keyword]
+        return ids
+
+    def find(self, condition="", building_id=None, room_id=None):
+        # Roster rows matching every filter given, by building, room and student.
+        # Each word of `condition` must start a word of the description or prescription.
+        with self._lock:
+            candidates = []
+            if building_id is not None:
+                candidates.append(self._ids_by_building.get(building_id, set()))
+            if room_id is not None:
+                candidates.append(self._ids_by_room.get(room_id, set()))
+            candidates.extend(self._by_keyword(word) for word in sorted(keywords(condition)))
+            if candidates:
+                candidates.sort(key=len)
+                ids = candidates[0].intersection(*candidates[1:])
+            else:
+                ids = self._records
+            rows = [self._records[i] for i in ids]
+        rows.sort(key=lambda r: (r["building_name"] or "", r["room_id"], r["student_id"]))
+        return rows
+
+    def by_guardian(self, contact):
+        # Every student the given number is the guardian contact for
+        with self._lock:
+            return [self._records[i] for i in sorted(self._ids_by_guardian.get(contact.strip(), ()))]
+
+    def conditions(self):
+        # Keywords with how many students each one matches, most common first
+        with self._lock:
+            return sorted(((word, len(ids)) for word, ids in self._ids_by_keyword.items()),
+                          key=lambda item: (-item[1], item[0]))
+
+
+def get_index():
+    return cache.cached(TABLES, ("health_index",), HealthIndex.load)
+
+
+def students_changed(cursor, student_ids):
+    # As search.students_changed(): call from the write's transaction once
+    # these students' rows (or their health records) are written
+    ids = sorted(set(student_ids))
+    if not ids:
+        return
+    cursor.execute(f"{_SELECT} WHERE h.student_id IN ({db.placeholders(ids)})", ids)
+    records = cursor.fetchall()
+    db.after_commit(partial(cache.update, TABLES, ("health_index",), lambda index: index.apply(ids, records)))
+
+
+# ---------------------- Rosters ----------------------
+def roster_csv(rows):
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(ROSTER_COLUMNS)
+    writer.writerows([row[column] for column in ROSTER_COLUMNS] for row in rows)
+    return out.getvalue().encode("utf-8")
+
+
+def roster_html(rows, title):
+    # A bare page that prints as one table
+    head = "".join(f"<th>{html.escape(column)}</th>" for column in ROSTER_COLUMNS)
+    body = "".join(
+        "<tr>" + "".join(f"<td>{html.escape(str(row[c] if row[c] is not None else ''))}</td>"
+                         for c in ROSTER_COLUMNS) + "</tr>"
+        for row in rows
+    )
+    return (
+        f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{html.escape(title)}</title>"
+        "<style>body{font-family:sans-serif}table{border-collapse:collapse}"
+        "th,td{border:1px solid #999;padding:4px 8px;text-align:left}</style></head>"
+        f"<body><h2>{html.escape(title)}</h2><p>{len(rows)} student(s)</p>"
+        f"<table><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table></body></html>"
+    ).encode("utf-8")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Health roster by condition, building and room")
+    parser.add_argument("--condition", default="", help="keywords of the description or prescription")
+    parser.add_argument("--building", type=int)
+    parser.add_argument("--room", type=int)
+    parser.add_argument("--guardian", help="list the students this guardian contact is listed for")
+    parser.add_argument("-o", "--output", help="CSV file (default: print)")
+    args = parser.parse_args()
+
+    # A one-off guardian lookup reads only that guardian's records
+    index = HealthIndex.load(args.guardian)
+    if args.guardian:
+        rows = index.by_guardian(args.guardian)
+    else:
+        rows = index.find(args.condition, args.building, args.room)
+    if args.output:
+        with open(args.output, "wb") as f:
+            f.write(roster_csv(rows))
+    else:
+        print(roster_csv(rows).decode("utf-8"), end="")
+    print(f"✅ {len(rows):,} health record(s)")
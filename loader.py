@@ -0,0 +1,111 @@
+import cache
+import db
+
+# ---------------------- Per-Rerun Data Loader ----------------------
+# A page first declares the lookups its rerun will need (usually from the
+# widget values already in st.session_state), then reads them.  The first
+# read answers everything declared so far with one UNION ALL query, so a
+# form interaction costs one round trip instead of one per check.  Reads of
+# something not declared up front still work; they just trigger another
+# batch.  Create a new loader for every rerun.
+
+STUDENT_COLUMNS = (
+    "id", "student_Name", "contact", "room_id",
+    "health_id", "description", "prescription", "guardian_contact",
+)
+
+
+class DataLoader:
+    def __init__(self, use_cache=True):
+        self.use_cache = use_cache
+        self.round_trips = 0
+        self._wanted_ids = set()
+        self._wanted_contacts = set()
+        self._want_room_count = False
+        self._known_ids = set()
+        self._known_contacts = set()
+        self._by_id = {}
+        self._by_contact = {}
+        self._room_count = None
+
+    # ---------------------- Declaring ----------------------
+    def need_student(self, student_id):
+        if student_id and int(student_id) not in self._known_ids:
+            self._wanted_ids.add(int(student_id))
+
+    def need_contact(self, contact):
+        if contact and contact not in self._known_contacts:
+            self._wanted_contacts.add(contact)
+
+    def need_room_count(self):
+        if self._room_count is None:
+            self._want_room_count = True
+
+    # ---------------------- Batching ----------------------
+    def _query(self, ids, contacts, room_count):
+        parts, params = [], []
+        if ids or contacts:
+            conditions = []
+            if ids:
+                conditions.append(f"s.id IN ({db.placeholders(ids)})")
+                params.extend(ids)
+            if contacts:
+                conditions.append(f"s.contact IN ({db.placeholders(contacts)})")
+                params.extend(contacts)
+            parts.append(
+                "SELECT 'student' AS kind, s.id, s.student_Name, s.contact, s.room_id, "
+                "h.student_id AS health_id, h.description, h.prescription, h.guardian_contact "
+                "FROM student s LEFT JOIN health_issues h ON h.student_id = s.id "
+                f"WHERE {' OR '.join(conditions)}"
+            )
+        if room_count:
+            parts.append(
+                "SELECT 'room_count', COUNT(*), NULL, NULL, NULL, NULL, NULL, NULL, NULL FROM room"
+            )
+        with db.cursor(dictionary=False) as cursor:
+            cursor.execute(" UNION ALL ".join(parts), params)
+            return cursor.fetchall()
+
+    def _flush(self):
+        if not (self._wanted_ids or self._wanted_contacts or self._want_room_count):
+            return
+        ids = tuple(sorted(self._wanted_ids))
+        contacts = tuple(sorted(self._wanted_contacts))
+        room_count = self._want_room_count
+        self._wanted_ids, self._wanted_contacts, self._want_room_count = set(), set(), False
+
+        if self.use_cache:
+            tables = ("student", "health_issues") + (("room",) if room_count else ())
+            rows = cache.cached(tables, ("loader", ids, contacts, room_count),
+                                lambda: self._query(ids, contacts, room_count))
+        else:
+            rows = self._query(ids, contacts, room_count)
+        self.round_trips += 1
+
+        self._known_ids.update(ids)
+        self._known_contacts.update(contacts)
+        for kind, *values in rows:
+            if kind == "room_count":
+                self._room_count = values[0]
+            else:
+                student = dict(zip(STUDENT_COLUMNS, values))
+                self._by_id[student["id"]] = student
+                self._by_contact[student["contact"]] = student
+
+    # ---------------------- Reading ----------------------
+    def student(self, student_id):
+        # Student row joined with its health record (health_id is None when
+        # there is none), or None if the student doesn't exist
+        self.need_student(student_id)
+        self._flush()
+        return self._by_id.get(int(student_id))
+
+    def student_by_contact(self, contact):
+        self.need_contact(contact)
+        self._flush()
+        return self._by_contact.get(contact)
+
+    def room_count(self):
+        self.need_room_count()
+        self._flush()
+        return self._room_count
@@ -0,0 +1,223 @@
+import argparse
+import json
+import statistics
+import threading
+import time
+from datetime import datetime
+
+import allocator
+import backends
+import benchmark
+import cache
+import db
+import generate_data
+import meal_plans
+import migrations
+import occupancy
+import repository
+import writes
+
+# ---------------------- Move-in Load Test ----------------------
+# Many clerks registering students at once against a local database.  Each
+# clerk thread does what the Add Student form does: reads the free rooms,
+# takes the best one offered (so clerks collide on the same rooms, as they
+# do at move-in) and saves through the write pipeline, which retries
+# deadlocks and lock timeouts.  A clerk told the room filled up picks again
+# from a fresh list.  More students arrive than there are beds, so rooms
+# fill up and late arrivals are turned away.
+#
+# Afterwards every room is checked against the student table: no room may
+# hold more students than its capacity, and current_occupancy and the
+# dashboard rollup must match the real counts.  Exits 1 if any check fails.
+#
+#   python loadtest.py --sqlite /tmp/load.db --clerks 12
+#   python loadtest.py --database dorm_load --clerks 16 --rooms-per-floor 50
+
+FIRST_ID = 1000000      # above any generated student id
+MEAL_PLAN = dict.fromkeys(meal_plans.WEEKDAYS, "A")
+# Times a clerk picks again after being told the room filled up
+MAX_REPICKS = 5
+
+
+class Clerk(threading.Thread):
+    def __init__(self, run):
+        super().__init__(daemon=True)
+        self.run_state = run
+        self.latencies = []
+        self.outcomes = {"placed": 0, "moved_on": 0, "repicks": 0, "turned_away": 0, "gave_up": 0, "failed": 0}
+
+    def register(self, sid):
+        state = self.run_state
+        for _ in range(MAX_REPICKS + 1):
+            # The form's read: a fresh allocator, as after any room write
+            rooms = allocator.RoomAllocator.load().candidates(limit=occupancy.MAX_ALTERNATIVES + 1)
+            if not rooms:
+                return "turned_away"
+            if state.think:
+                time.sleep(state.think)
+            started = time.perf_counter()
+            future = state.pipeline.submit(
+                lambda cursor, rooms=rooms: repository.insert_student(
+                    cursor, sid, "Load Student", f"07{sid % 10**9:09d}", rooms[0]["id"], MEAL_PLAN,
+                    None, None, None, datetime.now(),
+                    alternatives=[r["id"] for r in rooms[1:]] if state.fallback else ()
+                ),
+                success=lambda room: room,
+                describe_error=lambda err: err,
+                invalidates=("student", "room"),
+            )
+            ok, result = future.result()
+            self.latencies.append((time.perf_counter() - started) * 1000)
+            if ok:
+                if result != rooms[0]["id"]:
+                    self.outcomes["moved_on"] += 1
+                return "placed"
+            if not isinstance(result, occupancy.RoomFullError):
+                state.errors.append(repr(result))
+                return "failed"
+            # Told the room filled up meanwhile: pick again from a fresh list
+            self.outcomes["repicks"] += 1
+        return "gave_up"
+
+    def run(self):
+        while True:
+            sid = self.run_state.next_student()
+            if sid is None:
+                return
+            self.outcomes[self.register(sid)] += 1
+
+
+class LoadRun:
+    def __init__(self, pipeline, arrivals, think, fallback):
+        self.pipeline = pipeline
+        self.think = think
+        self.fallback = fallback
+        self.errors = []
+        self._ids = iter(range(FIRST_ID, FIRST_ID + arrivals))
+        self._lock = threading.Lock()
+
+    def next_student(self):
+        with self._lock:
+            return next(self._ids, None)
+
+
+# ---------------------- Checks ----------------------
+def check(pool):
+    # {check name: offending rows}; all empty when the run was safe
+    with db.cursor(pool=pool) as cursor:
+        cursor.execute(
+            "SELECT r.id, r.capacity, r.current_occupancy, COUNT(s.id) AS students FROM room r "
+            "LEFT JOIN student s ON s.room_id = r.id "
+            "GROUP BY r.id, r.capacity, r.current_occupancy"
+        )
+        rooms = cursor.fetchall()
+        cursor.execute(
+            "SELECT o.building_id, o.floor, o.occupied, COALESCE(SUM(r.current_occupancy), 0) AS actual "
+            "FROM occupancy_rollup o LEFT JOIN room r "
+            "ON COALESCE(r.building_id, 0) = o.building_id AND r.floor = o.floor "
+            "GROUP BY o.building_id, o.floor, o.occupied"
+        )
+        floors = cursor.fetchall()
+    return {
+        "over_capacity": [r for r in rooms if r["students"] > r["capacity"]],
+        "occupancy_drift": [r for r in rooms if r["students"] != r["current_occupancy"]],
+        "rollup_drift": [f for f in floors if f["occupied"] != f["actual"]],
+    }
+
+
+def run(pool, clerks, arrivals, think, fallback, log=print):
+    pipeline = writes.WritePipeline(pool, cache.QueryCache(), workers=clerks, max_pending=clerks * 2)
+    state = LoadRun(pipeline, arrivals, think, fallback)
+    workers = [Clerk(state) for _ in range(clerks)]
+    started = time.perf_counter()
+    for clerk in workers:
+        clerk.start()
+    for clerk in workers:
+        clerk.join()
+    elapsed = time.perf_counter() - started
+
+    outcomes = {key: sum(c.outcomes[key] for c in workers) for key in workers[0].outcomes}
+    latencies = [ms for c in workers for ms in c.latencies]
+    results = {
+        "backend": pool.backend.name,
+        "clerks": clerks,
+        "arrivals": arrivals,
+        "fallback": fallback,
+        "seconds": round(elapsed, 3),
+        "registrations_per_s": round(outcomes["placed"] / elapsed, 1),
+        "save_p50_ms": round(statistics.median(latencies), 2) if latencies else None,
+        "save_p95_ms": round(benchmark.percentile(latencies, 95), 2) if latencies else None,
+        **outcomes,
+        "retries": pipeline.stats()["retries"],
+        "errors": state.errors[:10],
+        "checks": {name: len(rows) for name, rows in check(pool).items()},
+    }
+    log(f"{outcomes['placed']:,} placed ({outcomes['moved_on']:,} in a fallback room, "
+        f"{outcomes['repicks']:,} re-picks), {outcomes['turned_away']:,} turned away with no bed left, "
+        f"{outcomes['gave_up']:,} gave up, {outcomes['failed']:,} failed, {results['retries']:,} retries")
+    log(f"{results['registrations_per_s']:,} registrations/s, save p50 {results['save_p50_ms']} ms, "
+        f"p95 {results['save_p95_ms']} ms")
+    return results
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Concurrent room assignment load test")
+    parser.add_argument("--sqlite", help="SQLite database file (default: MySQL)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3306)
+    parser.add_argument("--user", default="root")
+    parser.add_argument("--password", default="")
+    parser.add_argument("--database", default="dorm_load")
+    parser.add_argument("--clerks", type=int, default=12)
+    parser.add_argument("--buildings", type=int, default=1)
+    parser.add_argument("--floors", type=int, default=4)
+    parser.add_argument("--rooms-per-floor", type=int, default=25)
+    parser.add_argument("--capacities", default="2,3,4")
+    parser.add_argument("--overbook", type=float, default=1.2,
+                        help="arriving students per bed")
+    parser.add_argument("--think-ms", type=float, default=0,
+                        help="pause between reading the free rooms and saving")
+    parser.add_argument("--no-fallback", action="store_true",
+                        help="fail when the picked room fills instead of trying the next listed one")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the results as JSON")
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    if args.sqlite:
+        backend = backends.SQLiteBackend(args.sqlite)
+    else:
+        backend = backends.MySQLBackend(host=args.host, port=args.port, user=args.user,
+                                        password=args.password, database=args.database)
+    # Clerks read while the pipeline's workers write
+    pool = db.ConnectionPool(size=args.clerks * 2, timeout=30, backend=backend)
+    db.use_pool(pool)
+
+    with pool.connection() as conn:
+        migrations.migrate(conn)
+        generate_data.reset(conn)
+        scale = generate_data.scale_from_args(generate_data.build_parser().parse_args([
+            "--seed", str(args.seed), "--buildings", str(args.buildings), "--floors", str(args.floors),
+            "--rooms-per-floor", str(args.rooms_per_floor), "--capacities", args.capacities,
+            "--students", "0", "--maintenance-years", "0",
+        ]))
+        generate_data.generate(conn, log=lambda message: None, **scale)
+    with db.cursor(pool=pool) as cursor:
+        cursor.execute("SELECT COALESCE(SUM(capacity), 0) AS beds FROM room")
+        beds = int(cursor.fetchone()["beds"])
+    print(f"⏳ {args.clerks} clerks registering {int(beds * args.overbook):,} students for {beds:,} beds")
+
+    results = run(pool, args.clerks, int(beds * args.overbook), args.think_ms / 1000, not args.no_fallback)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    failed = {name: count for name, count in results["checks"].items() if count}
+    if results["placed"] != beds and results["turned_away"]:
+        failed["beds_left_empty"] = beds - results["placed"]
+    if failed:
+        print(f"❌ Checks failed: {failed}")
+        raise SystemExit(1)
+    print(f"✅ No room over capacity; occupancy and rollups match the student table ({beds:,} beds)")
@@ -0,0 +1,124 @@
+import db
+import rollups
+
+# ---------------------- Maintenance Work Queue ----------------------
+# Requests get their id from the database.  Crews work a building's backlog
+# oldest first: claim() hands each crew a disjoint batch of pending
+# requests (SKIP LOCKED, so concurrent claims never wait on each other) and
+# transition() moves any number of requests to a new status with one
+# UPDATE.  Every status change is recorded in maintenance_status_history.
+
+STATUSES = ("Pending", "In Progress", "Resolved")
+OPEN_STATUSES = ("Pending", "In Progress")
+
+DEFAULT_QUEUE_SIZE = 50
+# claim() reads this many times `limit` candidates without locks, so rows
+# other crews are holding can be skipped without coming up short
+CLAIM_OVERSCAN = 4
+
+
+# ---------------------- Reads ----------------------
+def _oldest(cursor, building_id, statuses, limit):
+    # Served by idx_room_building, then idx_mr_room_status_created per room
+    cursor.execute(
+        "SELECT id, room_id, statues, description, date_created, claimed_by FROM maintenancerequest "
+        "WHERE room_id IN (SELECT id FROM room WHERE building_id = %s) "
+        f"AND statues IN ({db.placeholders(statuses)}) "
+        "ORDER BY date_created, id LIMIT %s",
+        (building_id, *statuses, limit)
+    )
+    return cursor.fetchall()
+
+
+def open_requests(building_id, statuses=OPEN_STATUSES, limit=DEFAULT_QUEUE_SIZE):
+    # The oldest `limit` requests in the building with one of `statuses`
+    with db.cursor() as cursor:
+        return _oldest(cursor, building_id, statuses, limit)
+
+
+def history(request_id):
+    with db.cursor() as cursor:
+        cursor.execute(
+            "SELECT old_status, new_status, changed_by, changed_at FROM maintenance_status_history "
+            "WHERE request_id = %s ORDER BY changed_at, id",
+            (request_id,)
+        )
+        return cursor.fetchall()
+
+
+# ---------------------- Writes ----------------------
+def create_request(cursor, room_id, description, status="Pending", changed_by=None):
+    # Returns the new request's id
+    if status not in STATUSES:
+        raise ValueError(f"Unknown status '{status}'")
+    cursor.execute(
+        "INSERT INTO maintenancerequest (room_id, description, statues) VALUES (%s, %s, %s)",
+        (room_id, description, status)
+    )
+    request_id = cursor.lastrowid
+    cursor.execute(
+        "INSERT INTO maintenance_status_history (request_id, old_status, new_status, changed_by) "
+        "VALUES (%s, %s, %s, %s)",
+        (request_id, None, status, changed_by)
+    )
+    rollups.request_opened(cursor, request_id)
+    return request_id
+
+
+def transition(cursor, request_ids, new_status, changed_by=None, claim=False):
+    # Moves every listed request not already in new_status; returns the ids
+    # that changed.  claim=True also records changed_by as the request's
+    # crew; moving back to Pending releases it.
+    if new_status not in STATUSES:
+        raise ValueError(f"Unknown status '{new_status}'")
+    ids = sorted(set(request_ids))
+    if not ids:
+        return []
+    cursor.execute(
+        "SELECT id, statues, DATE(date_created) AS created_day FROM maintenancerequest "
+        f"WHERE id IN ({db.placeholders(ids)}) AND statues <> %s ORDER BY id FOR UPDATE",
+        (*ids, new_status)
+    )
+    rows = cursor.fetchall()
+    if not rows:
+        return []
+    changed = [row["id"] for row in rows]
+
+    cursor.execute(
+        "INSERT INTO maintenance_status_history (request_id, old_status, new_status, changed_by) "
+        f"SELECT id, statues, %s, %s FROM maintenancerequest WHERE id IN ({db.placeholders(changed)})",
+        (new_status, changed_by, *changed)
+    )
+    assignments, params = ["statues = %s"], [new_status]
+    if new_status == "Pending":
+        assignments.append("claimed_by = NULL")
+    elif claim:
+        assignments.append("claimed_by = %s")
+        params.append(changed_by)
+    cursor.execute(
+        f"UPDATE maintenancerequest SET {', '.join(assignments)} WHERE id IN ({db.placeholders(changed)})",
+        (*params, *changed)
+    )
+
+    moves = {}
+    for row in rows:
+        key = (row["statues"], row["created_day"], new_status)
+        moves[key] = moves.get(key, 0) + 1
+    rollups.requests_moved(cursor, moves)
+    return changed
+
+
+def claim(cursor, building_id, crew, limit=10):
+    # Up to `limit` of the building's oldest pending requests, moved to In
+    # Progress for `crew`.  Candidates are read without locks; only those
+    # rows are then locked by primary key, skipping any another crew holds.
+    candidates = [row["id"] for row in _oldest(cursor, building_id, ("Pending",), limit * CLAIM_OVERSCAN)]
+    if not candidates:
+        return []
+    cursor.execute(
+        f"SELECT id FROM maintenancerequest WHERE id IN ({db.placeholders(candidates)}) AND statues = %s "
+        "ORDER BY date_created, id LIMIT %s FOR UPDATE SKIP LOCKED",
+        (*candidates, "Pending", limit)
+    )
+    claimed = [row["id"] for row in cursor.fetchall()]
+    return transition(cursor, claimed, "In Progress", changed_by=crew, claim=True)
@@ -0,0 +1,96 @@
+import backends
+import db
+
+# ---------------------- Weekly Meal Plans ----------------------
+# A plan is {weekday: "A" | "B" | None}; None (or a missing day) means no
+# meal that day.  Saving a plan replaces the student's whole week with one
+# DELETE and one multi-row upsert, and a group assignment does the same
+# for every student in a building or list of rooms with set-based
+# statements.  The kitchen forecast is aggregated by the database, so only
+# buildings x 7 x 2 counts ever leave it.
+
+WEEKDAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+MEAL_TYPES = ("A", "B")
+
+
+def _served(plan):
+    # [(weekday, meal_type)] in week order, validated
+    served = []
+    for weekday in WEEKDAYS:
+        meal_type = plan.get(weekday)
+        if meal_type:
+            if meal_type not in MEAL_TYPES:
+                raise ValueError(f"Meal type must be one of {', '.join(MEAL_TYPES)}")
+            served.append((weekday, meal_type))
+    return served
+
+
+# ---------------------- Reads ----------------------
+def student_plan(student_id):
+    with db.cursor() as cursor:
+        cursor.execute("SELECT weekday, meal_type FROM meals WHERE student_id = %s", (student_id,))
+        return {row["weekday"]: row["meal_type"] for row in cursor.fetchall()}
+
+
+def forecast():
+    # [{building_id, weekday, meal_type, meals}], at most buildings x 7 x 2 rows
+    with db.cursor() as cursor:
+        cursor.execute(
+            "SELECT r.building_id, m.weekday, m.meal_type, COUNT(*) AS meals "
+            "FROM meals m JOIN student s ON s.id = m.student_id JOIN room r ON r.id = s.room_id "
+            "GROUP BY r.building_id, m.weekday, m.meal_type"
+        )
+        return cursor.fetchall()
+
+
+# ---------------------- Writes ----------------------
+def save_plan(cursor, student_id, plan):
+    served = _served(plan)
+    days = [weekday for weekday, _ in served]
+    if days:
+        cursor.execute(
+            f"DELETE FROM meals WHERE student_id = %s AND weekday NOT IN ({db.placeholders(days)})",
+            (student_id, *days)
+        )
+        values = ", ".join(["(%s, %s, %s)"] * len(served))
+        cursor.execute(
+            backends.dialect(cursor).upsert("meals", ("student_id", "weekday"), ("meal_type",), f"VALUES {values}"),
+            [v for weekday, meal_type in served for v in (student_id, weekday, meal_type)]
+        )
+    else:
+        cursor.execute("DELETE FROM meals WHERE student_id = %s", (student_id,))
+
+
+def assign_plan(cursor, plan, building_id=None, room_ids=()):
+    # Gives every student in the building, or in the listed rooms, the same
+    # week.  Returns the number of students it applied to.
+    if building_id is not None:
+        where, params = "room_id IN (SELECT id FROM room WHERE building_id = %s)", [building_id]
+    elif room_ids:
+        where, params = f"room_id IN ({db.placeholders(room_ids)})", list(room_ids)
+    else:
+        raise ValueError("Pick a building or at least one room")
+    served = _served(plan)
+
+    cursor.execute(f"SELECT COUNT(*) AS students FROM student WHERE {where}", params)
+    students = cursor.fetchone()["students"]
+    if not students:
+        return 0
+
+    skipped = [weekday for weekday in WEEKDAYS if weekday not in dict(served)]
+    if skipped:
+        cursor.execute(
+            f"DELETE FROM meals WHERE weekday IN ({db.placeholders(skipped)}) "
+            f"AND student_id IN (SELECT id FROM student WHERE {where})",
+            skipped + params
+        )
+    if served:
+        days = " UNION ALL ".join(["SELECT %s AS weekday, %s AS meal_type"] * len(served))
+        cursor.execute(
+            backends.dialect(cursor).upsert(
+                "meals", ("student_id", "weekday"), ("meal_type",),
+                f"SELECT student.id, d.weekday, d.meal_type FROM student CROSS JOIN ({days}) d WHERE {where}"
+            ),
+            [v for day in served for v in day] + params
+        )
+    return students
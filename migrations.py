@@ -0,0 +1,423 @@
+import sys
+
+import backends
+import checkout
+import db
+import penalties
+import rollups
+
+# ---------------------- Schema Migrations ----------------------
+# Ordered, numbered up-migrations.  Applied versions are recorded in
+# schema_version, so re-running only applies what is missing.  MySQL
+# commits DDL implicitly, which is why steps that alter existing tables are
+# written as check-then-apply functions: a migration interrupted halfway
+# can simply be run again.
+#
+# Each backend has its own list under the same version numbers; the
+# embedded SQLite schema starts at version 4 (see SQLITE_MIGRATIONS).
+
+
+def _count(cursor, sql, params):
+    cursor.execute(sql, params)
+    return cursor.fetchone()[0]
+
+
+def column_exists(cursor, table, column):
+    return _count(cursor, """
+        SELECT COUNT(*) FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND LOWER(TABLE_NAME) = %s AND COLUMN_NAME = %s
+    """, (table, column)) > 0
+
+
+def index_exists(cursor, table, index):
+    return _count(cursor, """
+        SELECT COUNT(*) FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND LOWER(TABLE_NAME) = %s AND INDEX_NAME = %s
+    """, (table, index)) > 0
+
+
+def add_column(table, column, definition):
+    def step(cursor):
+        if not column_exists(cursor, table, column):
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    return step
+
+
+def add_index(table, index, columns):
+    def step(cursor):
+        if not index_exists(cursor, table, index):
+            cursor.execute(f"CREATE INDEX {index} ON {table} ({columns})")
+    return step
+
+
+def auto_increment(table, column):
+    def step(cursor):
+        cursor.execute("""
+            SELECT EXTRA FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND LOWER(TABLE_NAME) = %s AND COLUMN_NAME = %s
+        """, (table, column))
+        if "auto_increment" not in cursor.fetchone()[0].lower():
+            cursor.execute(f"ALTER TABLE {table} MODIFY {column} INT NOT NULL AUTO_INCREMENT")
+    return step
+
+
+def cascade_foreign_key(table, column, parent, name):
+    # Replaces whatever FK exists on table.column with an ON DELETE CASCADE one
+    def step(cursor):
+        cursor.execute("""
+            SELECT rc.CONSTRAINT_NAME, rc.DELETE_RULE
+            FROM information_schema.REFERENTIAL_CONSTRAINTS rc
+            JOIN information_schema.KEY_COLUMN_USAGE k
+              ON k.CONSTRAINT_SCHEMA = rc.CONSTRAINT_SCHEMA AND k.CONSTRAINT_NAME = rc.CONSTRAINT_NAME
+             AND k.TABLE_NAME = rc.TABLE_NAME
+            WHERE rc.CONSTRAINT_SCHEMA = DATABASE() AND LOWER(rc.TABLE_NAME) = %s AND k.COLUMN_NAME = %s
+        """, (table, column))
+        existing = cursor.fetchall()
+        if any(rule == "CASCADE" for _, rule in existing):
+            return
+        drops = [f"DROP FOREIGN KEY {constraint}" for constraint, _ in existing]
+        adds = [
+            f"ADD CONSTRAINT {name} FOREIGN KEY ({column}) REFERENCES {parent}(id) ON DELETE CASCADE"
+        ]
+        cursor.execute(f"ALTER TABLE {table} {', '.join(drops + adds)}")
+    return step
+
+
+MIGRATIONS = [
+    (1, "initial schema", [
+        """CREATE TABLE IF NOT EXISTS Building(
+                id INT PRIMARY KEY,
+                building_name VARCHAR (100) NOT NULL UNIQUE
+        );
+        """,
+        """CREATE TABLE IF NOT EXISTS room(
+                id INT PRIMARY KEY,
+                floor INT NOT NULL,
+                building_id INT,
+                capacity INT NOT NULL DEFAULT 0,
+                current_occupancy INT NOT NULL DEFAULT 0,
+                FOREIGN KEY (building_id) REFERENCES building(id)
+        );
+        """,
+        """CREATE TABLE IF NOT EXISTS student(
+                id INT PRIMARY KEY,
+                student_Name VARCHAR(100),
+                contact VARCHAR(11) NOT NULL UNIQUE,
+                room_id INT NOT NULL,
+                FOREIGN KEY (room_id) REFERENCES room(id)
+        );
+        """,
+        """CREATE TABLE IF NOT EXISTS MaintenanceRequest(
+                id INT PRIMARY KEY,
+                statues ENUM('Pending','In Progress','Resolved') NOT NULL DEFAULT 'Pending',
+                room_id INT NOT NULL,
+                description TEXT,
+                date_created TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (room_id) REFERENCES room(id)
+        );
+        """,
+        """CREATE TABLE IF NOT EXISTS Penalty(
+                student_id INT PRIMARY KEY,
+                total_points INT DEFAULT 0 CHECK (total_points >= 0),
+                last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                FOREIGN KEY (student_id) REFERENCES student(id)
+        );
+        """,
+        """CREATE TABLE IF NOT EXISTS Meals(
+                student_id INT,
+                meal_type ENUM('A','B') NOT NULL,
+                weekday VARCHAR(10) NOT NULL,
+                PRIMARY KEY (student_id, weekday),
+                FOREIGN KEY (student_id) REFERENCES student(id)
+        );
+        """,
+        """CREATE TABLE IF NOT EXISTS health_issues (
+                student_id INT PRIMARY KEY,
+                description TEXT,
+                prescription TEXT,
+                guardian_contact VARCHAR(11) NOT NULL,
+                FOREIGN KEY (student_id) REFERENCES student(id)
+        );
+        """,
+    ]),
+    (2, "room free slots for the allocator", [
+        add_column("room", "free_slots", "INT AS (capacity - current_occupancy) STORED"),
+        add_index("room", "idx_room_free_slots", "free_slots, building_id, floor"),
+    ]),
+    (3, "indexes for the app's query shapes", [
+        # Maintenance by room and status, newest/oldest first
+        add_index("maintenancerequest", "idx_mr_room_status_created", "room_id, statues, date_created"),
+        # Backlog by status across all rooms, oldest first
+        add_index("maintenancerequest", "idx_mr_status_created", "statues, date_created"),
+        # Per-student lookups on meals, penalty and health_issues are served
+        # by their primary keys, which lead with student_id.
+    ]),
+    (4, "cascade student deletes to dependent rows", [
+        cascade_foreign_key("meals", "student_id", "student", "fk_meals_student"),
+        cascade_foreign_key("health_issues", "student_id", "student", "fk_health_issues_student"),
+        cascade_foreign_key("penalty", "student_id", "student", "fk_penalty_student"),
+    ]),
+    (5, "dashboard rollup tables", rollups.SCHEMA + [rollups.rebuild]),
+    (6, "maintenance work queue", [
+        # Before the history table below starts referencing the column
+        auto_increment("maintenancerequest", "id"),
+        add_column("maintenancerequest", "claimed_by", "VARCHAR(100) NULL"),
+        """CREATE TABLE IF NOT EXISTS maintenance_status_history(
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                request_id INT NOT NULL,
+                old_status VARCHAR(20),
+                new_status VARCHAR(20) NOT NULL,
+                changed_by VARCHAR(100),
+                changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                INDEX idx_history_request (request_id, changed_at),
+                FOREIGN KEY (request_id) REFERENCES maintenancerequest(id) ON DELETE CASCADE
+        )""",
+    ]),
+    (7, "penalty ledger", [
+        """CREATE TABLE IF NOT EXISTS penalty_event(
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                student_id INT NOT NULL,
+                delta INT NOT NULL,
+                reason VARCHAR(200) NOT NULL,
+                actor VARCHAR(100),
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                INDEX idx_penalty_event_student (student_id, created_at),
+                FOREIGN KEY (student_id) REFERENCES student(id) ON DELETE CASCADE
+        )""",
+        penalties.open_balances,
+    ]),
+    (8, "graduation year and checkout archive", [
+        add_column("student", "graduation_year", "INT NULL"),
+        add_index("student", "idx_student_graduation", "graduation_year"),
+    ] + checkout.ARCHIVE_SCHEMA),
+    (9, "health guardian lookup", [
+        add_index("health_issues", "idx_health_guardian", "guardian_contact"),
+    ]),
+]
+
+# SQLite databases are always created fresh, so they start with the schema
+# as MySQL has it after version 4.  SQLite doesn't index foreign key columns
+# on its own the way InnoDB does, hence the extra idx_*_room/building ones.
+SQLITE_MIGRATIONS = [
+    (4, "initial schema", [
+        """CREATE TABLE IF NOT EXISTS building(
+                id INTEGER PRIMARY KEY,
+                building_name VARCHAR(100) NOT NULL UNIQUE
+        )""",
+        """CREATE TABLE IF NOT EXISTS room(
+                id INTEGER PRIMARY KEY,
+                floor INT NOT NULL,
+                building_id INT REFERENCES building(id),
+                capacity INT NOT NULL DEFAULT 0,
+                current_occupancy INT NOT NULL DEFAULT 0,
+                free_slots INT GENERATED ALWAYS AS (capacity - current_occupancy) STORED
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_room_free_slots ON room (free_slots, building_id, floor)",
+        "CREATE INDEX IF NOT EXISTS idx_room_building ON room (building_id)",
+        """CREATE TABLE IF NOT EXISTS student(
+                id INTEGER PRIMARY KEY,
+                student_Name VARCHAR(100),
+                contact VARCHAR(11) NOT NULL UNIQUE,
+                room_id INT NOT NULL REFERENCES room(id)
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_student_room ON student (room_id)",
+        """CREATE TABLE IF NOT EXISTS maintenancerequest(
+                id INTEGER PRIMARY KEY,
+                statues TEXT NOT NULL DEFAULT 'Pending'
+                    CHECK (statues IN ('Pending', 'In Progress', 'Resolved')),
+                room_id INT NOT NULL REFERENCES room(id),
+                description TEXT,
+                date_created TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_mr_room_status_created ON maintenancerequest (room_id, statues, date_created)",
+        "CREATE INDEX IF NOT EXISTS idx_mr_status_created ON maintenancerequest (statues, date_created)",
+        """CREATE TABLE IF NOT EXISTS penalty(
+                student_id INTEGER PRIMARY KEY REFERENCES student(id) ON DELETE CASCADE,
+                total_points INT DEFAULT 0 CHECK (total_points >= 0),
+                last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )""",
+        """CREATE TABLE IF NOT EXISTS meals(
+                student_id INT REFERENCES student(id) ON DELETE CASCADE,
+                meal_type TEXT NOT NULL CHECK (meal_type IN ('A', 'B')),
+                weekday VARCHAR(10) NOT NULL,
+                PRIMARY KEY (student_id, weekday)
+        ) WITHOUT ROWID""",
+        """CREATE TABLE IF NOT EXISTS health_issues(
+                student_id INTEGER PRIMARY KEY REFERENCES student(id) ON DELETE CASCADE,
+                description TEXT,
+                prescription TEXT,
+                guardian_contact VARCHAR(11) NOT NULL
+        )""",
+    ]),
+    (5, "dashboard rollup tables", rollups.SCHEMA + [rollups.rebuild]),
+    # maintenancerequest.id is an INTEGER PRIMARY KEY, which SQLite
+    # already assigns automatically
+    (6, "maintenance work queue", [
+        "ALTER TABLE maintenancerequest ADD COLUMN claimed_by VARCHAR(100)",
+        """CREATE TABLE IF NOT EXISTS maintenance_status_history(
+                id INTEGER PRIMARY KEY,
+                request_id INT NOT NULL REFERENCES maintenancerequest(id) ON DELETE CASCADE,
+                old_status VARCHAR(20),
+                new_status VARCHAR(20) NOT NULL,
+                changed_by VARCHAR(100),
+                changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_history_request ON maintenance_status_history (request_id, changed_at)",
+    ]),
+    (7, "penalty ledger", [
+        """CREATE TABLE IF NOT EXISTS penalty_event(
+                id INTEGER PRIMARY KEY,
+                student_id INT NOT NULL REFERENCES student(id) ON DELETE CASCADE,
+                delta INT NOT NULL,
+                reason VARCHAR(200) NOT NULL,
+                actor VARCHAR(100),
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_penalty_event_student ON penalty_event (student_id, created_at)",
+        penalties.open_balances,
+    ]),
+    (8, "graduation year and checkout archive", [
+        "ALTER TABLE student ADD COLUMN graduation_year INT",
+        "CREATE INDEX IF NOT EXISTS idx_student_graduation ON student (graduation_year)",
+    ] + checkout.ARCHIVE_SCHEMA),
+    (9, "health guardian lookup", [
+        "CREATE INDEX IF NOT EXISTS idx_health_guardian ON health_issues (guardian_contact)",
+    ]),
+]
+
+MIGRATIONS_BY_BACKEND = {"mysql": MIGRATIONS, "sqlite": SQLITE_MIGRATIONS}
+
+
+def applied_versions(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version(
+            version INT PRIMARY KEY,
+            description VARCHAR(200) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("SELECT version FROM schema_version")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def migrate(conn, log=print):
+    # Applies every pending migration in order; returns the versions applied
+    cursor = conn.cursor()
+    try:
+        done = applied_versions(cursor)
+        applied = []
+        for version, description, steps in MIGRATIONS_BY_BACKEND[backends.dialect(conn).name]:
+            if version in done:
+                continue
+            for step in steps:
+                if callable(step):
+                    step(cursor)
+                else:
+                    cursor.execute(step)
+            cursor.execute(
+                "INSERT INTO schema_version (version, description) VALUES (%s, %s)",
+                (version, description)
+            )
+            conn.commit()
+            applied.append(version)
+            log(f"✅ Applied migration {version}: {description}")
+        return applied
+    finally:
+        cursor.close()
+
+
+# ---------------------- Query Plan Check ----------------------
+# Hot queries issued by the app, with representative parameters.
+HOT_QUERIES = [
+    ("student by id", "SELECT id FROM student WHERE id = %s", (1,)),
+    ("student by contact", "SELECT contact FROM student WHERE contact = %s", ("01234567890",)),
+    ("students in room", "SELECT id FROM student WHERE room_id = %s", (101,)),
+    ("students graduating", "SELECT id FROM student WHERE graduation_year <= %s", (2026,)),
+    ("free rooms", "SELECT id, building_id, floor, free_slots FROM room WHERE free_slots > 0", ()),
+    ("maintenance by room and status",
+     "SELECT * FROM maintenancerequest WHERE room_id = %s AND statues = %s ORDER BY date_created",
+     (101, "Pending")),
+    ("maintenance backlog by status",
+     "SELECT * FROM maintenancerequest WHERE statues = %s ORDER BY date_created LIMIT 50",
+     ("Pending",)),
+    ("work queue for building",
+     "SELECT id FROM maintenancerequest WHERE room_id IN (SELECT id FROM room WHERE building_id = %s) "
+     "AND statues IN (%s, %s) ORDER BY date_created, id LIMIT 50",
+     (1, "Pending", "In Progress")),
+    ("status history for request",
+     "SELECT * FROM maintenance_status_history WHERE request_id = %s ORDER BY changed_at, id", (1,)),
+    ("meals for student", "SELECT * FROM meals WHERE student_id = %s", (1,)),
+    ("meals page after key",
+     "SELECT student_id, weekday, meal_type FROM meals "
+     "WHERE student_id >= %s AND ((student_id > %s) OR (student_id = %s AND weekday > %s)) "
+     "ORDER BY student_id, weekday LIMIT %s",
+     (1000, 1000, 1000, "Monday", 51)),
+    ("penalty for student", "SELECT * FROM penalty WHERE student_id = %s", (1,)),
+    ("penalty ledger for student",
+     "SELECT * FROM penalty_event WHERE student_id = %s ORDER BY created_at DESC, id DESC LIMIT 50", (1,)),
+    ("health record for student", "SELECT * FROM health_issues WHERE student_id = %s", (1,)),
+    ("health records by guardian",
+     "SELECT student_id FROM health_issues WHERE guardian_contact = %s", ("01234567890",)),
+]
+
+
+def _mysql_plan(cursor, sql, params):
+    # Yields (table, access type, key, full scan, estimated rows).  A full
+    # table scan (ALL) or full index scan (index) counts even when an index
+    # was possible: that is the optimizer ignoring it.
+    cursor.execute("EXPLAIN " + sql, params)
+    for row in cursor.fetchall():
+        yield row["table"], row["type"], row["key"], row["type"] in ("ALL", "index"), row["rows"]
+
+
+def _sqlite_plan(cursor, sql, params):
+    # Plan lines look like "SEARCH student USING INDEX idx_student_room (room_id=?)";
+    # any SCAN, even of an index, reads the whole thing.  SQLite gives no row estimate.
+    cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+    for row in cursor.fetchall():
+        words = row["detail"].split()
+        if words[0] not in ("SCAN", "SEARCH"):
+            continue
+        key = row["detail"].split(" USING ", 1)[1] if " USING " in row["detail"] else None
+        yield words[1], words[0], key, words[0] == "SCAN", None
+
+
+def check_query_plans(conn, queries=HOT_QUERIES, min_rows=0):
+    # Returns [(name, table, access type, key, ok)].  A query fails when its
+    # plan scans a whole table or index.  On a small development database
+    # MySQL may rightly prefer a scan; min_rows lets scans of tables it
+    # estimates below that many rows pass.
+    explain = _sqlite_plan if backends.dialect(conn).name == "sqlite" else _mysql_plan
+    cursor = conn.cursor(dictionary=True)
+    results = []
+    try:
+        for name, sql, params in queries:
+            for table, access, key, full_scan, rows in explain(cursor, sql, params):
+                ok = not full_scan or (rows is not None and rows < min_rows)
+                results.append((name, table, access, key, ok))
+    finally:
+        cursor.close()
+    return results
+
+
+def connect(**options):
+    # A standalone connection to the configured backend, outside the pool
+    return db.configured_backend().connect(**options)
+
+
+if __name__ == "__main__":
+    conn = connect()
+    try:
+        if "--check" in sys.argv:
+            # python migrations.py --check [--min-rows N]
+            min_rows = int(sys.argv[sys.argv.index("--min-rows") + 1]) if "--min-rows" in sys.argv else 0
+            failed = False
+            for name, table, access, key, ok in check_query_plans(conn, min_rows=min_rows):
+                failed = failed or not ok
+                print(f"{'✅' if ok else '❌'} {name}: {table} type={access} key={key}")
+            sys.exit(1 if failed else 0)
+        applied = migrate(conn)
+        if not applied:
+            print("✅ Schema is up to date")
+    finally:
+        conn.close()
@@ -0,0 +1,125 @@
+import backends
+import db
+import health
+import rollups
+import search
+
+# ---------------------- Room Occupancy ----------------------
+# current_occupancy is maintained by +1/-1 deltas on the caller's
+# transaction cursor, so it commits or rolls back together with the student
+# rows it describes.  The conditional UPDATE enforces capacity at write time
+# without a separate read.  The dashboard's occupancy rollup moves with it,
+# but the caller applies that delta (floor_changed) at the end of its
+# transaction: every writer on a floor shares that one rollup row.
+#
+# Lock order for every write that touches a room:
+#
+#   1. the existing student rows involved, in id order
+#   2. the room rows, in id order
+#   3. everything else the transaction writes
+#   4. the floors' occupancy_rollup rows, in (building, floor) order
+#   5. penalty_rollup, last of all
+#
+# Registering a student has no existing student row, so it starts at the
+# room.  Taking the room before the INSERT INTO student also keeps the
+# foreign key check from share-locking the row before the UPDATE, which
+# InnoDB would deadlock on when two clerks fill the same room.
+
+# Other listed rooms occupy_first() falls back to.  On MySQL a full room
+# that was tried stays locked until commit, so keep this short.
+MAX_ALTERNATIVES = 4
+
+
+class RoomFullError(Exception):
+    def __init__(self, room_id):
+        super().__init__(f"Room {room_id} is full or does not exist")
+        self.room_id = room_id
+
+
+def occupy(cursor, room_id):
+    cursor.execute(
+        "UPDATE room SET current_occupancy = current_occupancy + 1 "
+        "WHERE id = %s AND current_occupancy < capacity",
+        (room_id,)
+    )
+    if cursor.rowcount != 1:
+        raise RoomFullError(room_id)
+
+
+def occupy_first(cursor, room_ids):
+    # Takes a slot in the first room that still has one and returns its id:
+    # the room the clerk picked, then the alternatives listed after it
+    for room_id in room_ids[:MAX_ALTERNATIVES + 1]:
+        try:
+            occupy(cursor, room_id)
+            return room_id
+        except RoomFullError:
+            continue
+    raise RoomFullError(room_ids[0])
+
+
+def vacate(cursor, room_id):
+    # Returns whether the count went down (it never goes below zero)
+    cursor.execute(
+        "UPDATE room SET current_occupancy = current_occupancy - 1 "
+        "WHERE id = %s AND current_occupancy > 0",
+        (room_id,)
+    )
+    return cursor.rowcount == 1
+
+
+def floor_changed(cursor, deltas):
+    # deltas: {room_id: change}; call once, at the end of the transaction
+    deltas = {room_id: delta for room_id, delta in deltas.items() if delta}
+    if len(deltas) == 1:
+        rollups.occupancy_changed(cursor, *next(iter(deltas.items())))
+    elif deltas:
+        rollups.occupancy_changed_many(cursor, deltas)
+
+
+def move_student(cursor, student_id, new_room_id):
+    # Returns the room the student moved out of.  Both room rows are touched
+    # in id order so two opposite moves can't deadlock on each other.  Needs
+    # a dictionary cursor.
+    cursor.execute("SELECT room_id FROM student WHERE id = %s FOR UPDATE", (student_id,))
+    row = cursor.fetchone()
+    if row is None:
+        raise LookupError(f"Student ID {student_id} not found")
+    old_room_id = row["room_id"]
+    if old_room_id == new_room_id:
+        return old_room_id
+
+    deltas = {}
+    for room_id in sorted((old_room_id, new_room_id)):
+        if room_id == new_room_id:
+            occupy(cursor, new_room_id)
+            deltas[new_room_id] = 1
+        elif vacate(cursor, old_room_id):
+            deltas[old_room_id] = -1
+    cursor.execute("UPDATE student SET room_id = %s WHERE id = %s", (new_room_id, student_id))
+    search.students_changed(cursor, [student_id])
+    health.students_changed(cursor, [student_id])
+    floor_changed(cursor, deltas)
+    return old_room_id
+
+
+# ---------------------- Bulk Reconciliation ----------------------
+def reconcile_rooms(cursor):
+    # Recomputes every room from the student table and only rewrites rooms
+    # whose stored count drifted.  Returns the rooms fixed.
+    cursor.execute(backends.dialect(cursor).RECONCILE_OCCUPANCY)
+    fixed = cursor.rowcount
+    if fixed:
+        rollups.rebuild_occupancy(cursor)
+    return fixed
+
+
+def reconcile():
+    # The occupancy rollup is rebuilt too, so drop what the dashboard cached from it
+    with db.transaction(invalidates=rollups.SOURCE_TABLES) as cursor:
+        return reconcile_rooms(cursor)
+
+
+if __name__ == "__main__":
+    fixed = reconcile()
+    print(f"✅ Occupancy reconciled, {fixed} room(s) corrected")
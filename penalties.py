@@ -0,0 +1,201 @@
+import argparse
+from datetime import datetime
+
+import db
+import rollups
+
+# ---------------------- Penalty Ledger ----------------------
+# Every change to a student's points is an event in penalty_event (student,
+# delta, reason, actor, time), which is only ever appended to.
+# penalty.total_points stays the running sum, updated in the same
+# transaction as the events, so pages keep reading one row per student.
+#
+# Totals never go below zero: a deduction larger than the balance is
+# recorded as the amount actually taken off, keeping the ledger and the
+# totals in agreement.  verify() checks that agreement, repair() restores
+# it from the ledger, and compact() folds old events into one per student:
+#
+#   python penalties.py verify
+#   python penalties.py compact --before 2024-01-01
+
+OPENING_BALANCE = "Opening balance"
+DEFAULT_HISTORY = 50
+# Students whose events compact() folds per DELETE
+COMPACT_BATCH = 1000
+
+
+def _applied(delta):
+    # The SQL for what `delta` does to total_points, floored at zero
+    return f"CASE WHEN total_points + {int(delta)} < 0 THEN -total_points ELSE {int(delta)} END"
+
+
+# ---------------------- Reads ----------------------
+def record(student_id):
+    with db.cursor() as cursor:
+        cursor.execute("SELECT * FROM penalty WHERE student_id = %s", (student_id,))
+        return cursor.fetchone()
+
+
+def history(student_id, limit=DEFAULT_HISTORY):
+    # Newest first, served by idx_penalty_event_student
+    with db.cursor() as cursor:
+        cursor.execute(
+            "SELECT delta, reason, actor, created_at FROM penalty_event "
+            "WHERE student_id = %s ORDER BY created_at DESC, id DESC LIMIT %s",
+            (student_id, limit)
+        )
+        return cursor.fetchall()
+
+
+# ---------------------- Writes ----------------------
+def _select_students(student_ids, building_id, floor, room_ids):
+    # The WHERE clause over penalty for a list or a filter of students
+    if student_ids:
+        ids = sorted(set(student_ids))
+        return f"student_id IN ({db.placeholders(ids)})", ids
+    clauses, params = [], []
+    if building_id is not None:
+        clauses.append("building_id = %s")
+        params.append(building_id)
+    if floor is not None:
+        clauses.append("floor = %s")
+        params.append(floor)
+    if room_ids:
+        clauses.append(f"id IN ({db.placeholders(room_ids)})")
+        params.extend(room_ids)
+    if not clauses:
+        raise ValueError("Pick students by ID, building, floor or room")
+    return (
+        "student_id IN (SELECT s.id FROM student s WHERE s.room_id IN "
+        f"(SELECT id FROM room WHERE {' AND '.join(clauses)}))",
+        params
+    )
+
+
+def adjust(cursor, delta, reason, actor=None, updated=None,
+           student_ids=(), building_id=None, floor=None, room_ids=()):
+    # Adds `delta` points to every selected student with one INSERT ...
+    # SELECT into the ledger and one UPDATE of the totals.  Returns the
+    # number of students adjusted.
+    delta = int(delta)
+    if not delta:
+        raise ValueError("The adjustment must add or remove points")
+    if not reason:
+        raise ValueError("A reason is required")
+    updated = updated or datetime.now()
+    where, params = _select_students(student_ids, building_id, floor, room_ids)
+
+    # Locks the rows, and gives the totals the rollup moves from
+    cursor.execute(
+        f"SELECT total_points, COUNT(*) AS students FROM penalty WHERE {where} "
+        "GROUP BY total_points ORDER BY total_points FOR UPDATE",
+        params
+    )
+    before = cursor.fetchall()
+    if not before:
+        return 0
+    cursor.execute(
+        "INSERT INTO penalty_event (student_id, delta, reason, actor, created_at) "
+        f"SELECT student_id, {_applied(delta)}, %s, %s, %s FROM penalty "
+        f"WHERE {where} AND {_applied(delta)} <> 0",
+        [reason, actor, updated] + params
+    )
+    cursor.execute(
+        f"UPDATE penalty SET total_points = total_points + {_applied(delta)}, last_updated = %s "
+        f"WHERE {where} AND {_applied(delta)} <> 0",
+        [updated] + params
+    )
+    for row in before:
+        rollups.penalty_changed(cursor, row["total_points"], max(row["total_points"] + delta, 0),
+                                students=row["students"])
+    return sum(row["students"] for row in before)
+
+
+def open_balances(cursor):
+    # An opening event for every non-zero total with no ledger yet, so
+    # totals loaded without one (the migration, generate_data) verify cleanly
+    cursor.execute(
+        "INSERT INTO penalty_event (student_id, delta, reason, created_at) "
+        "SELECT p.student_id, p.total_points, %s, COALESCE(p.last_updated, CURRENT_TIMESTAMP) FROM penalty p "
+        "WHERE p.total_points <> 0 "
+        "AND NOT EXISTS (SELECT 1 FROM penalty_event e WHERE e.student_id = p.student_id)",
+        (OPENING_BALANCE,)
+    )
+
+
+# ---------------------- Verification & Compaction ----------------------
+def verify(cursor):
+    # [{student_id, total_points, ledger}] for every total that disagrees
+    # with the sum of its events
+    cursor.execute(
+        "SELECT p.student_id, p.total_points, COALESCE(e.ledger, 0) AS ledger FROM penalty p "
+        "LEFT JOIN (SELECT student_id, SUM(delta) AS ledger FROM penalty_event GROUP BY student_id) e "
+        "ON e.student_id = p.student_id "
+        "WHERE p.total_points <> COALESCE(e.ledger, 0) ORDER BY p.student_id"
+    )
+    return cursor.fetchall()
+
+
+def repair(cursor):
+    # Resets drifted totals to their ledger sums; returns how many changed
+    drifted = verify(cursor)
+    for row in drifted:
+        cursor.execute(
+            "UPDATE penalty SET total_points = %s WHERE student_id = %s",
+            (max(row["ledger"], 0), row["student_id"])
+        )
+        rollups.penalty_changed(cursor, row["total_points"], max(row["ledger"], 0))
+    return len(drifted)
+
+
+def compact(cursor, before, batch_size=COMPACT_BATCH):
+    # Replaces each student's events before `before` with one event carrying
+    # their sum; totals are unchanged.  Returns the number of events removed.
+    # Events appended meanwhile have higher ids and are left alone.
+    cursor.execute("SELECT MAX(id) AS last_id FROM penalty_event")
+    last_id = cursor.fetchone()["last_id"]
+    if last_id is None:
+        return 0
+    cursor.execute(
+        "SELECT student_id, SUM(delta) AS delta, MAX(created_at) AS created_at FROM penalty_event "
+        "WHERE id <= %s AND created_at < %s GROUP BY student_id HAVING COUNT(*) > 1",
+        (last_id, before)
+    )
+    folded = cursor.fetchall()
+    reason = f"Compacted events before {before:%Y-%m-%d}"
+    removed = 0
+    for start in range(0, len(folded), batch_size):
+        batch = folded[start:start + batch_size]
+        ids = [row["student_id"] for row in batch]
+        cursor.execute(
+            f"DELETE FROM penalty_event WHERE student_id IN ({db.placeholders(ids)}) "
+            "AND id <= %s AND created_at < %s",
+            (*ids, last_id, before)
+        )
+        removed += cursor.rowcount
+        cursor.executemany(
+            "INSERT INTO penalty_event (student_id, delta, reason, created_at) VALUES (%s, %s, %s, %s)",
+            [(row["student_id"], row["delta"], reason, row["created_at"]) for row in batch]
+        )
+    return removed - len(folded)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check or compact the penalty ledger")
+    parser.add_argument("command", choices=["verify", "repair", "compact"])
+    parser.add_argument("--before", type=lambda value: datetime.strptime(value, "%Y-%m-%d"),
+                        help="compact: fold events created before YYYY-MM-DD")
+    args = parser.parse_args()
+
+    with db.transaction(invalidates=("penalty",)) as cursor:
+        if args.command == "verify":
+            drifted = verify(cursor)
+            for row in drifted:
+                print(f"Student {row['student_id']}: total {row['total_points']}, ledger {row['ledger']}")
+            print(f"{'❌' if drifted else '✅'} {len(drifted)} totals disagree with the ledger")
+        elif args.command == "repair":
+            print(f"✅ Repaired {repair(cursor)} totals from the ledger")
+        else:
+            if args.before is None:
+                parser.error("compact needs --before")
+            print(f"✅ Compacted {compact(cursor, args.before)} events")
@@ -0,0 +1,270 @@
+import argparse
+import json
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from functools import lru_cache
+
+# ---------------------- Query Profiling ----------------------
+# Cursors handed out by the pool are wrapped so every statement records its
+# fingerprint (the SQL with literals and IN lists folded), how many
+# parameters it bound, the rows it returned or changed, its wall time
+# including fetches, and the page or action that issued it.
+#
+#   - the current rerun keeps its own queries, for the sidebar panel
+#   - statements at or over slow_ms are kept in memory and appended to a
+#     JSON-lines log, one object per line, for offline analysis:
+#
+#       python profiling.py slow_queries.jsonl
+#
+# The cost per statement is two clock reads, a cached fingerprint lookup
+# and a short locked update, so it is on by default.  Settings come from
+# the [profiling] secrets section (see db.get_pool).
+
+DEFAULT_SLOW_MS = 200
+DEFAULT_MAX_SLOW = 100          # slow queries kept in memory
+DEFAULT_RERUN_QUERIES = 200     # queries a rerun keeps in detail; totals count all
+
+_SPACE = re.compile(r"\s+")
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_REPEATS = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+
+# The page or action running on this thread, and the rerun being profiled
+_scope = ContextVar("profiling_scope", default=None)
+_rerun = ContextVar("profiling_rerun", default=None)
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(sql):
+    # "SELECT * FROM student WHERE id IN (%s, %s)" -> "... WHERE id IN (...)"
+    sql = _LITERALS.sub("?", _SPACE.sub(" ", sql.strip()).replace("%s", "?"))
+    return _REPEATS.sub("(...)", _LISTS.sub("(...)", sql))
+
+
+@contextmanager
+def scope(label):
+    # Attributes the queries issued inside the block to `label`
+    token = _scope.set(label)
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+def current_scope():
+    return _scope.get()
+
+
+class RerunProfile:
+    # One script run's database work
+    def __init__(self, max_queries=DEFAULT_RERUN_QUERIES):
+        self.started = time.perf_counter()
+        self.max_queries = max_queries
+        self.round_trips = 0
+        self.db_ms = 0.0
+        self.queries = []
+
+    def add(self, query):
+        self.round_trips += 1
+        self.db_ms += query["ms"]
+        if len(self.queries) < self.max_queries:
+            self.queries.append(query)
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+
+def start_rerun():
+    # Call at the top of the script; queries on this thread count towards it
+    profile = RerunProfile()
+    _rerun.set(profile)
+    return profile
+
+
+class InstrumentedCursor:
+    # A statement's record stays open while its rows are fetched and is
+    # closed by the next execute or by close()
+    def __init__(self, cursor, profiler):
+        self.wrapped = cursor
+        self._profiler = profiler
+        self._query = None
+        self._fetched = False
+
+    def _finish(self):
+        query, self._query = self._query, None
+        if query is None:
+            return
+        if not self._fetched:
+            # Nothing fetched: an INSERT/UPDATE/DELETE, report rows changed
+            query["rows"] = max(self.wrapped.rowcount or 0, 0)
+        query["ms"] = round(query["ms"], 3)
+        self._profiler.record(query)
+
+    def _run(self, method, sql, params, count):
+        self._finish()
+        self._fetched = False
+        self._query = {
+            "at": time.time(), "scope": _scope.get(), "fingerprint": fingerprint(sql),
+            "params": count, "rows": 0, "ms": 0.0, "error": None,
+        }
+        started = time.perf_counter()
+        try:
+            return method(sql, params)
+        except Exception as err:
+            self._query["error"] = type(err).__name__
+            raise
+        finally:
+            self._query["ms"] += (time.perf_counter() - started) * 1000
+
+    def execute(self, sql, params=()):
+        return self._run(self.wrapped.execute, sql, params, len(params or ()))
+
+    def executemany(self, sql, rows):
+        rows = list(rows)
+        return self._run(self.wrapped.executemany, sql, rows, sum(len(row) for row in rows))
+
+    def _fetch(self, method, *args):
+        started = time.perf_counter()
+        result = method(*args)
+        if self._query is not None:
+            self._query["ms"] += (time.perf_counter() - started) * 1000
+            self._query["rows"] += len(result) if isinstance(result, list) else result is not None
+            self._fetched = True
+        return result
+
+    def fetchone(self):
+        return self._fetch(self.wrapped.fetchone)
+
+    def fetchmany(self, size):
+        return self._fetch(self.wrapped.fetchmany, size)
+
+    def fetchall(self):
+        return self._fetch(self.wrapped.fetchall)
+
+    def close(self):
+        try:
+            self._finish()
+        finally:
+            self.wrapped.close()
+
+    def __getattr__(self, name):
+        # rowcount, lastrowid, description, ...
+        return getattr(self.wrapped, name)
+
+
+def _line(query):
+    record = dict(query, at=datetime.fromtimestamp(query["at"]).isoformat(timespec="milliseconds"))
+    return json.dumps(record, default=str) + "\n"
+
+
+def to_jsonl(queries):
+    return "".join(_line(query) for query in queries)
+
+
+class QueryProfiler:
+    def __init__(self, slow_ms=DEFAULT_SLOW_MS, log_path=None, max_slow=DEFAULT_MAX_SLOW):
+        self.slow_ms = slow_ms
+        self.log_path = log_path
+        self._slow = deque(maxlen=max_slow)
+        self._by_fingerprint = {}   # fingerprint -> [count, total_ms, max_ms, rows]
+        self._lock = threading.Lock()
+        self._log = open(log_path, "a", encoding="utf-8") if log_path else None
+        self._stats = {"queries": 0, "errors": 0, "slow": 0, "db_ms": 0.0}
+
+    def wrap(self, cursor):
+        return InstrumentedCursor(cursor, self)
+
+    def record(self, query):
+        profile = _rerun.get()
+        if profile is not None:
+            profile.add(query)
+        slow = query["ms"] >= self.slow_ms
+        line = _line(query) if slow and self._log else None
+        with self._lock:
+            self._stats["queries"] += 1
+            self._stats["db_ms"] += query["ms"]
+            if query["error"]:
+                self._stats["errors"] += 1
+            totals = self._by_fingerprint.setdefault(query["fingerprint"], [0, 0.0, 0.0, 0])
+            totals[0] += 1
+            totals[1] += query["ms"]
+            totals[2] = max(totals[2], query["ms"])
+            totals[3] += query["rows"]
+            if slow:
+                self._stats["slow"] += 1
+                self._slow.append(query)
+                if line:
+                    self._log.write(line)
+                    self._log.flush()
+
+    def top(self, limit=10):
+        # Fingerprints by total time spent, across the process
+        with self._lock:
+            items = [(fp, *totals) for fp, totals in self._by_fingerprint.items()]
+        items.sort(key=lambda item: item[2], reverse=True)
+        return [
+            {"fingerprint": fp, "count": count, "total_ms": round(total, 1),
+             "mean_ms": round(total / count, 2), "max_ms": round(longest, 1), "rows": rows}
+            for fp, count, total, longest, rows in items[:limit]
+        ]
+
+    def slow_queries(self):
+        with self._lock:
+            return list(reversed(self._slow))
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats["db_ms"] = round(stats["db_ms"], 1)
+        stats["fingerprints"] = len(self._by_fingerprint)
+        stats["slow_ms"] = self.slow_ms
+        stats["log_path"] = self.log_path
+        return stats
+
+
+def from_settings(config):
+    # None when [profiling] enabled = false, so cursors go unwrapped
+    if not config.get("enabled", True):
+        return None
+    return QueryProfiler(
+        slow_ms=float(config.get("slow_ms", DEFAULT_SLOW_MS)),
+        log_path=config.get("log_path"),
+        max_slow=int(config.get("max_slow", DEFAULT_MAX_SLOW)),
+    )
+
+
+# ---------------------- Offline Analysis ----------------------
+def summarize(lines):
+    # Per fingerprint: count, total, p95 and max ms from a JSON-lines log
+    times = {}
+    for line in lines:
+        if line.strip():
+            query = json.loads(line)
+            times.setdefault(query["fingerprint"], []).append(query["ms"])
+    summary = []
+    for fp, values in times.items():
+        values.sort()
+        summary.append({
+            "fingerprint": fp, "count": len(values), "total_ms": round(sum(values), 1),
+            "p95_ms": values[min(len(values) - 1, int(len(values) * 0.95))], "max_ms": values[-1],
+        })
+    return sorted(summary, key=lambda row: row["total_ms"], reverse=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize a JSON-lines query log")
+    parser.add_argument("log")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    with open(args.log, encoding="utf-8") as log:
+        summary = summarize(log)
+    for row in summary[:args.top]:
+        print(f"{row['total_ms']:>10.1f} ms  {row['count']:>6}x  p95 {row['p95_ms']:>8.1f}  "
+              f"max {row['max_ms']:>8.1f}  {row['fingerprint']}")
+    print(f"✅ {sum(row['count'] for row in summary):,} queries, {len(summary):,} fingerprints")
@@ -0,0 +1,111 @@
+import db
+import health
+import meal_plans
+import occupancy
+import rollups
+import search
+
+# ---------------------- Data Access ----------------------
+# The app's remaining reads and writes, kept out of the UI code.  SQL here
+# sticks to what both backends accept; anything engine-specific lives on
+# the backend classes in backends.py.
+#
+# Writes take the caller's transaction cursor (usually from the background
+# write pipeline, which submits them with partial()), so several of them
+# can commit together.  Reads open their own pooled cursor.
+
+
+# ---------------------- Reads ----------------------
+def buildings():
+    with db.cursor() as cursor:
+        cursor.execute("SELECT id, building_name FROM building ORDER BY id")
+        return cursor.fetchall()
+
+
+# ---------------------- Writes ----------------------
+def delete_student(cursor, student_id):
+    cursor.execute(
+        "SELECT s.room_id, p.total_points FROM student s "
+        "LEFT JOIN penalty p ON p.student_id = s.id WHERE s.id = %s FOR UPDATE",
+        (student_id,)
+    )
+    result = cursor.fetchone()
+    if result is None:
+        raise LookupError(f"Student ID {student_id} not found")
+    # Student, room, then the rest (see occupancy.py); meals, health_issues
+    # and penalty rows go with the student (ON DELETE CASCADE)
+    vacated = occupancy.vacate(cursor, result["room_id"])
+    cursor.execute("DELETE FROM student WHERE id = %s", (student_id,))
+    search.students_changed(cursor, [student_id])
+    health.students_changed(cursor, [student_id])
+    if vacated:
+        occupancy.floor_changed(cursor, {result["room_id"]: -1})
+    if result["total_points"] is not None:
+        rollups.penalty_changed(cursor, result["total_points"], None)
+
+
+def insert_student(cursor, sid, name, contact, room_id, meal_plan,
+                   health_desc, prescription, guardian_contact, created, alternatives=(), graduation_year=None):
+    # meal_plan: {weekday: meal type}, see meal_plans.py.  If room_id fills
+    # up first, the next free room in `alternatives` is used; returns the
+    # room the student was placed in.
+    # The room first (see occupancy.py): a full room fails before any other work
+    room_id = occupancy.occupy_first(cursor, [room_id, *alternatives])
+    cursor.execute(
+        "INSERT INTO student (id, student_Name, contact, room_id, graduation_year) VALUES (%s, %s, %s, %s, %s)",
+        (sid, name, contact, room_id, graduation_year)
+    )
+    meal_plans.save_plan(cursor, sid, meal_plan)
+    cursor.execute(
+        "INSERT INTO penalty (student_id, total_points, last_updated) VALUES (%s, %s, %s)",
+        (sid, 0, created)
+    )
+    if health_desc or prescription or guardian_contact:
+        cursor.execute(
+            "INSERT INTO health_issues (student_id, description, prescription, guardian_contact) VALUES (%s, %s, %s, %s)",
+            (sid, health_desc if health_desc else None,
+             prescription if prescription else None,
+             guardian_contact)
+        )
+    search.students_changed(cursor, [sid])
+    health.students_changed(cursor, [sid])
+    # The shared rollup rows last, so they are held as briefly as possible:
+    # every registration on the floor, then every new student, bumps them
+    occupancy.floor_changed(cursor, {room_id: 1})
+    rollups.penalty_changed(cursor, None, 0)
+    return room_id
+
+
+def insert_room(cursor, room_id, floor, building_id, capacity):
+    cursor.execute(
+        "INSERT INTO room (id, floor, building_id, capacity, current_occupancy) VALUES (%s, %s, %s, %s, %s)",
+        (room_id, floor, building_id, capacity, 0)
+    )
+    rollups.room_added(cursor, room_id)
+
+
+def insert_building(cursor, building_id, building_name):
+    cursor.execute(
+        "INSERT INTO building (id, building_name) VALUES (%s, %s)",
+        (building_id, building_name)
+    )
+
+
+def save_health_record(cursor, student_id, exists, health_desc, prescription, guardian_contact):
+    if exists:
+        cursor.execute(
+            "UPDATE health_issues SET description = %s, prescription = %s, guardian_contact = %s WHERE student_id = %s",
+            (health_desc if health_desc else None,
+             prescription if prescription else None,
+             guardian_contact,
+             student_id)
+        )
+    else:
+        cursor.execute(
+            "INSERT INTO health_issues (student_id, description, prescription, guardian_contact) VALUES (%s, %s, %s, %s)",
+            (student_id,
+             health_desc if health_desc else None,
+             prescription if prescription else None,
+             guardian_contact)
+        )
+    health.students_changed(cursor, [student_id])
@@ -0,0 +1,183 @@
+import backends
+import db
+
+# ---------------------- Dashboard Rollups ----------------------
+# Pre-aggregated tables behind the dashboard, a few hundred rows at most:
+#
+#   occupancy_rollup    rooms, beds and occupied beds per (building, floor)
+#   maintenance_rollup  open (not Resolved) requests per (status, day created)
+#   penalty_rollup      students per total_points value
+#
+# The write paths keep them current with small deltas on their own
+# transaction cursor, so a rollup commits or rolls back with the rows it
+# summarises.  rebuild() recomputes everything from the base tables, for
+# bulk loads and for repairing drift (python rollups.py).
+
+# Cached dashboard reads are keyed on the base tables each rollup
+# summarises; every write path that changes a rollup invalidates them.
+SOURCE_TABLES = ("room", "maintenancerequest", "penalty")
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS occupancy_rollup(
+            building_id INT NOT NULL,
+            floor INT NOT NULL,
+            rooms INT NOT NULL DEFAULT 0,
+            beds INT NOT NULL DEFAULT 0,
+            occupied INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (building_id, floor)
+    )""",
+    """CREATE TABLE IF NOT EXISTS maintenance_rollup(
+            statues VARCHAR(20) NOT NULL,
+            created_day DATE NOT NULL,
+            requests INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (statues, created_day)
+    )""",
+    """CREATE TABLE IF NOT EXISTS penalty_rollup(
+            total_points INT PRIMARY KEY,
+            students INT NOT NULL DEFAULT 0
+    )""",
+]
+
+# Requests in these states no longer count towards the backlog
+CLOSED_STATUSES = ("Resolved",)
+
+# Backlog age buckets in days, as bins for pandas.cut: (-1, 0] is today
+AGE_BINS = [-1, 0, 7, 30, float("inf")]
+AGE_LABELS = ["Today", "1–7 days", "8–30 days", "Over 30 days"]
+
+
+def _add(cursor, table, keys, counters, source, params):
+    cursor.execute(backends.dialect(cursor).add_counts(table, keys, counters, source), params)
+
+
+# ---------------------- Incremental Updates ----------------------
+def room_added(cursor, room_id):
+    _add(cursor, "occupancy_rollup", ("building_id", "floor"), ("rooms", "beds", "occupied"),
+         "SELECT COALESCE(building_id, 0), floor, 1, capacity, current_occupancy FROM room WHERE id = %s",
+         (room_id,))
+
+
+def occupancy_changed(cursor, room_id, delta):
+    cursor.execute(
+        "UPDATE occupancy_rollup SET occupied = occupied + %s "
+        "WHERE (building_id, floor) = (SELECT COALESCE(building_id, 0), floor FROM room WHERE id = %s)",
+        (delta, room_id)
+    )
+
+
+def occupancy_changed_many(cursor, deltas):
+    # deltas: {room_id: change}.  Folded per (building, floor) first, so a
+    # chunk touching a hundred rooms on one floor is a single UPDATE.
+    # Needs a dictionary cursor.
+    room_ids = sorted(deltas)
+    cursor.execute(
+        "SELECT id, COALESCE(building_id, 0) AS building_id, floor FROM room "
+        f"WHERE id IN ({db.placeholders(room_ids)})",
+        room_ids
+    )
+    by_floor = {}
+    for row in cursor.fetchall():
+        key = (row["building_id"], row["floor"])
+        by_floor[key] = by_floor.get(key, 0) + deltas[row["id"]]
+    for (building_id, floor), delta in sorted(by_floor.items()):
+        cursor.execute(
+            "UPDATE occupancy_rollup SET occupied = occupied + %s WHERE building_id = %s AND floor = %s",
+            (delta, building_id, floor)
+        )
+
+
+def penalty_changed(cursor, old_points, new_points, students=1):
+    # old_points None: a new penalty row; new_points None: a removed one
+    if old_points == new_points:
+        return
+    if old_points is not None:
+        cursor.execute(
+            "UPDATE penalty_rollup SET students = students - %s WHERE total_points = %s",
+            (students, old_points)
+        )
+    if new_points is not None:
+        _add(cursor, "penalty_rollup", ("total_points",), ("students",),
+             "VALUES (%s, %s)", (new_points, students))
+
+
+def request_opened(cursor, request_id):
+    _add(cursor, "maintenance_rollup", ("statues", "created_day"), ("requests",),
+         "SELECT statues, DATE(date_created), 1 FROM maintenancerequest "
+         f"WHERE id = %s AND statues NOT IN ({db.placeholders(CLOSED_STATUSES)})",
+         (request_id, *CLOSED_STATUSES))
+
+
+def requests_moved(cursor, moves):
+    # moves: {(old status, day created, new status): number of requests}
+    for (old_status, created_day, new_status), requests in sorted(moves.items()):
+        if old_status not in CLOSED_STATUSES:
+            cursor.execute(
+                "UPDATE maintenance_rollup SET requests = requests - %s "
+                "WHERE statues = %s AND created_day = %s",
+                (requests, old_status, created_day)
+            )
+        if new_status not in CLOSED_STATUSES:
+            _add(cursor, "maintenance_rollup", ("statues", "created_day"), ("requests",),
+                 "VALUES (%s, %s, %s)", (new_status, created_day, requests))
+
+
+# ---------------------- Full Rebuild ----------------------
+def rebuild(cursor):
+    rebuild_occupancy(cursor)
+    cursor.execute("DELETE FROM maintenance_rollup")
+    cursor.execute("DELETE FROM penalty_rollup")
+    cursor.execute(
+        "INSERT INTO maintenance_rollup (statues, created_day, requests) "
+        "SELECT statues, DATE(date_created), COUNT(*) FROM maintenancerequest "
+        f"WHERE statues NOT IN ({db.placeholders(CLOSED_STATUSES)}) GROUP BY statues, DATE(date_created)",
+        CLOSED_STATUSES
+    )
+    cursor.execute(
+        "INSERT INTO penalty_rollup (total_points, students) "
+        "SELECT total_points, COUNT(*) FROM penalty GROUP BY total_points"
+    )
+
+
+def rebuild_occupancy(cursor):
+    cursor.execute("DELETE FROM occupancy_rollup")
+    cursor.execute(
+        "INSERT INTO occupancy_rollup (building_id, floor, rooms, beds, occupied) "
+        "SELECT COALESCE(building_id, 0), floor, COUNT(*), SUM(capacity), SUM(current_occupancy) "
+        "FROM room GROUP BY COALESCE(building_id, 0), floor"
+    )
+
+
+def rebuild_all():
+    with db.transaction(invalidates=SOURCE_TABLES) as cursor:
+        rebuild(cursor)
+
+
+# ---------------------- Dashboard Reads ----------------------
+def occupancy():
+    with db.cursor() as cursor:
+        cursor.execute(
+            "SELECT building_id, floor, rooms, beds, occupied FROM occupancy_rollup "
+            "ORDER BY building_id, floor"
+        )
+        return cursor.fetchall()
+
+
+def backlog():
+    with db.cursor() as cursor:
+        cursor.execute(
+            "SELECT statues, created_day, requests FROM maintenance_rollup WHERE requests > 0"
+        )
+        return cursor.fetchall()
+
+
+def penalty_distribution():
+    with db.cursor() as cursor:
+        cursor.execute(
+            "SELECT total_points, students FROM penalty_rollup WHERE students > 0 ORDER BY total_points"
+        )
+        return cursor.fetchall()
+
+
+if __name__ == "__main__":
+    rebuild_all()
+    print("✅ Dashboard rollups rebuilt")
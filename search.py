@@ -0,0 +1,214 @@
+import threading
+from bisect import bisect_left, insort
+from collections import defaultdict
+from functools import partial
+
+import cache
+import db
+
+# ---------------------- Student Search ----------------------
+# An in-memory index over every student, loaded with one query and shared
+# by every session.  It is not dropped on writes: every write that adds,
+# removes or moves students reports them with students_changed(), and
+# their rows are patched into the cached index once the write commits.
+# Rooms never change building, so room writes don't concern it.  The cache
+# TTL still reloads it now and then, for writers outside this process.
+#
+#   digits  -> student ID and contact, exact matches first, then contact prefixes
+#   text    -> name prefixes (whole name, then any word), then fuzzy matches
+#              by trigram similarity, so "khaleel" still finds "Khalil"
+#
+# Matching works on distinct names, not students, so a common name costs
+# one comparison however many students share it.  Room and building narrow
+# either kind of search, or list those students on their own.
+
+DEFAULT_PAGE_SIZE = 20
+# Dice coefficient over trigrams a fuzzy match must reach
+FUZZY_THRESHOLD = 0.45
+CONTACT_LENGTH = 11
+# Shorter digit queries match student IDs only: every contact starts "01"
+MIN_CONTACT_PREFIX = 3
+
+# Cached under its own name rather than student/room, whose writes would drop it
+TABLES = ("student_index",)
+
+_SELECT = (
+    "SELECT s.id, s.student_Name, s.contact, s.room_id, r.building_id "
+    "FROM student s JOIN room r ON r.id = s.room_id"
+)
+
+# Match ranks, best first
+EXACT, NAME_PREFIX, WORD_PREFIX, CONTACT_PREFIX, FUZZY = range(5)
+
+
+def _fold(name):
+    return " ".join((name or "").casefold().split())
+
+
+def _trigrams(term):
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _terms_of(name):
+    # A name's terms are the whole name and each of its words
+    return {name, *name.split()}
+
+
+class StudentIndex:
+    def __init__(self, students=()):
+        self._lock = threading.Lock()
+        self._students = {}                     # id -> row dict
+        self._ids_by_name = defaultdict(list)   # folded name -> sorted [ids]
+        self._ids_by_room = defaultdict(set)
+        self._ids_by_building = defaultdict(set)
+        # Sorted (term, name) and (contact, id) pairs for prefix lookups with bisect
+        self._terms = []
+        self._contacts = []
+        self._grams = defaultdict(set)          # trigram -> {(term, name)}
+        self._gram_counts = {}                  # term -> number of trigrams
+        for student in students:
+            self._add(student, keep_sorted=False)
+        for ids in self._ids_by_name.values():
+            ids.sort()
+        self._terms.sort()
+        self._contacts.sort()
+
+    @classmethod
+    def load(cls):
+        with db.cursor() as cursor:
+            cursor.execute(_SELECT)
+            return cls(cursor.fetchall())
+
+    # ---------------------- Updating ----------------------
+    def _add(self, student, keep_sorted=True):
+        place = insort if keep_sorted else list.append
+        student_id, name = student["id"], _fold(student["student_Name"])
+        self._students[student_id] = student
+        if name not in self._ids_by_name:
+            for term in _terms_of(name):
+                place(self._terms, (term, name))
+                grams = _trigrams(term)
+                self._gram_counts[term] = len(grams)
+                for gram in grams:
+                    self._grams[gram].add((term, name))
+        place(self._ids_by_name[name], student_id)
+        self._ids_by_room[student["room_id"]].add(student_id)
+        self._ids_by_building[student["building_id"]].add(student_id)
+        place(self._contacts, (student["contact"], student_id))
+
+    def _remove(self, student_id):
+        student = self._students.pop(student_id, None)
+        if student is None:
+            return
+        name = _fold(student["student_Name"])
+        ids = self._ids_by_name[name]
+        ids.remove(student_id)
+        if not ids:
+            del self._ids_by_name[name]
+            for term in _terms_of(name):
+                del self._terms[bisect_left(self._terms, (term, name))]
+                for gram in _trigrams(term):
+                    self._grams[gram].discard((term, name))
+                    if not self._grams[gram]:
+                        del self._grams[gram]
+        for ids_by, value in ((self._ids_by_room, student["room_id"]),
+                              (self._ids_by_building, student["building_id"])):
+            ids_by[value].discard(student_id)
+            if not ids_by[value]:
+                del ids_by[value]
+        del self._contacts[bisect_left(self._contacts, (student["contact"], student_id))]
+
+    def apply(self, student_ids, rows):
+        # The given students now have exactly these rows (none if deleted)
+        with self._lock:
+            for student_id in student_ids:
+                self._remove(student_id)
+            for row in rows:
+                self._add(row)
+
+    def __len__(self):
+        return len(self._students)
+
+    # ---------------------- Matching ----------------------
+    def _by_digits(self, digits):
+        # {id: rank}
+        matches = {}
+        if int(digits) in self._students:
+            matches[int(digits)] = EXACT
+        if len(digits) < MIN_CONTACT_PREFIX:
+            return matches
+        start = bisect_left(self._contacts, (digits,))
+        for contact, student_id in self._contacts[start:]:
+            if not contact.startswith(digits):
+                break
+            matches.setdefault(student_id, EXACT if len(digits) == CONTACT_LENGTH else CONTACT_PREFIX)
+        return matches
+
+    def _by_name(self, text):
+        # {name: (rank, -similarity)}
+        names = {}
+        start = bisect_left(self._terms, (text,))
+        for term, name in self._terms[start:]:
+            if not term.startswith(text):
+                break
+            rank = NAME_PREFIX if term == name else WORD_PREFIX
+            names[name] = min(names.get(name, (rank, 0)), (rank, 0))
+
+        grams = _trigrams(text)
+        shared = defaultdict(int)
+        for gram in grams:
+            for entry in self._grams.get(gram, ()):
+                shared[entry] += 1
+        for (term, name), count in shared.items():
+            similarity = 2 * count / (len(grams) + self._gram_counts[term])
+            if similarity >= FUZZY_THRESHOLD:
+                names[name] = min(names.get(name, (FUZZY, 0)), (FUZZY, -similarity))
+        return names
+
+    def search(self, query="", room_id=None, building_id=None, page=0, page_size=DEFAULT_PAGE_SIZE):
+        # Returns (one page of student rows, total matches)
+        with self._lock:
+            return self._search(_fold(query), room_id, building_id, page, page_size)
+
+    def _search(self, text, room_id, building_id, page, page_size):
+        if text.isdigit():
+            ranked = sorted((rank, student_id) for student_id, rank in self._by_digits(text).items())
+            ids = [student_id for _, student_id in ranked]
+        elif text:
+            ids = [
+                student_id
+                for _, name in sorted((score, name) for name, score in self._by_name(text).items())
+                for student_id in self._ids_by_name.get(name, ())
+            ]
+        elif room_id is not None:
+            ids = sorted(self._ids_by_room.get(room_id, ()))
+        elif building_id is not None:
+            ids = sorted(self._ids_by_building.get(building_id, ()))
+        else:
+            ids = sorted(self._students)
+
+        if room_id is not None or building_id is not None:
+            ids = [
+                i for i in ids
+                if (room_id is None or self._students[i]["room_id"] == room_id)
+                and (building_id is None or self._students[i]["building_id"] == building_id)
+            ]
+        start = page * page_size
+        return [self._students[i] for i in ids[start:start + page_size]], len(ids)
+
+
+def get_index():
+    return cache.cached(TABLES, ("student_index",), StudentIndex.load)
+
+
+def students_changed(cursor, student_ids):
+    # Call from a write's transaction (dictionary cursor), after it has
+    # inserted, deleted or moved these students: their rows are read here
+    # and patched into the cached index if the transaction commits.
+    ids = sorted(set(student_ids))
+    if not ids:
+        return
+    cursor.execute(f"{_SELECT} WHERE s.id IN ({db.placeholders(ids)})", ids)
+    rows = cursor.fetchall()
+    db.after_commit(partial(cache.update, TABLES, ("student_index",), lambda index: index.apply(ids, rows)))
@@ -0,0 +1,161 @@
+import backends
+import db
+
+# ---------------------- Table Metadata ----------------------
+# Column kinds drive filtering ("int" -> exact match, "text" -> prefix match,
+# "enum" -> exact match, "timestamp" -> on/after) and keep every identifier
+# that ends up in SQL on a fixed whitelist.
+TABLE_COLUMNS = {
+    "student": {
+        "id": "int",
+        "student_Name": "text",
+        "contact": "text",
+        "room_id": "int",
+        "graduation_year": "int",
+    },
+    "penalty": {
+        "student_id": "int",
+        "total_points": "int",
+        "last_updated": "timestamp",
+    },
+    "maintenancerequest": {
+        "id": "int",
+        "statues": "enum",
+        "room_id": "int",
+        "description": "text",
+        "date_created": "timestamp",
+        "claimed_by": "text",
+    },
+    "meals": {
+        "student_id": "int",
+        "meal_type": "enum",
+        "weekday": "enum",
+    },
+    "room": {
+        "id": "int",
+        "floor": "int",
+        "building_id": "int",
+        "capacity": "int",
+        "current_occupancy": "int",
+    },
+    "building": {
+        "id": "int",
+        "building_name": "text",
+    },
+    "health_issues": {
+        "student_id": "int",
+        "description": "text",
+        "prescription": "text",
+        "guardian_contact": "text",
+    },
+}
+
+PRIMARY_KEYS = {
+    "student": ("id",),
+    "penalty": ("student_id",),
+    "maintenancerequest": ("id",),
+    "meals": ("student_id", "weekday"),
+    "room": ("id",),
+    "building": ("id",),
+    "health_issues": ("student_id",),
+}
+
+DEFAULT_PAGE_SIZE = 50
+
+# Below this many (estimated) rows an exact COUNT(*) is cheap enough
+EXACT_COUNT_LIMIT = 10000
+
+
+# MySQL and SQLite disagree on backslashes in string literals, so LIKE
+# patterns escape with '!' instead
+LIKE_ESCAPE = "!"
+
+
+def _escape_like(value):
+    return "".join(LIKE_ESCAPE + c if c in "!%_" else c for c in value)
+
+
+def build_where(table, filters, after=None):
+    columns = TABLE_COLUMNS[table]
+    clauses = []
+    params = []
+    for column, value in (filters or {}).items():
+        kind = columns[column]
+        if kind == "int":
+            try:
+                params.append(int(value))
+            except ValueError:
+                raise ValueError(f"'{column}' must be a whole number") from None
+            clauses.append(f"{column} = %s")
+        elif kind == "text":
+            clauses.append(f"{column} LIKE %s ESCAPE '{LIKE_ESCAPE}'")
+            params.append(_escape_like(value) + "%")
+        elif kind == "timestamp":
+            clauses.append(f"{column} >= %s")
+            params.append(value)
+        else:
+            clauses.append(f"{column} = %s")
+            params.append(value)
+
+    if after is not None:
+        keys = PRIMARY_KEYS[table]
+        # Spelled out as a > x OR (a = x AND b > y) rather than (a, b) > (x, y):
+        # MySQL won't range-scan a row-constructor comparison.  The leading
+        # a >= x bound is what lets SQLite range-scan the OR as well.
+        if len(keys) == 1:
+            clauses.append(f"{keys[0]} > %s")
+            params.append(after[0])
+        else:
+            terms = [" AND ".join([f"{k} = %s" for k in keys[:i]] + [f"{key} > %s"]) for i, key in enumerate(keys)]
+            clauses.append(f"{keys[0]} >= %s AND ({' OR '.join(f'({t})' for t in terms)})")
+            params.append(after[0])
+            for i in range(len(keys)):
+                params.extend(after[:i + 1])
+
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    return where, params
+
+
+# ---------------------- Keyset Pagination ----------------------
+def page_query(table, columns=None, filters=None, after=None, page_size=DEFAULT_PAGE_SIZE):
+    # (selected columns, SQL, params) for one page; the primary key columns
+    # are always selected first, for the next page's key.  `after` is the
+    # primary key tuple of the last row on the previous page, so every page
+    # is an index range scan of page_size + 1 rows no matter how deep into
+    # the table it is.
+    keys = PRIMARY_KEYS[table]
+    columns = [c for c in (columns or TABLE_COLUMNS[table]) if c in TABLE_COLUMNS[table]]
+    select = list(dict.fromkeys(list(keys) + columns))
+    where, params = build_where(table, filters, after)
+    sql = f"SELECT {', '.join(select)} FROM {table}{where} ORDER BY {', '.join(keys)} LIMIT %s"
+    return select, sql, params + [page_size + 1]
+
+
+def fetch_page(table, columns=None, filters=None, after=None, page_size=DEFAULT_PAGE_SIZE):
+    # Returns (rows as dicts, next_key); see frames.fetch_page for a DataFrame
+    keys = PRIMARY_KEYS[table]
+    _, sql, params = page_query(table, columns, filters, after, page_size)
+    with db.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    next_key = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_key = tuple(rows[-1][k] for k in keys)
+    return rows, next_key
+
+
+def count_rows(table, filters=None):
+    # Returns (count, is_estimate).  Unfiltered counts on big tables come from
+    # the engine's statistics, where it keeps any, instead of scanning an index.
+    if not filters:
+        with db.cursor() as cursor:
+            estimate = backends.dialect(cursor).estimate_rows(cursor, table)
+        if estimate is not None and estimate > EXACT_COUNT_LIMIT:
+            return int(estimate), True
+
+    where, params = build_where(table, filters)
+    with db.cursor() as cursor:
+        cursor.execute(f"SELECT COUNT(*) AS count FROM {table}{where}", params)
+        return cursor.fetchone()["count"], False
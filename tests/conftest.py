@@ -0,0 +1,83 @@
+import pytest
+
+import backends
+import cache
+import db
+import generate_data
+import migrations
+
+# ---------------------- Test Database ----------------------
+# Every test gets its own migrated SQLite file in a temp directory, loaded
+# with a small generated dormitory, and its own query cache, so nothing
+# needs a server or st.secrets.
+
+SCALE = [
+    "--seed", "7", "--buildings", "2", "--floors", "3", "--rooms-per-floor", "10",
+    "--capacities", "2,3,4", "--students", "120",
+    "--maintenance-years", "0.1", "--requests-per-room-year", "12",
+]
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = db.ConnectionPool(size=2, backend=backends.SQLiteBackend(str(tmp_path / "dorm.db")))
+    with pool.connection() as conn:
+        migrations.migrate(conn, log=lambda message: None)
+        generate_data.generate(conn, log=lambda message: None,
+                               **generate_data.scale_from_args(generate_data.build_parser().parse_args(SCALE)))
+    db.use_pool(pool)
+    cache.use_cache(cache.QueryCache())
+    yield pool
+    db.use_pool(None)
+    cache.use_cache(None)
+
+
+def rows(sql, params=()):
+    with db.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def value(sql, params=()):
+    with db.cursor(dictionary=False) as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchone()[0]
+
+
+def drift():
+    # {check: offending rows} comparing every stored count and rollup with
+    # the base tables; all empty when the database is consistent
+    return {
+        "over_capacity": rows(
+            "SELECT r.id FROM room r WHERE r.capacity < (SELECT COUNT(*) FROM student s WHERE s.room_id = r.id)"
+        ),
+        "occupancy": rows(
+            "SELECT r.id FROM room r WHERE r.current_occupancy <> "
+            "(SELECT COUNT(*) FROM student s WHERE s.room_id = r.id)"
+        ),
+        "occupancy_rollup": rows(
+            "SELECT o.building_id, o.floor FROM occupancy_rollup o WHERE o.occupied <> "
+            "(SELECT COALESCE(SUM(r.current_occupancy), 0) FROM room r "
+            "WHERE COALESCE(r.building_id, 0) = o.building_id AND r.floor = o.floor)"
+        ),
+        "maintenance_rollup": _mismatched(
+            "SELECT statues, created_day, requests FROM maintenance_rollup WHERE requests <> 0",
+            "SELECT statues, DATE(date_created) AS created_day, COUNT(*) AS requests FROM maintenancerequest "
+            "WHERE statues <> 'Resolved' GROUP BY statues, DATE(date_created)",
+        ),
+        "penalty_rollup": _mismatched(
+            "SELECT total_points, students FROM penalty_rollup WHERE students <> 0",
+            "SELECT total_points, COUNT(*) AS students FROM penalty GROUP BY total_points",
+        ),
+    }
+
+
+def _mismatched(stored_sql, actual_sql):
+    stored = {tuple(row.values()) for row in rows(stored_sql)}
+    actual = {tuple(row.values()) for row in rows(actual_sql)}
+    return sorted(stored ^ actual, key=str)
+
+
+def assert_consistent():
+    problems = {check: found for check, found in drift().items() if found}
+    assert not problems
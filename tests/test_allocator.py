@@ -0,0 +1,56 @@
+import allocator
+from conftest import rows
+
+
+def room(room_id, building_id, floor, free):
+    return {"id": room_id, "building_id": building_id, "floor": floor, "free": free}
+
+
+def rooms():
+    return allocator.RoomAllocator([
+        room(1, 1, 1, 2), room(2, 1, 1, 1), room(3, 1, 2, 1),
+        room(4, 2, 1, 3), room(5, 2, 2, 0),
+    ])
+
+
+def ids(found):
+    return [r["id"] for r in found]
+
+
+def test_preferences_then_fewest_free_slots():
+    assert ids(rooms().candidates(1, 1)) == [2, 1, 3, 4]
+    assert ids(rooms().candidates(1, 2)) == [3, 2, 1, 4]
+    assert ids(rooms().candidates(floor=1)) == [2, 1, 4, 3]
+    assert ids(rooms().candidates(2, 2)) == [4, 3, 2, 1]
+    assert ids(rooms().candidates(limit=2)) == [2, 3]
+    assert rooms().best_room(2) == room(4, 2, 1, 3)
+
+
+def test_reserve_and_release():
+    index = rooms()
+    assert index.reserve(2)
+    assert not index.reserve(2)
+    assert 2 not in ids(index.candidates())
+    assert not index.reserve(5) and not index.reserve(99)
+    index.release(2)
+    assert index.free_slots(2) == 1 and ids(index.candidates(1, 1))[0] == 2
+
+
+def test_assign_serves_requests_then_preferences():
+    index = rooms()
+    students = [{"room_id": 2}, {"room_id": 2}, {"building_id": 2}, {"building_id": 1, "floor": 2}, {}]
+    assert [room_id for _, room_id in index.assign(students)] == [2, None, 4, 3, 1]
+    assert index.free_slots(1) == 1 and index.free_slots(4) == 2
+
+
+def test_copy_is_independent():
+    index = rooms()
+    copy = index.copy()
+    copy.reserve(1, 2)
+    assert index.free_slots(1) == 2 and copy.free_slots(1) == 0
+
+
+def test_load_reads_free_rooms(pool):
+    loaded = allocator.RoomAllocator.load()
+    free = rows("SELECT id, capacity - current_occupancy AS free FROM room WHERE current_occupancy < capacity")
+    assert {r["id"]: r["free"] for r in loaded.candidates(limit=10**6)} == {r["id"]: r["free"] for r in free}
@@ -0,0 +1,116 @@
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+import bulk_import
+import db
+import occupancy
+from conftest import assert_consistent, rows, value
+
+
+def frame(*students, **columns):
+    df = pd.DataFrame(students, columns=["id", "student_Name", "contact"], dtype=str)
+    for column, values in columns.items():
+        df[column] = values
+    return df
+
+
+def student(sid):
+    return (str(sid), f"Imported {sid}", f"0188{sid:07d}")
+
+
+def free_rooms():
+    return rows("SELECT id, capacity - current_occupancy AS free FROM room WHERE current_occupancy < capacity ORDER BY id")
+
+
+def test_read_file_formats(tmp_path):
+    path = tmp_path / "students.csv"
+    path.write_text(" id ,student_Name,contact\n1,A,\n")
+    df = bulk_import.read_file(str(path))
+    assert list(df.columns) == ["id", "student_Name", "contact"]
+    assert df.loc[0, "contact"] == ""
+    with pytest.raises(ValueError):
+        bulk_import.read_file(str(tmp_path / "students.xls"))
+
+
+def test_validate_reports_every_problem_by_line():
+    df = frame(student(1), ("x", "", "123"), student(1), meal_type=["A", "C", ""], weekday=["monday", "", ""])
+    rows_ok, errors = bulk_import.validate(df)
+    assert [r["id"] for r in rows_ok] == [1]
+    assert rows_ok[0]["weekday"] == "Monday"
+    assert {line for line, _ in errors} == {3, 4}
+    assert (4, "Duplicate Student ID (also on line 2)") in errors
+    assert bulk_import.validate(frame(student(1)).drop(columns="contact"))[1] == [(1, "Missing column(s): contact")]
+
+
+def test_import_places_everyone_and_keeps_rollups(pool):
+    taken = value("SELECT MIN(id) FROM student")
+    df = frame(student(800001), student(800002), student(taken), meal_type=["A", "", ""], weekday=["Monday", "", ""])
+    imported, errors = bulk_import.import_students(df)
+    assert imported == 2
+    assert errors == [(4, f"Student ID {taken} already exists")]
+    assert value("SELECT COUNT(*) FROM meals WHERE student_id = 800001") == 1
+    assert value("SELECT COUNT(*) FROM penalty WHERE student_id IN (800001, 800002)") == 2
+    assert_consistent()
+
+
+def test_full_room_fails_the_chunk_before_any_insert(pool):
+    room = free_rooms()[0]
+    chunk = [
+        {"line": i + 2, "id": 800001 + i, "student_Name": "Overflow", "contact": f"0188{800001 + i:07d}",
+         "room_id": room["id"], "graduation_year": None, "meal_type": None, "weekday": None,
+         "description": None, "prescription": None, "guardian_contact": None}
+        for i in range(room["free"] + 1)
+    ]
+    seen = []
+    with pytest.raises(occupancy.RoomFullError):
+        with db.transaction() as cursor:
+            cursor.execute = _recording(cursor.execute, seen)
+            bulk_import.write_chunk(cursor, chunk, datetime(2026, 1, 1))
+    assert seen and not any(sql.startswith("INSERT") for sql in seen)
+    assert value("SELECT COUNT(*) FROM student WHERE id >= 800001") == 0
+    assert_consistent()
+
+
+def test_full_room_rolls_back_only_its_chunk(pool, monkeypatch):
+    # Another writer fills a room between the snapshot and the write
+    room = free_rooms()[0]
+    real = bulk_import.write_chunk
+
+    def racing(cursor, chunk, now):
+        if any(r["room_id"] == room["id"] for r in chunk):
+            raise occupancy.RoomFullError(room["id"])
+        return real(cursor, chunk, now)
+
+    monkeypatch.setattr(bulk_import, "write_chunk", racing)
+    df = frame(*(student(800001 + i) for i in range(6)), room_id=[str(room["id"])] + [""] * 5)
+    imported, errors = bulk_import.import_students(df, chunk_size=3)
+    assert imported == 3
+    assert [line for line, _ in errors] == [2, 3, 4]
+    assert value("SELECT COUNT(*) FROM student WHERE id BETWEEN 800001 AND 800003") == 0
+    assert_consistent()
+
+
+def test_transient_errors_are_retried(pool, monkeypatch):
+    calls = []
+    real = bulk_import.write_chunk
+
+    def flaky(cursor, chunk, now):
+        calls.append(1)
+        if len(calls) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        return real(cursor, chunk, now)
+
+    monkeypatch.setattr(bulk_import, "write_chunk", flaky)
+    assert bulk_import.import_students(frame(student(800001)), backoff=0) == (1, [])
+    assert len(calls) == 2
+    assert_consistent()
+
+
+def _recording(execute, seen):
+    def run(sql, params=()):
+        seen.append(sql)
+        return execute(sql, params)
+    return run
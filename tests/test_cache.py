@@ -0,0 +1,76 @@
+import cache
+import db
+import repository
+
+
+def counting_loader(result):
+    calls = []
+
+    def load():
+        calls.append(1)
+        return result
+    return load, calls
+
+
+def test_hits_until_a_table_is_invalidated():
+    query_cache = cache.QueryCache()
+    load, calls = counting_loader("rows")
+    assert query_cache.get_or_load(("student", "room"), "k", load) == "rows"
+    assert query_cache.get_or_load(("student", "room"), "k", load) == "rows"
+    assert len(calls) == 1
+
+    query_cache.invalidate("building")
+    query_cache.get_or_load(("student", "room"), "k", load)
+    assert len(calls) == 1
+
+    query_cache.invalidate("room")
+    query_cache.get_or_load(("student", "room"), "k", load)
+    assert len(calls) == 2
+
+
+def test_write_during_load_is_not_cached():
+    query_cache = cache.QueryCache()
+
+    def load_while_writing():
+        query_cache.invalidate("student")
+        return "stale"
+
+    assert query_cache.get_or_load(("student",), "k", load_while_writing) == "stale"
+    load, calls = counting_loader("fresh")
+    assert query_cache.get_or_load(("student",), "k", load) == "fresh"
+    assert len(calls) == 1
+
+
+def test_lru_bound():
+    query_cache = cache.QueryCache(max_entries=2)
+    for key in "abc":
+        query_cache.get_or_load(("student",), key, lambda: key)
+    stats = query_cache.stats()
+    assert stats["entries"] == 2 and stats["evictions"] == 1
+
+
+def test_expired_entries_reload():
+    query_cache = cache.QueryCache(ttl=0)
+    load, calls = counting_loader("rows")
+    query_cache.get_or_load(("student",), "k", load)
+    query_cache.get_or_load(("student",), "k", load)
+    assert len(calls) == 2
+
+
+def test_committed_transaction_invalidates(pool):
+    assert len(cache.cached(("building",), ("buildings",), repository.buildings)) == 2
+    with db.transaction(invalidates=("building",)) as cursor:
+        repository.insert_building(cursor, 3, "Annex")
+    assert [b["building_name"] for b in cache.cached(("building",), ("buildings",), repository.buildings)][-1] == "Annex"
+
+
+def test_rolled_back_transaction_keeps_the_cache(pool):
+    cache.cached(("building",), ("buildings",), repository.buildings)
+    try:
+        with db.transaction(invalidates=("building",)) as cursor:
+            repository.insert_building(cursor, 3, "Annex")
+            raise RuntimeError("abandoned")
+    except RuntimeError:
+        pass
+    assert cache.current_cache().stats()["invalidations"] == 0
+    assert len(cache.cached(("building",), ("buildings",), repository.buildings)) == 2
@@ -0,0 +1,79 @@
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+import checkout
+from conftest import assert_consistent, rows, value
+
+
+def test_select_students(pool):
+    assert checkout.select_students(student_ids=[3, 1, 3, 999999]) == [1, 3]
+    in_building = checkout.select_students(building_id=2)
+    assert in_building == [row["id"] for row in rows(
+        "SELECT s.id FROM student s JOIN room r ON r.id = s.room_id WHERE r.building_id = 2 ORDER BY s.id"
+    )]
+    year = value("SELECT MIN(graduation_year) FROM student")
+    assert checkout.select_students(graduating=year) == [row["id"] for row in rows(
+        "SELECT id FROM student WHERE graduation_year <= %s ORDER BY id", (year,)
+    )]
+    with pytest.raises(ValueError):
+        checkout.select_students()
+
+
+def test_checkout_archives_and_recounts(pool):
+    ids = checkout.select_students(building_id=1)
+    meals = value(f"SELECT COUNT(*) FROM meals WHERE student_id IN ({', '.join(map(str, ids))})")
+    progress = []
+    now = datetime(2026, 6, 30)
+    removed, errors = checkout.checkout(ids, chunk_size=7, progress=lambda done, total: progress.append(done), now=now)
+
+    assert (removed, errors) == (len(ids), [])
+    assert progress[-1] == len(ids) and len(progress) == -(-len(ids) // 7)
+    assert value("SELECT COUNT(*) FROM student WHERE id IN (SELECT id FROM student_archive)") == 0
+    assert value("SELECT COUNT(*) FROM student_archive") == len(ids)
+    assert value("SELECT COUNT(*) FROM meals_archive") == meals
+    assert value("SELECT COUNT(*) FROM penalty_archive") == len(ids)
+    assert value("SELECT SUM(current_occupancy) FROM room WHERE building_id = 1") == 0
+    assert_consistent()
+
+
+def test_checkout_without_archive(pool):
+    removed, errors = checkout.checkout([1, 2, 3], archive=False)
+    assert (removed, errors) == (3, [])
+    assert value("SELECT COUNT(*) FROM student_archive") == 0
+    assert value("SELECT COUNT(*) FROM penalty_event WHERE student_id IN (1, 2, 3)") == 0
+    assert_consistent()
+
+
+def test_checkout_skips_missing_students(pool):
+    assert checkout.checkout([1, 999999]) == (1, [])
+    assert_consistent()
+
+
+def test_transient_errors_are_retried(pool, monkeypatch):
+    calls = []
+    real = checkout.checkout_chunk
+
+    def flaky(cursor, ids, archive, now):
+        calls.append(ids)
+        if len(calls) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        return real(cursor, ids, archive, now)
+
+    monkeypatch.setattr(checkout, "checkout_chunk", flaky)
+    assert checkout.checkout([1, 2], backoff=0) == (2, [])
+    assert len(calls) == 2
+    assert_consistent()
+
+
+def test_other_errors_roll_back_the_chunk(pool, monkeypatch):
+    def broken(cursor, ids, archive, now):
+        cursor.execute("DELETE FROM student WHERE id = %s", (ids[0],))
+        raise sqlite3.OperationalError("no such table: nowhere")
+
+    monkeypatch.setattr(checkout, "checkout_chunk", broken)
+    removed, errors = checkout.checkout([1, 2], backoff=0)
+    assert removed == 0
+    assert [(first, last) for first, last, _ in errors] == [(1, 2)]
+    assert value("SELECT COUNT(*) FROM student WHERE id IN (1, 2)") == 2
@@ -0,0 +1,81 @@
+import csv
+import io
+import os
+from datetime import datetime
+
+import pyarrow.parquet as pq
+import pytest
+
+import db
+import export
+from conftest import rows, value
+
+
+def read_csv(data):
+    return list(csv.reader(io.StringIO(data.decode("utf-8"))))
+
+
+def test_stream_rows_in_chunks(pool):
+    with db.cursor(dictionary=False) as cursor:
+        chunks = list(export.stream_rows(cursor, "student", ["id", "contact"], chunk_size=50))
+    assert chunks[0] == ["id", "contact"]
+    assert [len(chunk) for chunk in chunks[1:]] == [50, 50, 20]
+    assert [row[0] for chunk in chunks[1:] for row in chunk] == sorted(r["id"] for r in rows("SELECT id FROM student"))
+
+
+def test_abandoned_stream_leaves_the_connection_usable(pool):
+    with db.cursor(dictionary=False) as cursor:
+        chunks = export.stream_rows(cursor, "meals", chunk_size=10)
+        next(chunks), next(chunks)
+        chunks.close()
+        cursor.execute("SELECT COUNT(*) FROM student")
+        assert cursor.fetchone()[0] == 120
+
+
+def test_csv_download_keeps_columns_filters_and_order(pool):
+    data = export.download("meals", "csv", ["student_id", "weekday"], {"meal_type": "B"}, chunk_size=7)
+    lines = read_csv(data)
+    assert lines[0] == ["student_id", "weekday"]
+    expected = rows("SELECT student_id, weekday FROM meals WHERE meal_type = 'B' ORDER BY student_id, weekday")
+    assert lines[1:] == [[str(r["student_id"]), r["weekday"]] for r in expected]
+
+
+def test_parquet_download_is_typed(pool):
+    table = pq.read_table(io.BytesIO(export.download("maintenancerequest", "parquet", chunk_size=25)))
+    assert table.num_rows == value("SELECT COUNT(*) FROM maintenancerequest")
+    assert str(table.schema.field("date_created").type) == "timestamp[us]"
+    assert str(table.schema.field("id").type) == "int64"
+
+
+def test_date_range_is_inclusive(pool):
+    day = value("SELECT MIN(DATE(date_created)) FROM maintenancerequest")
+    since = until = datetime.strptime(day, "%Y-%m-%d")
+    lines = read_csv(export.download("maintenancerequest", "csv", ["id"], since=since, until=until))
+    assert len(lines) - 1 == value(
+        "SELECT COUNT(*) FROM maintenancerequest WHERE DATE(date_created) = %s", (day,)
+    )
+    with pytest.raises(ValueError):
+        export.download("student", since=since)
+
+
+def test_download_is_capped(pool):
+    with pytest.raises(ValueError):
+        export.download("student", max_rows=119, chunk_size=50)
+    assert len(read_csv(export.download("student", max_rows=120))) == 121
+
+
+def test_save_streams_to_a_file_on_the_server(pool, tmp_path):
+    directory = tmp_path / "exports"
+    path, total = export.save("student", "parquet", directory=str(directory), chunk_size=16)
+    assert total == 120 and pq.read_table(path).num_rows == 120
+    assert os.listdir(directory) == [os.path.basename(path)]
+
+    # A failed export leaves nothing behind
+    with pytest.raises(ValueError):
+        export.save("student", "csv", columns=["nope"], directory=str(directory))
+    assert os.listdir(directory) == [os.path.basename(path)]
+
+
+def test_unknown_format(pool):
+    with pytest.raises(ValueError):
+        export.download("student", "xlsx")
@@ -0,0 +1,39 @@
+from datetime import datetime
+
+import pandas as pd
+
+import frames
+
+
+def test_column_dtypes():
+    assert frames.dtype("student", "graduation_year") == "Int16"
+    assert frames.dtype("student", "contact") == frames.STRING
+    assert frames.dtype("meals", "weekday") is frames.WEEKDAYS
+    assert frames.dtype("maintenancerequest", "date_created") == "datetime64[ns]"
+
+
+def test_to_frame_types_each_column():
+    columns = ["student_id", "weekday", "meal_type"]
+    rows = [(1, "Monday", "A"), (2, "Sunday", None), (None, "Friday", "B")]
+    frame = frames.to_frame("meals", columns, rows)
+    assert str(frame["student_id"].dtype) == "Int32" and frame["student_id"].isna().tolist() == [False, False, True]
+    assert frame["weekday"].dtype == frames.WEEKDAYS and frame["weekday"].max() == "Sunday"
+    assert frame["meal_type"].tolist()[:1] == ["A"] and pd.isna(frame["meal_type"][1])
+
+
+def test_to_frame_keeps_only_the_requested_columns():
+    frame = frames.to_frame("meals", ["student_id", "weekday", "meal_type"], [(1, "Monday", "A")],
+                            only=["meal_type", "student_id"])
+    assert list(frame.columns) == ["meal_type", "student_id"]
+
+
+def test_values_outside_a_type_fall_back():
+    frame = frames.to_frame("room", ["id", "building_id", "capacity"], [(1, 40000, 2), (2, 1, 300)])
+    assert frame["building_id"].tolist() == [40000, 1] and frame["capacity"].tolist() == [2, 300]
+    unknown = frames.to_frame("meals", ["meal_type"], [("A",), ("Z",)])
+    assert unknown["meal_type"].tolist() == ["A", "Z"]
+
+
+def test_timestamps_from_text():
+    frame = frames.to_frame("maintenancerequest", ["date_created"], [("2026-03-01 08:30:00",), (None,)])
+    assert frame["date_created"][0] == datetime(2026, 3, 1, 8, 30) and pd.isna(frame["date_created"][1])
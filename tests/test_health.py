@@ -0,0 +1,89 @@
+from datetime import datetime
+
+import checkout
+import db
+import health
+import occupancy
+import repository
+from conftest import rows
+
+
+def record(sid, description, prescription, guardian, building_id=1, room_id=1):
+    return {
+        "student_id": sid, "student_Name": f"Student {sid}", "contact": f"0100000{sid:04d}",
+        "building_id": building_id, "building_name": f"Building {building_id}", "room_id": room_id, "floor": 1,
+        "description": description, "prescription": prescription, "guardian_contact": guardian,
+    }
+
+
+INDEX = health.HealthIndex([
+    record(1, "Asthma, mild", "Inhaler", "01500000001"),
+    record(2, "Severe asthma", None, "01500000001", room_id=2),
+    record(3, "Peanut allergy", "EpiPen", "01500000003", building_id=2, room_id=9),
+])
+
+
+def ids(found):
+    return [row["student_id"] for row in found]
+
+
+def test_find_by_condition_prefix_and_place():
+    assert ids(INDEX.find("asth")) == [1, 2]
+    assert ids(INDEX.find("severe ASTHMA")) == [2]
+    assert ids(INDEX.find("asthma", room_id=1)) == [1]
+    assert ids(INDEX.find(building_id=2)) == [3]
+    assert ids(INDEX.find("epi", building_id=1)) == []
+    assert ids(INDEX.find()) == [1, 2, 3]
+
+
+def test_guardians_and_conditions():
+    assert ids(INDEX.by_guardian(" 01500000001 ")) == [1, 2]
+    assert INDEX.conditions()[0] == ("asthma", 2)
+
+
+def test_rosters():
+    csv_rows = health.roster_csv(INDEX.find("asthma")).decode("utf-8").splitlines()
+    assert csv_rows[0] == ",".join(health.ROSTER_COLUMNS)
+    assert len(csv_rows) == 3
+    page = health.roster_html([record(4, "<b>", None, "01500000004")], "Roster & co").decode("utf-8")
+    assert "&lt;b&gt;" in page and "Roster &amp; co" in page and "1 student(s)" in page
+
+
+def everyone(index):
+    return index.find()
+
+
+def test_writes_patch_the_cached_index(pool):
+    index = health.get_index()
+    room_id = rows("SELECT id FROM room WHERE current_occupancy < capacity ORDER BY id")[0]["id"]
+    with db.transaction(invalidates=("student", "room", "health_issues")) as cursor:
+        repository.insert_student(cursor, 900001, "Yara Nabil", "01999999999", room_id, {}, "Xerosis", "Emollient",
+                                  "01555555555", datetime(2026, 1, 1))
+    holder = rows("SELECT student_id FROM health_issues WHERE student_id < 900000 ORDER BY student_id")
+    healthy = rows("SELECT id FROM student WHERE id NOT IN (SELECT student_id FROM health_issues) ORDER BY id")[0]["id"]
+    with db.transaction() as cursor:
+        repository.save_health_record(cursor, holder[0]["student_id"], True, "Vertigo", None, "01555555556")
+        repository.save_health_record(cursor, healthy, False, "Quinsy", None, "01555555557")
+    target = rows("SELECT id FROM room WHERE current_occupancy < capacity AND id <> %s ORDER BY id", (room_id,))[0]["id"]
+    with db.transaction() as cursor:
+        occupancy.move_student(cursor, 900001, target)
+        repository.delete_student(cursor, holder[1]["student_id"])
+    checkout.checkout([holder[2]["student_id"]])
+
+    assert health.get_index() is index
+    assert everyone(index) == everyone(health.HealthIndex.load())
+    assert [(r["student_id"], r["room_id"]) for r in index.find("xero")] == [(900001, target)]
+    assert ids(index.find("vertig")) == [holder[0]["student_id"]]
+    assert ids(index.find("quins")) == [healthy]
+
+
+def test_rolled_back_writes_leave_the_index_alone(pool):
+    index = health.get_index()
+    before = everyone(index)
+    try:
+        with db.transaction() as cursor:
+            repository.save_health_record(cursor, before[0]["student_id"], True, "Changed", None, "01555555556")
+            raise RuntimeError("abandoned")
+    except RuntimeError:
+        pass
+    assert everyone(health.get_index()) == before
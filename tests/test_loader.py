@@ -0,0 +1,36 @@
+from conftest import rows, value
+from loader import DataLoader
+
+
+def test_declared_lookups_share_one_round_trip(pool):
+    student = rows("SELECT s.id, s.contact FROM student s JOIN health_issues h ON h.student_id = s.id LIMIT 1")[0]
+    other = rows("SELECT id, contact FROM student WHERE id <> %s LIMIT 1", (student["id"],))[0]
+    loader = DataLoader(use_cache=False)
+    loader.need_room_count()
+    loader.need_student(student["id"])
+    loader.need_contact(other["contact"])
+    loader.need_student(999999)
+
+    assert loader.room_count() == value("SELECT COUNT(*) FROM room")
+    assert loader.student(student["id"])["health_id"] == student["id"]
+    assert loader.student_by_contact(other["contact"])["id"] == other["id"]
+    assert loader.student(999999) is None
+    assert loader.round_trips == 1
+
+    # Something not declared up front costs one more
+    assert loader.student(other["id"])["contact"] == other["contact"]
+    assert loader.round_trips == 2
+
+
+def test_missing_health_record(pool):
+    sid = value("SELECT id FROM student WHERE id NOT IN (SELECT student_id FROM health_issues) LIMIT 1")
+    student = DataLoader(use_cache=False).student(sid)
+    assert student["id"] == sid and student["health_id"] is None
+
+
+def test_cached_batches(pool):
+    first = DataLoader()
+    first.student(1)
+    second = DataLoader()
+    assert second.student(1) == first.student(1)
+    assert second.round_trips == 1
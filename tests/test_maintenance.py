@@ -0,0 +1,67 @@
+import pytest
+
+import db
+import maintenance
+from conftest import assert_consistent, rows, value
+
+
+def status(request_id):
+    return value("SELECT statues FROM maintenancerequest WHERE id = %s", (request_id,))
+
+
+def test_create_request_opens_backlog(pool):
+    with db.transaction() as cursor:
+        request_id = maintenance.create_request(cursor, 1, "Broken heater", changed_by="clerk")
+    assert status(request_id) == "Pending"
+    assert [(h["old_status"], h["new_status"]) for h in maintenance.history(request_id)] == [(None, "Pending")]
+    assert_consistent()
+
+
+def test_claim_takes_the_oldest_pending(pool):
+    pending = [row["id"] for row in rows(
+        "SELECT m.id FROM maintenancerequest m JOIN room r ON r.id = m.room_id "
+        "WHERE r.building_id = 1 AND m.statues = 'Pending' ORDER BY m.date_created, m.id"
+    )]
+    with db.transaction() as cursor:
+        claimed = maintenance.claim(cursor, 1, "crew-a", limit=3)
+    assert claimed == sorted(pending[:3])
+    for request_id in claimed:
+        assert status(request_id) == "In Progress"
+        assert value("SELECT claimed_by FROM maintenancerequest WHERE id = %s", (request_id,)) == "crew-a"
+    assert_consistent()
+
+    # A second crew gets the next ones
+    with db.transaction() as cursor:
+        assert set(maintenance.claim(cursor, 1, "crew-b", limit=3)).isdisjoint(claimed)
+    assert_consistent()
+
+
+def test_transition_through_every_status(pool):
+    request_id = rows("SELECT id FROM maintenancerequest WHERE statues = 'Pending' LIMIT 1")[0]["id"]
+    with db.transaction() as cursor:
+        assert maintenance.transition(cursor, [request_id], "In Progress", "crew", claim=True) == [request_id]
+    assert_consistent()
+    with db.transaction() as cursor:
+        assert maintenance.transition(cursor, [request_id], "Resolved", "crew") == [request_id]
+    assert_consistent()
+    with db.transaction() as cursor:
+        # Already resolved: nothing to move
+        assert maintenance.transition(cursor, [request_id], "Resolved", "crew") == []
+        maintenance.transition(cursor, [request_id], "Pending", "crew")
+    assert value("SELECT claimed_by FROM maintenancerequest WHERE id = %s", (request_id,)) is None
+    assert [h["new_status"] for h in maintenance.history(request_id)][-3:] == ["In Progress", "Resolved", "Pending"]
+    assert_consistent()
+
+
+def test_bulk_transition(pool):
+    open_ids = [row["id"] for row in rows("SELECT id FROM maintenancerequest WHERE statues <> 'Resolved'")]
+    with db.transaction() as cursor:
+        assert maintenance.transition(cursor, open_ids, "Resolved", "crew") == sorted(open_ids)
+    assert value("SELECT COUNT(*) FROM maintenance_rollup WHERE requests <> 0") == 0
+    assert_consistent()
+
+
+def test_unknown_status(pool):
+    with db.transaction() as cursor:
+        with pytest.raises(ValueError):
+            maintenance.transition(cursor, [1], "Done")
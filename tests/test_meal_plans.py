@@ -0,0 +1,61 @@
+import pytest
+
+import db
+import meal_plans
+from conftest import rows, value
+
+
+def save(student_id, plan):
+    with db.transaction() as cursor:
+        meal_plans.save_plan(cursor, student_id, plan)
+
+
+def test_save_replaces_the_week(pool):
+    save(1, {"Monday": "A", "Friday": "B"})
+    assert meal_plans.student_plan(1) == {"Monday": "A", "Friday": "B"}
+    save(1, {"Monday": "B", "Tuesday": "A", "Friday": None})
+    assert meal_plans.student_plan(1) == {"Monday": "B", "Tuesday": "A"}
+    save(1, {})
+    assert meal_plans.student_plan(1) == {}
+
+
+def test_bad_meal_type_changes_nothing(pool):
+    save(1, {"Monday": "A"})
+    with pytest.raises(ValueError):
+        save(1, {"Monday": "C"})
+    assert meal_plans.student_plan(1) == {"Monday": "A"}
+
+
+def test_assign_to_a_building(pool):
+    students = [r["id"] for r in rows(
+        "SELECT s.id FROM student s JOIN room r ON r.id = s.room_id WHERE r.building_id = 2"
+    )]
+    plan = {"Saturday": "B", "Sunday": "A"}
+    with db.transaction() as cursor:
+        assert meal_plans.assign_plan(cursor, plan, building_id=2) == len(students)
+    assert all(meal_plans.student_plan(sid) == plan for sid in students)
+    # Building 1 is untouched
+    assert value(
+        "SELECT COUNT(*) FROM meals m JOIN student s ON s.id = m.student_id JOIN room r ON r.id = s.room_id "
+        "WHERE r.building_id = 1 AND m.weekday = 'Monday'"
+    ) > 0
+
+
+def test_assign_to_rooms(pool):
+    room_ids = [r["room_id"] for r in rows("SELECT DISTINCT room_id FROM student ORDER BY room_id LIMIT 2")]
+    with db.transaction() as cursor:
+        count = meal_plans.assign_plan(cursor, {}, room_ids=room_ids)
+    assert count == value(f"SELECT COUNT(*) FROM student WHERE room_id IN ({db.placeholders(room_ids)})", room_ids)
+    assert value(
+        f"SELECT COUNT(*) FROM meals WHERE student_id IN "
+        f"(SELECT id FROM student WHERE room_id IN ({db.placeholders(room_ids)}))", room_ids
+    ) == 0
+    with db.transaction() as cursor:
+        with pytest.raises(ValueError):
+            meal_plans.assign_plan(cursor, {"Monday": "A"})
+
+
+def test_forecast_matches_the_meals_table(pool):
+    forecast = {(r["building_id"], r["weekday"], r["meal_type"]): r["meals"] for r in meal_plans.forecast()}
+    assert sum(forecast.values()) == value("SELECT COUNT(*) FROM meals")
+    assert len(forecast) <= 2 * len(meal_plans.WEEKDAYS) * len(meal_plans.MEAL_TYPES)
@@ -0,0 +1,123 @@
+from datetime import datetime
+
+import pytest
+
+import cache
+import db
+import meal_plans
+import occupancy
+import repository
+import rollups
+from conftest import assert_consistent, rows, value
+
+PLAN = dict.fromkeys(meal_plans.WEEKDAYS[:3], "A")
+
+
+def free_rooms():
+    return [row["id"] for row in rows("SELECT id FROM room WHERE current_occupancy < capacity ORDER BY id")]
+
+
+def full_rooms():
+    return [row["id"] for row in rows("SELECT id FROM room WHERE current_occupancy = capacity ORDER BY id")]
+
+
+def occupants(room_id):
+    return value("SELECT current_occupancy FROM room WHERE id = %s", (room_id,))
+
+
+def register(sid, room_id, alternatives=()):
+    with db.transaction() as cursor:
+        return repository.insert_student(
+            cursor, sid, "Test Student", f"0199{sid:07d}", room_id, PLAN,
+            "Asthma", "Inhaler", "01555555555", datetime(2026, 1, 1), alternatives=alternatives
+        )
+
+
+def test_insert_student_takes_a_slot(pool):
+    room_id = free_rooms()[0]
+    before = occupants(room_id)
+    assert register(900001, room_id) == room_id
+    assert occupants(room_id) == before + 1
+    assert value("SELECT COUNT(*) FROM meals WHERE student_id = %s", (900001,)) == len(PLAN)
+    assert value("SELECT total_points FROM penalty WHERE student_id = %s", (900001,)) == 0
+    assert_consistent()
+
+
+def test_full_room_rolls_back_everything(pool):
+    room_id = full_rooms()[0]
+    with pytest.raises(occupancy.RoomFullError):
+        register(900001, room_id)
+    assert value("SELECT COUNT(*) FROM student WHERE id = %s", (900001,)) == 0
+    assert value("SELECT COUNT(*) FROM meals WHERE student_id = %s", (900001,)) == 0
+    assert_consistent()
+
+
+def test_full_room_falls_back_to_alternatives(pool):
+    full, free = full_rooms()[0], free_rooms()[0]
+    assert register(900001, full, alternatives=[full_rooms()[1], free]) == free
+    assert value("SELECT room_id FROM student WHERE id = %s", (900001,)) == free
+    assert_consistent()
+
+
+def test_rooms_never_exceed_capacity(pool):
+    room_id = free_rooms()[0]
+    placed = 0
+    for sid in range(900001, 900011):
+        try:
+            register(sid, room_id)
+            placed += 1
+        except occupancy.RoomFullError:
+            pass
+    assert occupants(room_id) == value("SELECT capacity FROM room WHERE id = %s", (room_id,))
+    assert placed < 10
+    assert_consistent()
+
+
+def test_delete_student_frees_the_slot(pool):
+    student = rows("SELECT id, room_id FROM student ORDER BY id LIMIT 1")[0]
+    before = occupants(student["room_id"])
+    with db.transaction() as cursor:
+        repository.delete_student(cursor, student["id"])
+    assert occupants(student["room_id"]) == before - 1
+    assert value("SELECT COUNT(*) FROM penalty WHERE student_id = %s", (student["id"],)) == 0
+    assert_consistent()
+
+
+def test_delete_missing_student(pool):
+    with pytest.raises(LookupError):
+        with db.transaction() as cursor:
+            repository.delete_student(cursor, 999999)
+
+
+def test_move_student_between_floors(pool):
+    student = rows("SELECT s.id, s.room_id, r.floor FROM student s JOIN room r ON r.id = s.room_id "
+                   "ORDER BY s.id LIMIT 1")[0]
+    target = rows("SELECT id FROM room WHERE current_occupancy < capacity AND floor <> %s ORDER BY id LIMIT 1",
+                  (student["floor"],))[0]["id"]
+    old_before, new_before = occupants(student["room_id"]), occupants(target)
+    with db.transaction() as cursor:
+        assert occupancy.move_student(cursor, student["id"], target) == student["room_id"]
+    assert occupants(student["room_id"]) == old_before - 1
+    assert occupants(target) == new_before + 1
+    assert_consistent()
+
+
+def test_move_into_full_room_changes_nothing(pool):
+    student = rows("SELECT id, room_id FROM student ORDER BY id LIMIT 1")[0]
+    target = [room_id for room_id in full_rooms() if room_id != student["room_id"]][0]
+    with pytest.raises(occupancy.RoomFullError):
+        with db.transaction() as cursor:
+            occupancy.move_student(cursor, student["id"], target)
+    assert value("SELECT room_id FROM student WHERE id = %s", (student["id"],)) == student["room_id"]
+    assert_consistent()
+
+
+def test_reconcile_fixes_drifted_rooms(pool):
+    room_id = full_rooms()[0]
+    with db.transaction() as cursor:
+        cursor.execute("UPDATE room SET current_occupancy = 0 WHERE id = %s", (room_id,))
+    # What the dashboard caches from the occupancy rollup
+    stale = cache.cached(rollups.SOURCE_TABLES, ("rollup", "occupancy"), rollups.occupancy)
+    assert occupancy.reconcile() == 1
+    assert cache.cached(rollups.SOURCE_TABLES, ("rollup", "occupancy"), rollups.occupancy) is not stale
+    assert_consistent()
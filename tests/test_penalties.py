@@ -0,0 +1,86 @@
+from datetime import datetime
+
+import pytest
+
+import db
+import penalties
+from conftest import assert_consistent, rows, value
+
+
+def total(student_id):
+    return value("SELECT total_points FROM penalty WHERE student_id = %s", (student_id,))
+
+
+def verify():
+    with db.transaction() as cursor:
+        return penalties.verify(cursor)
+
+
+def test_adjust_appends_to_the_ledger(pool):
+    student_id = rows("SELECT student_id FROM penalty ORDER BY student_id LIMIT 1")[0]["student_id"]
+    before = total(student_id)
+    with db.transaction() as cursor:
+        assert penalties.adjust(cursor, 3, "Noise", actor="warden", student_ids=[student_id]) == 1
+    assert total(student_id) == before + 3
+    event = penalties.history(student_id)[0]
+    assert (event["delta"], event["reason"], event["actor"]) == (3, "Noise", "warden")
+    assert verify() == []
+    assert_consistent()
+
+
+def test_deductions_stop_at_zero(pool):
+    student_id = rows("SELECT student_id FROM penalty WHERE total_points = 0 LIMIT 1")[0]["student_id"]
+    with db.transaction() as cursor:
+        penalties.adjust(cursor, 2, "Late", student_ids=[student_id])
+        penalties.adjust(cursor, -5, "Appeal", student_ids=[student_id])
+    assert total(student_id) == 0
+    # Only what was actually taken off is recorded
+    assert [event["delta"] for event in penalties.history(student_id)] == [-2, 2]
+    assert verify() == []
+    assert_consistent()
+
+
+def test_adjust_a_whole_floor(pool):
+    students = value(
+        "SELECT COUNT(*) FROM student s JOIN room r ON r.id = s.room_id WHERE r.building_id = 1 AND r.floor = 2"
+    )
+    with db.transaction() as cursor:
+        assert penalties.adjust(cursor, 1, "Fire drill", building_id=1, floor=2) == students
+    assert verify() == []
+    assert_consistent()
+
+
+def test_adjust_rejects_empty_requests(pool):
+    with db.transaction() as cursor:
+        with pytest.raises(ValueError):
+            penalties.adjust(cursor, 0, "Nothing", student_ids=[1])
+        with pytest.raises(ValueError):
+            penalties.adjust(cursor, 1, "", student_ids=[1])
+        with pytest.raises(ValueError):
+            penalties.adjust(cursor, 1, "Nobody")
+
+
+def test_verify_and_repair_drift(pool):
+    with db.transaction() as cursor:
+        cursor.execute("UPDATE penalty SET total_points = total_points + 7 WHERE student_id = 1")
+    drifted = verify()
+    assert [row["student_id"] for row in drifted] == [1]
+    with db.transaction() as cursor:
+        assert penalties.repair(cursor) == 1
+    assert verify() == []
+
+
+def test_compact_keeps_totals(pool):
+    student_id = 3
+    for day in (1, 2, 3):
+        with db.transaction() as cursor:
+            penalties.adjust(cursor, 1, "Curfew", updated=datetime(2020, 1, day), student_ids=[student_id])
+    events = value("SELECT COUNT(*) FROM penalty_event WHERE student_id = %s", (student_id,))
+    before = total(student_id)
+    with db.transaction() as cursor:
+        removed = penalties.compact(cursor, datetime(2021, 1, 1))
+    assert removed >= 2
+    assert value("SELECT COUNT(*) FROM penalty_event WHERE student_id = %s", (student_id,)) < events
+    assert total(student_id) == before
+    assert verify() == []
+    assert_consistent()
@@ -0,0 +1,78 @@
+import contextvars
+import json
+import sqlite3
+
+import pytest
+
+import profiling
+
+
+def test_fingerprint_folds_literals_and_lists():
+    assert profiling.fingerprint("SELECT *\n  FROM student WHERE id IN (%s, %s, %s)") == \
+        "SELECT * FROM student WHERE id IN (...)"
+    assert profiling.fingerprint("SELECT * FROM student WHERE name = 'O''Neil' AND id > 42") == \
+        "SELECT * FROM student WHERE name = ? AND id > ?"
+    assert profiling.fingerprint("INSERT INTO meals VALUES (%s, %s), (%s, %s)") == "INSERT INTO meals VALUES (...)"
+
+
+def connection():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)")
+    conn.executemany("INSERT INTO t VALUES (?, ?)", [(i, f"n{i}") for i in range(5)])
+    return conn
+
+
+def test_cursor_records_rows_time_and_scope():
+    profiler = profiling.QueryProfiler(slow_ms=10**6)
+    cursor = profiler.wrap(connection().cursor())
+    with profiling.scope("Rooms"):
+        assert profiling.current_scope() == "Rooms"
+        cursor.execute("SELECT * FROM t WHERE id < ?", (3,))
+        assert len(cursor.fetchall()) == 3
+    assert profiling.current_scope() is None
+    cursor.executemany("UPDATE t SET name = ? WHERE id = ?", [("a", 1), ("b", 2)])
+    with pytest.raises(sqlite3.OperationalError):
+        cursor.execute("SELECT nope FROM t")
+    cursor.close()
+
+    assert profiler.stats()["queries"] == 3 and profiler.stats()["errors"] == 1
+    top = {row["fingerprint"]: row for row in profiler.top()}
+    assert top["SELECT * FROM t WHERE id < ?"]["rows"] == 3
+    assert top["UPDATE t SET name = ? WHERE id = ?"]["rows"] == 2
+    assert profiler.slow_queries() == []
+
+
+def test_slow_queries_are_logged(tmp_path):
+    log = tmp_path / "slow.jsonl"
+    profiler = profiling.QueryProfiler(slow_ms=0, log_path=str(log), max_slow=2)
+    cursor = profiler.wrap(connection().cursor())
+    for i in range(3):
+        cursor.execute("SELECT name FROM t WHERE id = ?", (i,))
+        cursor.fetchone()
+    cursor.close()
+
+    assert len(profiler.slow_queries()) == 2
+    lines = log.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 3 and json.loads(lines[0])["params"] == 1
+    summary = profiling.summarize(lines)
+    assert [(row["fingerprint"], row["count"]) for row in summary] == [("SELECT name FROM t WHERE id = ?", 3)]
+
+
+def test_rerun_profile_counts_its_own_queries():
+    def rerun():
+        profile = profiling.start_rerun()
+        profile.max_queries = 1
+        cursor = profiling.QueryProfiler().wrap(connection().cursor())
+        cursor.execute("SELECT 1")
+        cursor.execute("SELECT 2")
+        cursor.close()
+        return profile
+
+    profile = contextvars.copy_context().run(rerun)
+    assert profile.round_trips == 2 and len(profile.queries) == 1
+
+
+def test_from_settings():
+    assert profiling.from_settings({"enabled": False}) is None
+    profiler = profiling.from_settings({"slow_ms": "50", "max_slow": 3})
+    assert profiler.slow_ms == 50.0 and profiler.stats()["log_path"] is None
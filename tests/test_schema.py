@@ -0,0 +1,35 @@
+import generate_data
+import migrations
+from conftest import assert_consistent, value
+
+
+def test_migrate_records_every_version(pool):
+    versions = [version for version, _, _ in migrations.SQLITE_MIGRATIONS]
+    assert value("SELECT COUNT(*) FROM schema_version") == len(versions)
+    with pool.connection() as conn:
+        assert migrations.migrate(conn, log=lambda message: None) == []
+
+
+def test_generated_data_is_consistent(pool):
+    assert value("SELECT COUNT(*) FROM student") == 120
+    assert value("SELECT COUNT(*) FROM building") == 2
+    assert value("SELECT COUNT(*) FROM room") == 60
+    assert value("SELECT COUNT(*) FROM maintenancerequest WHERE statues = 'Pending'") > 0
+    # Every non-zero total got its opening balance in the ledger
+    assert value("SELECT COUNT(*) FROM penalty WHERE total_points <> 0") == \
+        value("SELECT COUNT(DISTINCT student_id) FROM penalty_event")
+    assert_consistent()
+
+
+def test_reset_empties_every_table(pool):
+    with pool.connection() as conn:
+        generate_data.reset(conn)
+    for table in generate_data.APP_TABLES + generate_data.TABLES:
+        assert value(f"SELECT COUNT(*) FROM {table}") == 0
+
+
+def test_hot_queries_use_indexes(pool):
+    with pool.connection() as conn:
+        failed = [(name, table, access) for name, table, access, _, ok in migrations.check_query_plans(conn)
+                  if not ok]
+    assert failed == []
@@ -0,0 +1,103 @@
+from datetime import datetime
+
+import cache
+import checkout
+import db
+import occupancy
+import repository
+import search
+import writes
+from conftest import rows
+
+
+def student(sid, name, contact, room_id=1, building_id=1):
+    return {"id": sid, "student_Name": name, "contact": contact, "room_id": room_id, "building_id": building_id}
+
+
+INDEX = search.StudentIndex([
+    student(1, "Khalil Omar", "01000000001"),
+    student(2, "Mona Khaled", "01000000002", room_id=2),
+    student(3, "Omar Farouk", "01100000003", room_id=3, building_id=2),
+    student(12, "Omar Farouk", "01200000012", room_id=3, building_id=2),
+])
+
+
+def ids(results):
+    return [row["id"] for row in results[0]]
+
+
+def test_digits_match_ids_then_contact_prefixes():
+    assert ids(INDEX.search("12")) == [12]
+    # Too short for a contact prefix: every contact starts "01"
+    assert ids(INDEX.search("01")) == [1]
+    assert ids(INDEX.search("010")) == [1, 2]
+    assert ids(INDEX.search("01200000012")) == [12]
+
+
+def test_names_rank_whole_name_then_word_then_fuzzy():
+    assert ids(INDEX.search("omar")) == [3, 12, 1]
+    assert ids(INDEX.search("  KHAL ")) == [1, 2]
+    # Fuzzy: both "Khaled" and "Khalil" are close enough, the closer first
+    assert ids(INDEX.search("khaleel")) == [2, 1]
+
+
+def test_room_and_building_narrow_or_list():
+    assert ids(INDEX.search("omar", building_id=1)) == [1]
+    assert ids(INDEX.search(room_id=3)) == [3, 12]
+    assert ids(INDEX.search(building_id=1)) == [1, 2]
+    assert ids(INDEX.search(page=1, page_size=3)) == [12]
+    assert INDEX.search(page=1, page_size=3)[1] == 4
+
+
+def test_apply_matches_a_fresh_build():
+    index = search.StudentIndex([student(1, "Khalil Omar", "01000000001"), student(2, "Mona Khaled", "01000000002")])
+    index.apply([1, 2, 5], [student(1, "Khalil Omar", "01000000001", room_id=7), student(5, "Zeina Adel", "01500000005")])
+    fresh = search.StudentIndex([student(1, "Khalil Omar", "01000000001", room_id=7), student(5, "Zeina Adel", "01500000005")])
+    for query in ("", "mona", "khaled", "zeina", "010", "015", "2"):
+        assert index.search(query) == fresh.search(query)
+    assert index.search(room_id=7) == fresh.search(room_id=7)
+
+
+def everyone(index):
+    return index.search(page_size=10**6)
+
+
+def test_writes_patch_the_cached_index(pool):
+    index = search.get_index()
+    room_id = rows("SELECT id FROM room WHERE current_occupancy < capacity ORDER BY id")[0]["id"]
+    with db.transaction(invalidates=("student", "room")) as cursor:
+        repository.insert_student(cursor, 900001, "Yara Nabil", "01999999999", room_id, {}, None, None, None,
+                                  datetime(2026, 1, 1))
+    target = rows("SELECT id FROM room WHERE current_occupancy < capacity AND id <> %s ORDER BY id", (room_id,))[0]["id"]
+    with db.transaction(invalidates=("student", "room")) as cursor:
+        occupancy.move_student(cursor, 900001, target)
+    with db.transaction() as cursor:
+        repository.delete_student(cursor, 1)
+    checkout.checkout([2, 3])
+
+    # Still the same object, and the same as a fresh load
+    assert search.get_index() is index
+    assert everyone(index) == everyone(search.StudentIndex.load())
+    assert ids(index.search("yara")) == [900001]
+    assert index.search("yara")[0][0]["room_id"] == target
+
+
+def test_rolled_back_writes_leave_the_index_alone(pool):
+    index = search.get_index()
+    before = everyone(index)
+    try:
+        with db.transaction() as cursor:
+            repository.delete_student(cursor, 1)
+            raise RuntimeError("abandoned")
+    except RuntimeError:
+        pass
+    assert everyone(search.get_index()) == before
+
+
+def test_pipeline_writes_patch_the_index(pool):
+    index = search.get_index()
+    pipeline = writes.WritePipeline(pool, cache.current_cache(), workers=1)
+    ok, _ = pipeline.submit(lambda cursor: repository.delete_student(cursor, 1), "deleted", str,
+                            invalidates=("student", "room")).result()
+    assert ok
+    assert search.get_index() is index and 1 not in ids(index.search("1"))
@@ -0,0 +1,58 @@
+import pytest
+
+import frames
+import tables
+from conftest import rows
+
+
+def walk(table, page_size, filters=None):
+    keys, after = [], None
+    while True:
+        page, after = tables.fetch_page(table, filters=filters, after=after, page_size=page_size)
+        keys.extend(tuple(row[k] for k in tables.PRIMARY_KEYS[table]) for row in page)
+        if after is None:
+            return keys
+
+
+@pytest.mark.parametrize("page_size", [1, 7, 50, 10000])
+def test_paging_across_a_composite_key(pool, page_size):
+    every = [(row["student_id"], row["weekday"]) for row in rows(
+        "SELECT student_id, weekday FROM meals ORDER BY student_id, weekday"
+    )]
+    assert walk("meals", page_size) == every
+
+
+def test_paging_with_filters(pool):
+    expected = [(row["student_id"], row["weekday"]) for row in rows(
+        "SELECT student_id, weekday FROM meals WHERE meal_type = 'A' ORDER BY student_id, weekday"
+    )]
+    assert walk("meals", 9, filters={"meal_type": "A"}) == expected
+
+
+def test_page_query_spells_out_composite_keys(pool):
+    _, sql, params = tables.page_query("meals", after=(5, "Monday"), page_size=10)
+    assert "(student_id, weekday) >" not in sql
+    assert params == [5, 5, 5, "Monday", 11]
+
+
+def test_paging_a_single_key(pool):
+    assert walk("student", 13) == [(row["id"],) for row in rows("SELECT id FROM student ORDER BY id")]
+
+
+def test_frame_pages_match_dict_pages(pool):
+    page, after = tables.fetch_page("meals", page_size=25)
+    frame, frame_after = frames.fetch_page("meals", page_size=25)
+    assert frame_after == after
+    assert frame.to_dict("records") == [dict(row) for row in page]
+    assert str(frame["weekday"].dtype) == "category"
+
+
+def test_filters_are_validated(pool):
+    with pytest.raises(ValueError):
+        tables.fetch_page("student", filters={"room_id": "abc"})
+
+
+def test_count_rows(pool):
+    assert tables.count_rows("student") == (120, False)
+    assert tables.count_rows("student", {"room_id": "1"})[0] == \
+        len(rows("SELECT id FROM student WHERE room_id = 1"))
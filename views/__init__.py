@@ -0,0 +1,98 @@
+import importlib
+import sys
+import threading
+import time
+from datetime import datetime
+
+from pytz import timezone
+
+import profiling
+from loader import DataLoader
+
+# ---------------------- Page Registry ----------------------
+# Every page of the app is a module in this package with a render(rerun)
+# function.  A page module is imported the first time anyone opens it, so
+# a rerun only loads and runs the page being viewed, and the module cache
+# keeps each page's static setup for the life of the process.  Import
+# (cold start) and render (warm rerun) times are kept per page for the
+# sidebar.
+
+PAGES = {
+    "student": "📚 Student",
+    "penalty": "⚠️ Penalty",
+    "maintenancerequest": "🔧 Maintenance Request",
+    "meals": "🍽️ Meals",
+    "room": "🚪 Room",
+    "building": "🏢 Building",
+    "health_issues": "🏥 Health Issues",
+    "dashboard": "📊 Dashboard",
+}
+BY_LABEL = {label: name for name, label in PAGES.items()}
+# Pages that show a database table of the same name
+TABLE_PAGES = tuple(name for name in PAGES if name != "dashboard")
+
+TIMEZONE = timezone("Africa/Cairo")
+
+_lock = threading.Lock()
+_timings = {}
+
+
+class Rerun:
+    # What a page needs that is fresh on every rerun: the clock, and one
+    # DataLoader whose declared lookups are answered in a single query
+    def __init__(self):
+        self.now = datetime.now(TIMEZONE)
+        self.loader = DataLoader()
+
+    def room_count(self):
+        return self.loader.room_count()
+
+    def student_exists(self, student_id):
+        return self.loader.student(student_id) is not None
+
+    def contact_exists(self, contact):
+        return self.loader.student_by_contact(contact) is not None
+
+
+def _timing(name):
+    return _timings.setdefault(name, {"import_ms": None, "renders": 0, "last_ms": None, "total_ms": 0.0})
+
+
+def load(name):
+    module_name = f"{__name__}.{name}"
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    started = time.perf_counter()
+    module = importlib.import_module(module_name)
+    with _lock:
+        _timing(name)["import_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return module
+
+
+def render(name, rerun):
+    page = load(name)
+    started = time.perf_counter()
+    try:
+        with profiling.scope(name):
+            page.render(rerun)
+    finally:
+        # Also counted when the page stops early (st.rerun, st.stop)
+        elapsed = (time.perf_counter() - started) * 1000
+        with _lock:
+            timing = _timing(name)
+            timing["renders"] += 1
+            timing["last_ms"] = round(elapsed, 1)
+            timing["total_ms"] += elapsed
+
+
+def timings():
+    with _lock:
+        return {
+            name: {
+                "import_ms": t["import_ms"],
+                "renders": t["renders"],
+                "last_ms": t["last_ms"],
+                "mean_ms": round(t["total_ms"] / t["renders"], 1) if t["renders"] else None,
+            }
+            for name, t in _timings.items()
+        }
@@ -0,0 +1,32 @@
+from functools import partial
+
+import streamlit as st
+
+import db
+import repository
+import writes
+from views import common
+
+# ---------------------- Building Page ----------------------
+# Add buildings
+
+
+def render(rerun):
+    common.table_view("building")
+
+    st.markdown("---")
+    st.markdown("### ➕ Add New Building")
+    with st.expander("➕ Add Building", expanded=True):
+        building_id = st.number_input("Building ID", step=1, min_value=1)
+        building_name = st.text_input("Building Name")
+
+        if st.button("Add Building"):
+            writes.submit(
+                partial(repository.insert_building, building_id=building_id, building_name=building_name),
+                success="✅ Building added successfully!",
+                describe_error=lambda err, building_id=building_id: (
+                    f"❌ Building ID {building_id} already exists!"
+                    if db.is_duplicate(err) else f"❌ Error: {err}"
+                ),
+                invalidates=("building",)
+            )
@@ -0,0 +1,227 @@
+from functools import partial
+
+import pandas as pd
+import streamlit as st
+
+import cache
+import db
+import export
+import frames
+import repository
+import search
+import tables
+import views
+
+# ---------------------- Shared Page Parts ----------------------
+# The table view every table page starts with, the student finder, and the
+# cached reads more than one page uses.
+
+
+def load_table(table_name, columns=None, filters=None, after=None, page_size=tables.DEFAULT_PAGE_SIZE):
+    # One keyset page of the table; returns (DataFrame, key to start the next page from).
+    # The compact DataFrame itself is cached (see frames.py), so callers must not modify it.
+    if table_name not in tables.TABLE_COLUMNS:
+        return pd.DataFrame(), None
+    try:
+        key = ("frame", tuple(columns or ()), tuple(sorted((filters or {}).items())), after, page_size)
+        return cache.cached(
+            (table_name,), key,
+            lambda: frames.fetch_page(table_name, columns, filters, after, page_size)
+        )
+    except ValueError as err:
+        st.warning(f"⚠️ {err}")
+        return pd.DataFrame(), None
+    except db.Error as err:
+        st.error(f"Error loading table: {err}")
+        return pd.DataFrame(), None
+
+
+def get_pager(table_name, signature):
+    # Start keys of every page visited so far, reset whenever the query changes
+    state_key = f"pager_{table_name}"
+    pager = st.session_state.get(state_key)
+    if pager is None or pager["signature"] != signature:
+        pager = {"signature": signature, "starts": [None]}
+        st.session_state[state_key] = pager
+    return pager
+
+
+def next_page(pager, next_key):
+    pager["starts"].append(next_key)
+
+
+def previous_page(pager):
+    if len(pager["starts"]) > 1:
+        pager["starts"].pop()
+
+
+def count_table_rows(table_name, filters=None):
+    return cache.cached(
+        (table_name,), ("count", tuple(sorted((filters or {}).items()))),
+        lambda: tables.count_rows(table_name, filters)
+    )
+
+
+def get_buildings():
+    return cache.cached(("building",), ("buildings",), repository.buildings)
+
+
+def building_names():
+    return {b["id"]: b["building_name"] for b in get_buildings()}
+
+
+def building_picker(key, allow_any=True, label="Building", any_label="Any building", options=None):
+    # Building selectbox; returns the chosen id, or None for "any" (or no
+    # buildings at all).  `options` narrows the choice to those ids.
+    names = building_names()
+    choices = ([None] if allow_any else []) + list(names if options is None else options)
+    return st.selectbox(label, choices, key=key,
+                        format_func=lambda b: any_label if b is None else names.get(b, f"Building {b}"))
+
+
+def use_student(student_id, fields):
+    # Runs before the rerun, so the forms below start out with this ID
+    for field in fields:
+        st.session_state[field] = student_id
+
+
+def change_search_page(step):
+    st.session_state.search_page = max(st.session_state.search_page + step, 0)
+
+
+# ---------------------- Student Finder ----------------------
+def student_finder(fields):
+    # Search panel whose "Use in forms" button copies the chosen student's
+    # ID into the page's student ID inputs (`fields`)
+    with st.expander("🔍 Find Student", expanded=False):
+        col1, col2, col3 = st.columns([3, 2, 1])
+        with col1:
+            query = st.text_input("Name, contact or student ID", key="search_query")
+        with col2:
+            search_building = building_picker("search_building")
+        with col3:
+            search_room = st.number_input("Room (0 = any)", step=1, min_value=0, format="%d", key="search_room")
+
+        # Back to the first page whenever the search changes
+        signature = (query, search_building, search_room)
+        if st.session_state.get("search_signature") != signature:
+            st.session_state.search_signature = signature
+            st.session_state.search_page = 0
+        if query or search_building is not None or search_room:
+            results, total = search.get_index().search(
+                query, search_room or None, search_building, st.session_state.search_page
+            )
+            if not results:
+                st.info("No matching students")
+            else:
+                first = st.session_state.search_page * search.DEFAULT_PAGE_SIZE
+                st.dataframe(pd.DataFrame(results), hide_index=True)
+                st.caption(f"Matches {first + 1}–{first + len(results)} of {total:,}")
+                col1, col2, col3, col4 = st.columns([1, 1, 3, 2])
+                with col1:
+                    st.button("⬅️", disabled=first == 0, on_click=change_search_page, args=(-1,),
+                              key="search_prev")
+                with col2:
+                    st.button("➡️", disabled=first + len(results) >= total, on_click=change_search_page,
+                              args=(1,), key="search_next")
+                with col3:
+                    chosen = st.selectbox(
+                        "Student", [r["id"] for r in results], label_visibility="collapsed",
+                        format_func=lambda i: next(f"{r['id']} · {r['student_Name']}" for r in results if r["id"] == i),
+                        key="search_choice"
+                    )
+                with col4:
+                    st.button("Use in forms", on_click=use_student,
+                              args=(chosen, fields), key="search_use")
+
+
+# ---------------------- Table View ----------------------
+def table_view(table_choice):
+    # One keyset page of the table with column/filter pickers, paging and export
+    st.subheader(f"{views.PAGES[table_choice]} Table")
+    all_columns = list(tables.TABLE_COLUMNS[table_choice])
+
+    with st.expander("🔎 Columns & Filters", expanded=False):
+        columns = st.multiselect("Columns", all_columns, default=all_columns, key=f"columns_{table_choice}")
+        filter_columns = st.multiselect("Filter by", all_columns, key=f"filter_by_{table_choice}")
+        filters = {}
+        for column in filter_columns:
+            kind = tables.TABLE_COLUMNS[table_choice][column]
+            hint = {"text": "starts with", "timestamp": "on/after YYYY-MM-DD"}.get(kind, "equals")
+            value = st.text_input(f"{column} ({hint})", key=f"filter_{table_choice}_{column}")
+            if value:
+                filters[column] = value
+        page_size = st.selectbox("Rows per page", [25, 50, 100, 250], index=1, key=f"page_size_{table_choice}")
+
+    if not columns:
+        st.warning("⚠️ Select at least one column to display")
+    else:
+        pager = get_pager(table_choice, (tuple(sorted(filters.items())), page_size))
+        df, next_key = load_table(table_choice, columns, filters, pager["starts"][-1], page_size)
+
+        if not df.empty:
+            st.dataframe(df)
+        else:
+            st.info("No data found in this table")
+
+        try:
+            total, estimated = count_table_rows(table_choice, filters)
+            page_number = len(pager["starts"])
+            first_row = (page_number - 1) * page_size + 1 if not df.empty else 0
+            st.caption(
+                f"Page {page_number} · rows {first_row}–{first_row + len(df) - 1 if not df.empty else 0} "
+                f"of {'≈' if estimated else ''}{total:,}"
+            )
+        except (ValueError, *db.Error):
+            pass
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.button("⬅️ Previous", disabled=len(pager["starts"]) == 1,
+                      on_click=previous_page, args=(pager,), key=f"prev_{table_choice}")
+        with col2:
+            st.button("Next ➡️", disabled=next_key is None,
+                      on_click=next_page, args=(pager, next_key), key=f"next_{table_choice}")
+
+        with st.expander("⬇️ Export", expanded=False):
+            st.caption("Exports the selected columns and filters above, in chunks straight off the database.")
+            export_format = st.radio("Format", export.FORMATS, horizontal=True,
+                                     format_func=str.upper, key=f"export_format_{table_choice}")
+            since = until = None
+            if table_choice in export.DATE_COLUMNS:
+                col1, col2 = st.columns(2)
+                with col1:
+                    since = st.date_input(f"{export.DATE_COLUMNS[table_choice]} from", value=None,
+                                          key=f"export_since_{table_choice}")
+                with col2:
+                    until = st.date_input("to (inclusive)", value=None, key=f"export_until_{table_choice}")
+            # Streamlit holds a download in memory, so big exports become a
+            # file on the server instead (see export.py)
+            config = st.secrets.get("export", {})
+            max_rows = int(config.get("download_max_rows", export.DOWNLOAD_MAX_ROWS))
+            try:
+                total, _ = count_table_rows(table_choice, filters)
+            except (ValueError, *db.Error):
+                total = 0
+            if total <= max_rows:
+                # Runs only when clicked, on its own thread; the pool is captured
+                # here because that thread has no script context
+                st.download_button(
+                    "Download", file_name=f"{table_choice}.{export_format}",
+                    data=partial(export.download, table_choice, export_format, columns, filters,
+                                 since, until, max_rows=max_rows, pool=db.current_pool()),
+                    mime="text/csv" if export_format == "csv" else "application/vnd.apache.parquet",
+                    on_click="ignore", key=f"export_{table_choice}"
+                )
+            else:
+                directory = config.get("directory", export.DEFAULT_DIRECTORY)
+                st.caption(f"Over {max_rows:,} rows is too big to download here; "
+                           f"the export is written to {directory}/ on the server instead.")
+                if st.button("Save on Server", key=f"export_save_{table_choice}"):
+                    try:
+                        with st.spinner("Exporting..."):
+                            path, saved = export.save(table_choice, export_format, columns, filters,
+                                                      since, until, directory=directory)
+                        st.success(f"✅ Saved {saved:,} rows to {path}")
+                    except (ValueError, OSError, *db.Error) as err:
+                        st.error(f"❌ Export failed: {err}")
@@ -0,0 +1,78 @@
+import pandas as pd
+import streamlit as st
+
+import cache
+import db
+import rollups
+import views
+import writes
+from views import common
+
+# ---------------------- Dashboard Page ----------------------
+# Occupancy, maintenance backlog and penalty figures, read from the rollup
+# tables (see rollups.py)
+
+
+def get_rollup(loader):
+    # Dashboard rollups are cached on the base tables they summarise
+    return cache.cached(rollups.SOURCE_TABLES, ("rollup", loader.__name__), loader)
+
+
+def render(rerun):
+    st.subheader(views.PAGES["dashboard"])
+    try:
+        floors = pd.DataFrame(get_rollup(rollups.occupancy), columns=["building_id", "floor", "rooms", "beds", "occupied"])
+        backlog = pd.DataFrame(get_rollup(rollups.backlog), columns=["statues", "created_day", "requests"])
+        distribution = pd.DataFrame(get_rollup(rollups.penalty_distribution), columns=["total_points", "students"])
+    except db.Error as err:
+        st.error(f"Error loading dashboard: {err}")
+    else:
+        beds, occupied = int(floors["beds"].sum()), int(floors["occupied"].sum())
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Rooms", f"{int(floors['rooms'].sum()):,}")
+        with col2:
+            st.metric("Beds", f"{beds:,}")
+        with col3:
+            st.metric("Free Beds", f"{beds - occupied:,}")
+        with col4:
+            st.metric("Occupancy", f"{occupied / beds:.0%}" if beds else "–")
+
+        st.markdown("### 🏢 Occupancy by Building")
+        building_names = common.building_names()
+        floors["building"] = floors["building_id"].map(lambda b: building_names.get(b, f"Building {b}"))
+        floors["free"] = floors["beds"] - floors["occupied"]
+        by_building = floors.groupby("building", sort=False)[["rooms", "beds", "occupied", "free"]].sum()
+        st.dataframe(by_building)
+        st.bar_chart(by_building[["occupied", "free"]])
+
+        with st.expander("🚪 Free Beds per Floor"):
+            st.dataframe(
+                floors.pivot_table(index="building", columns="floor", values="free", aggfunc="sum", fill_value=0)
+            )
+
+        st.markdown("### 🔧 Open Maintenance Requests")
+        if backlog.empty:
+            st.info("No open maintenance requests")
+        else:
+            age = (pd.Timestamp(rerun.now.date()) - pd.to_datetime(backlog["created_day"])).dt.days
+            backlog["age"] = pd.cut(age, bins=rollups.AGE_BINS, labels=rollups.AGE_LABELS)
+            st.dataframe(backlog.pivot_table(index="statues", columns="age", values="requests",
+                                             aggfunc="sum", fill_value=0, observed=False))
+
+        st.markdown("### ⚠️ Penalty Points Distribution")
+        if distribution.empty:
+            st.info("No penalty records yet")
+        else:
+            st.bar_chart(distribution.set_index("total_points")["students"])
+
+    st.markdown("---")
+    st.caption("Figures come from summary tables kept up to date by every save. "
+               "Rebuild them if the base tables were changed outside the app.")
+    if st.button("🔄 Rebuild Dashboard", key="rebuild_rollups"):
+        writes.submit(
+            rollups.rebuild,
+            success="✅ Dashboard rebuilt from the base tables",
+            describe_error=lambda err: f"❌ Error rebuilding dashboard: {err}",
+            invalidates=rollups.SOURCE_TABLES
+        )
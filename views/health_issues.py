@@ -0,0 +1,128 @@
+import time
+from functools import partial
+
+import pandas as pd
+import streamlit as st
+
+import db
+import health
+import repository
+import writes
+from views import common
+
+# ---------------------- Health Issues Page ----------------------
+# Emergency roster by condition, building and room, guardian lookup, and
+# adding or updating a student's health record
+
+# Student ID inputs the student finder fills in
+STUDENT_ID_FIELDS = ("health_student_id",)
+
+
+def render(rerun):
+    # Declare the lookups this page's forms will make, from the widget values
+    # already in session state, so they are fetched together
+    rerun.loader.need_student(st.session_state.get("health_student_id"))
+    common.student_finder(STUDENT_ID_FIELDS)
+    common.table_view("health_issues")
+    emergency_roster()
+
+    st.markdown("---")
+    st.markdown("### 🏥 Health Issues Management")
+
+    with st.expander("➕ Add/Update Health Issues", expanded=True):
+        student_id = st.number_input("Student ID", step=1, min_value=1, key="health_student_id")
+
+        if student_id:
+            student = rerun.loader.student(student_id)
+            if student:
+                # The loader joins the health record onto the student row
+                existing = student if student["health_id"] is not None else None
+                st.info(f"👤 Student: {student['student_Name']}")
+
+                if existing:
+                    st.warning("⚠️ This student already has a health record. Updating existing record.")
+                    default_desc = existing['description'] if existing['description'] else ""
+                    default_prescription = existing['prescription'] if existing['prescription'] else ""
+                    default_guardian = existing['guardian_contact']
+                else:
+                    st.info("📝 This student has no health record yet. Adding new record.")
+                    default_desc = ""
+                    default_prescription = ""
+                    default_guardian = ""
+
+                health_desc = st.text_area("Health Description", value=default_desc, height=100)
+                prescription = st.text_input("Prescription", value=default_prescription)
+                guardian_contact = st.text_input("Guardian Contact (11 digits)", value=default_guardian, max_chars=11)
+
+                if st.button("💾 Save Health Record", key="save_health"):
+                    if not guardian_contact:
+                        st.error("❌ Guardian Contact is required!")
+                    elif len(guardian_contact) != 11:
+                        st.error("❌ Guardian contact must be exactly 11 digits!")
+                    else:
+                        writes.submit(
+                            partial(repository.save_health_record, student_id=student_id, exists=existing is not None,
+                                    health_desc=health_desc, prescription=prescription,
+                                    guardian_contact=guardian_contact),
+                            success="✅ Health record saved successfully!",
+                            describe_error=lambda err: f"❌ Error saving health record: {err}",
+                            invalidates=("health_issues",)
+                        )
+            else:
+                st.error(f"❌ Student ID {student_id} does not exist!")
+
+
+# ---------------------- Emergency Roster ----------------------
+def emergency_roster():
+    # Answered from the shared in-memory index (see health.py)
+    st.markdown("---")
+    st.markdown("### 🚨 Emergency Roster")
+    try:
+        index = health.get_index()
+    except db.Error as err:
+        st.error(f"Error loading health records: {err}")
+        return
+
+    col1, col2, col3 = st.columns([3, 2, 1])
+    with col1:
+        condition = st.text_input("Condition or medication", key="roster_condition",
+                                  placeholder="e.g. asthma, epipen")
+    with col2:
+        building_id = common.building_picker("roster_building")
+    with col3:
+        room_id = st.number_input("Room (0 = any)", step=1, min_value=0, format="%d", key="roster_room")
+    common_conditions = ", ".join(f"{word} ({count})" for word, count in index.conditions()[:8])
+    if common_conditions:
+        st.caption(f"Most common: {common_conditions}")
+
+    if condition or building_id is not None or room_id:
+        started = time.perf_counter()
+        rows = index.find(condition, building_id, room_id or None)
+        elapsed = (time.perf_counter() - started) * 1000
+        if not rows:
+            st.info("No matching health records")
+        else:
+            st.dataframe(pd.DataFrame(rows, columns=health.ROSTER_COLUMNS), hide_index=True)
+            st.caption(f"{len(rows):,} of {len(index):,} health records · found in {elapsed:.1f} ms")
+            title = " · ".join(part for part in (
+                condition.strip() or "All conditions",
+                common.building_names().get(building_id) if building_id is not None else None,
+                f"Room {room_id}" if room_id else None,
+            ) if part)
+            col1, col2 = st.columns(2)
+            with col1:
+                st.download_button("⬇️ CSV Roster", health.roster_csv(rows), file_name="health_roster.csv",
+                                   mime="text/csv", on_click="ignore", key="roster_csv")
+            with col2:
+                st.download_button("🖨️ Printable Roster", health.roster_html(rows, title),
+                                   file_name="health_roster.html", mime="text/html",
+                                   on_click="ignore", key="roster_print")
+
+    guardian = st.text_input("Guardian contact", max_chars=11, key="roster_guardian",
+                             help="Every student this number is the guardian contact for")
+    if guardian:
+        wards = index.by_guardian(guardian)
+        if wards:
+            st.dataframe(pd.DataFrame(wards, columns=health.ROSTER_COLUMNS), hide_index=True)
+        else:
+            st.info("No students list this guardian contact")
@@ -0,0 +1,109 @@
+from functools import partial
+
+import pandas as pd
+import streamlit as st
+
+import db
+import maintenance
+import writes
+from views import common
+
+# ---------------------- Maintenance Request Page ----------------------
+# New requests, the per-building work queue and status history
+
+
+def render(rerun):
+    common.table_view("maintenancerequest")
+
+    st.markdown("---")
+    st.markdown("### ➕ Add Maintenance Request")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        room_id = st.number_input("Room ID", step=1, min_value=1)
+        stat = st.selectbox("Status", maintenance.STATUSES)
+    with col2:
+        desc = st.text_area("Description")
+
+    if st.button("Add Request", type="primary"):
+        if not room_id:
+            st.error("❌ Room ID is required")
+        elif not desc:
+            st.error("❌ Description is required")
+        else:
+            def describe_request_error(err, room_id=room_id):
+                if isinstance(err, db.IntegrityError):
+                    if db.is_missing_reference(err):
+                        return f"❌ Room ID {room_id} does not exist!"
+                    return f"❌ Database error: {err}"
+                return f"❌ Error adding request: {err}"
+
+            writes.submit(
+                partial(maintenance.create_request, room_id=room_id, description=desc, status=stat),
+                success=lambda request_id: f"✅ Maintenance request #{request_id} added successfully!",
+                describe_error=describe_request_error,
+                invalidates=("maintenancerequest",)
+            )
+
+    st.markdown("---")
+    st.markdown("### 🧰 Work Queue")
+    if not common.get_buildings():
+        st.info("No buildings yet")
+    else:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            queue_building = common.building_picker("mr_building", allow_any=False)
+        with col2:
+            queue_statuses = st.multiselect("Status", maintenance.OPEN_STATUSES,
+                                            default=list(maintenance.OPEN_STATUSES), key="mr_statuses")
+        with col3:
+            queue_size = st.number_input("Oldest", step=10, min_value=1,
+                                         value=maintenance.DEFAULT_QUEUE_SIZE, key="mr_queue_size")
+        crew = st.text_input("Your name / crew", key="mr_crew")
+
+        queue = maintenance.open_requests(queue_building, queue_statuses, queue_size) if queue_statuses else []
+        if queue:
+            st.dataframe(pd.DataFrame(queue))
+        else:
+            st.info("Nothing waiting in this building")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            claim_count = st.number_input("Requests to claim", step=1, min_value=1, value=5, key="mr_claim_count")
+            if st.button("🙋 Claim Oldest Pending", key="mr_claim"):
+                if not crew:
+                    st.error("❌ Enter your name or crew first")
+                else:
+                    writes.submit(
+                        partial(maintenance.claim, building_id=queue_building, crew=crew, limit=claim_count),
+                        success=lambda claimed: (
+                            f"✅ Claimed request(s) {', '.join(f'#{r}' for r in claimed)}"
+                            if claimed else "ℹ️ No pending requests left to claim"
+                        ),
+                        describe_error=lambda err: f"❌ Error claiming requests: {err}",
+                        invalidates=("maintenancerequest",)
+                    )
+        with col2:
+            select_all = st.checkbox("Select every listed request", key="mr_select_all")
+            selected = st.multiselect(
+                "Requests", [r["id"] for r in queue],
+                default=[r["id"] for r in queue] if select_all else [],
+                format_func=lambda r: f"#{r}", key=f"mr_selected_{select_all}"
+            )
+            new_status = st.selectbox("Move to", maintenance.STATUSES, index=2, key="mr_new_status")
+            if st.button("Apply to Selected", key="mr_apply", disabled=not selected):
+                writes.submit(
+                    partial(maintenance.transition, request_ids=selected, new_status=new_status,
+                            changed_by=crew or None),
+                    success=lambda changed, status=new_status: f"✅ {len(changed)} request(s) moved to {status}",
+                    describe_error=lambda err: f"❌ Error updating requests: {err}",
+                    invalidates=("maintenancerequest",)
+                )
+
+    with st.expander("📜 Status History"):
+        history_id = st.number_input("Request ID", step=1, min_value=1, key="mr_history_id")
+        changes = maintenance.history(history_id)
+        if changes:
+            st.dataframe(pd.DataFrame(changes))
+        else:
+            st.info(f"No recorded status changes for request #{history_id}")
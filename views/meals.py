@@ -0,0 +1,101 @@
+from functools import partial
+
+import pandas as pd
+import streamlit as st
+
+import cache
+import meal_plans
+import writes
+from views import common
+
+# ---------------------- Meals Page ----------------------
+# Weekly meal plans, bulk plan assignment and the kitchen forecast
+
+# Student ID inputs the student finder fills in
+STUDENT_ID_FIELDS = ("meal_student_id",)
+
+
+def get_meal_forecast():
+    return cache.cached(("meals", "student", "room"), ("meal_forecast",), meal_plans.forecast)
+
+
+def plan_editor(key, plan):
+    # One meal type (or none) per weekday; returns {weekday: meal type}
+    choices = [None] + list(meal_plans.MEAL_TYPES)
+    columns = st.columns(len(meal_plans.WEEKDAYS))
+    edited = {}
+    for column, weekday in zip(columns, meal_plans.WEEKDAYS):
+        with column:
+            edited[weekday] = st.selectbox(
+                weekday[:3], choices, index=choices.index(plan.get(weekday)),
+                format_func=lambda c: "—" if c is None else c, key=f"{key}_{weekday}"
+            )
+    return edited
+
+
+def render(rerun):
+    # Declare the lookups this page's forms will make, from the widget values
+    # already in session state, so they are fetched together
+    rerun.loader.need_student(st.session_state.get("meal_student_id"))
+    common.student_finder(STUDENT_ID_FIELDS)
+    common.table_view("meals")
+
+    st.markdown("---")
+    st.markdown("### 📝 Meal Preferences")
+
+    with st.expander("📅 Weekly Plan", expanded=True):
+        student_id = st.number_input("Student ID", step=1, min_value=1, key="meal_student_id")
+        if not rerun.student_exists(student_id):
+            st.info(f"Student ID {student_id} does not exist yet")
+        else:
+            # The saved week, re-read whenever the plan's rows change
+            current = cache.cached(("meals",), ("plan", student_id), lambda: meal_plans.student_plan(student_id))
+            plan = plan_editor(f"meal_plan_{student_id}", current)
+            if st.button("Save Weekly Plan", key="meal_save_plan"):
+                writes.submit(
+                    partial(meal_plans.save_plan, student_id=student_id, plan=plan),
+                    success=f"✅ Weekly meal plan saved for Student ID {student_id}!",
+                    describe_error=lambda err: f"❌ Error saving plan: {err}",
+                    invalidates=("meals",)
+                )
+
+    with st.expander("👥 Bulk Plan Assignment", expanded=False):
+        target = st.radio("Assign to", ["Building", "Rooms"], horizontal=True, key="meal_bulk_target")
+        bulk_building, bulk_rooms = None, []
+        if target == "Building":
+            bulk_building = common.building_picker("meal_bulk_building", allow_any=False)
+        else:
+            room_text = st.text_input("Room IDs (comma separated)", key="meal_bulk_rooms")
+            bulk_rooms = [int(r) for r in room_text.replace(" ", "").split(",") if r.isdigit()]
+        bulk_plan = plan_editor("meal_bulk_plan", {})
+        st.caption("Replaces the whole week of every student in the selection; days left empty are cleared.")
+        if st.button("Assign Plan", key="meal_bulk_assign"):
+            if bulk_building is None and not bulk_rooms:
+                st.warning("⚠️ Pick a building or enter at least one room ID")
+            else:
+                writes.submit(
+                    partial(meal_plans.assign_plan, plan=bulk_plan, building_id=bulk_building, room_ids=bulk_rooms),
+                    success=lambda students: f"✅ Weekly plan assigned to {students} students",
+                    describe_error=lambda err: f"❌ Error assigning plan: {err}",
+                    invalidates=("meals",)
+                )
+
+    st.markdown("### 🍳 Kitchen Forecast")
+    forecast = pd.DataFrame(
+        get_meal_forecast(), columns=["building_id", "weekday", "meal_type", "meals"]
+    )
+    if forecast.empty:
+        st.info("No meal plans recorded yet")
+    else:
+        forecast_building = common.building_picker(
+            "meal_forecast_building", any_label="All buildings",
+            options=sorted(forecast["building_id"].unique().tolist())
+        )
+        if forecast_building is not None:
+            forecast = forecast[forecast["building_id"] == forecast_building]
+        # At most buildings x 14 rows; the pivot is just for display
+        table = forecast.pivot_table(
+            index="weekday", columns="meal_type", values="meals", aggfunc="sum", fill_value=0
+        ).reindex(index=meal_plans.WEEKDAYS, columns=meal_plans.MEAL_TYPES, fill_value=0)
+        table["Total"] = table.sum(axis=1)
+        st.dataframe(table)
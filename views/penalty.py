@@ -0,0 +1,124 @@
+from functools import partial
+
+import pandas as pd
+import streamlit as st
+
+import cache
+import db
+import penalties
+import writes
+from views import common
+
+# ---------------------- Penalty Page ----------------------
+# Penalty points: per-student adjustments, bulk adjustments and the ledger check
+
+# Student ID inputs the student finder fills in
+STUDENT_ID_FIELDS = ("penalty_sid",)
+
+
+def render(rerun):
+    common.student_finder(STUDENT_ID_FIELDS)
+    common.table_view("penalty")
+
+    st.markdown("---")
+    st.markdown("### ✏️ Penalty Points")
+    actor = st.text_input("Recorded by", key="penalty_actor")
+    pid = st.number_input("Student ID", step=1, min_value=1, key="penalty_sid")
+
+    penalty = cache.cached(("penalty",), ("penalty_record", pid), lambda: penalties.record(pid))
+    if penalty is None:
+        st.warning(f"⚠️ No penalty record found for Student ID: {pid}")
+    else:
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Total Points", penalty["total_points"])
+        with col2:
+            st.metric("Last Updated", str(penalty["last_updated"]))
+
+        col1, col2 = st.columns([1, 3])
+        with col1:
+            delta = st.number_input("Points (+/−)", step=1, value=1, key="penalty_delta")
+        with col2:
+            reason = st.text_input("Reason", key="penalty_reason")
+        if st.button("Apply", type="primary", key="penalty_apply"):
+            if not reason:
+                st.error("❌ A reason is required")
+            elif not delta:
+                st.warning("⚠️ Enter a non-zero number of points")
+            else:
+                writes.submit(
+                    partial(penalties.adjust, delta=delta, reason=reason, actor=actor or None,
+                            updated=rerun.now, student_ids=[pid]),
+                    success="✅ Penalty points updated successfully!",
+                    describe_error=lambda err: f"❌ Error updating penalty: {err}",
+                    invalidates=("penalty",)
+                )
+
+        with st.expander("🧾 History", expanded=False):
+            events = cache.cached(("penalty",), ("penalty_history", pid), lambda: penalties.history(pid))
+            if events:
+                st.dataframe(pd.DataFrame(events), hide_index=True)
+            else:
+                st.info("No penalty events recorded")
+
+    st.markdown("---")
+    st.markdown("### 👥 Bulk Adjustment")
+    with st.expander("Apply points to a group of students", expanded=False):
+        target = st.radio("Students", ["By ID", "By building / floor", "By room"], horizontal=True,
+                          key="penalty_bulk_target")
+        selection = {}
+        if target == "By ID":
+            id_text = st.text_area("Student IDs (comma or line separated)", key="penalty_bulk_ids")
+            selection["student_ids"] = [int(i) for i in id_text.replace(",", " ").split() if i.isdigit()]
+        elif target == "By building / floor":
+            col1, col2 = st.columns(2)
+            with col1:
+                selection["building_id"] = common.building_picker("penalty_bulk_building")
+            with col2:
+                selection["floor"] = st.number_input("Floor (0 = any)", step=1, min_value=0, format="%d",
+                                                     key="penalty_bulk_floor") or None
+        else:
+            room_text = st.text_input("Room IDs (comma separated)", key="penalty_bulk_rooms")
+            selection["room_ids"] = [int(r) for r in room_text.replace(" ", "").split(",") if r.isdigit()]
+
+        col1, col2 = st.columns([1, 3])
+        with col1:
+            bulk_delta = st.number_input("Points (+/−)", step=1, value=1, key="penalty_bulk_delta")
+        with col2:
+            bulk_reason = st.text_input("Reason", key="penalty_bulk_reason")
+        if st.button("Apply to Group", key="penalty_bulk_apply"):
+            if not any(v for v in selection.values()):
+                st.warning("⚠️ Pick the students to adjust")
+            elif not bulk_reason:
+                st.error("❌ A reason is required")
+            elif not bulk_delta:
+                st.warning("⚠️ Enter a non-zero number of points")
+            else:
+                writes.submit(
+                    partial(penalties.adjust, delta=bulk_delta, reason=bulk_reason, actor=actor or None,
+                            updated=rerun.now, **selection),
+                    success=lambda students: f"✅ Adjusted penalty points for {students} students",
+                    describe_error=lambda err: f"❌ Error adjusting penalties: {err}",
+                    invalidates=("penalty",)
+                )
+
+    with st.expander("🔍 Ledger Check", expanded=False):
+        st.caption("Compares every total with the sum of its ledger events.")
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("Verify Ledger", key="penalty_verify"):
+                with db.cursor() as cursor:
+                    drifted = penalties.verify(cursor)
+                if drifted:
+                    st.error(f"❌ {len(drifted)} totals disagree with the ledger")
+                    st.dataframe(pd.DataFrame(drifted), hide_index=True)
+                else:
+                    st.success("✅ Every total matches its ledger")
+        with col2:
+            if st.button("Repair Totals", key="penalty_repair"):
+                writes.submit(
+                    penalties.repair,
+                    success=lambda repaired: f"✅ Repaired {repaired} totals from the ledger",
+                    describe_error=lambda err: f"❌ Error repairing totals: {err}",
+                    invalidates=("penalty",)
+                )
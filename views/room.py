@@ -0,0 +1,54 @@
+from functools import partial
+
+import streamlit as st
+
+import db
+import occupancy
+import repository
+import rollups
+import writes
+from views import common
+
+# ---------------------- Room Page ----------------------
+# Add rooms and reconcile occupancy
+
+
+def render(rerun):
+    common.table_view("room")
+
+    st.markdown("---")
+    st.markdown("### ➕ Add New Room")
+    with st.expander("➕ Add Room", expanded=True):
+        col1, col2 = st.columns(2)
+        with col1:
+            room_id = st.number_input("Room ID", step=1, min_value=1)
+            floor = st.number_input("Floor", step=1, min_value=1)
+        with col2:
+            building_id = st.number_input("Building ID", step=1, min_value=1)
+            capacity = st.number_input("Capacity", step=1, min_value=1)
+
+        if st.button("Add Room"):
+            def describe_room_error(err, room_id=room_id, building_id=building_id):
+                if db.is_duplicate(err):
+                    return f"❌ Room ID {room_id} already exists!"
+                elif db.is_missing_reference(err):
+                    return f"❌ Building ID {building_id} does not exist!"
+                return f"❌ Error: {err}"
+
+            writes.submit(
+                partial(repository.insert_room, room_id=room_id, floor=floor, building_id=building_id, capacity=capacity),
+                success="✅ Room added successfully!",
+                describe_error=describe_room_error,
+                invalidates=("room",)
+            )
+
+    st.markdown("---")
+    st.markdown("### 🔄 Reconcile Occupancy")
+    st.caption("Recounts the students in every room and fixes any drifted occupancy figures.")
+    if st.button("Reconcile All Rooms", key="reconcile_rooms"):
+        writes.submit(
+            occupancy.reconcile_rooms,
+            success=lambda fixed: f"✅ Occupancy reconciled, {fixed} room(s) corrected",
+            describe_error=lambda err: f"❌ Error reconciling occupancy: {err}",
+            invalidates=rollups.SOURCE_TABLES
+        )
@@ -0,0 +1,249 @@
+from functools import partial
+
+import pandas as pd
+import streamlit as st
+
+import allocator
+import bulk_import
+import checkout
+import db
+import meal_plans
+import occupancy
+import repository
+import writes
+from views import common
+
+# ---------------------- Student Page ----------------------
+# Delete, move and add students, and bulk import from CSV / Excel
+
+# Student ID inputs the student finder fills in
+STUDENT_ID_FIELDS = ("delete_id", "move_sid")
+
+
+def describe_add_student_error(err, room_id, alternatives=()):
+    if isinstance(err, occupancy.RoomFullError):
+        if alternatives:
+            return f"❌ Room {room_id} and the rooms listed after it filled up meanwhile, please pick another room"
+        return f"❌ Room {room_id} filled up meanwhile, please pick another room"
+    if isinstance(err, db.IntegrityError) and db.is_duplicate(err):
+        if "contact" in str(err):
+            return "❌ This contact number is already registered!"
+        return "❌ Student ID already exists!"
+    return f"❌ Database error: {err}"
+
+
+def render(rerun):
+    # Declare the lookups this page's forms will make, from the widget values
+    # already in session state, so they are fetched together
+    rerun.loader.need_room_count()
+    rerun.loader.need_student(st.session_state.get("delete_id"))
+    rerun.loader.need_student(st.session_state.get("add_sid"))
+    rerun.loader.need_contact(st.session_state.get("add_contact"))
+    common.student_finder(STUDENT_ID_FIELDS)
+    common.table_view("student")
+
+    st.markdown("---")
+    st.markdown("### 🔥 Delete Student")
+    delete_id = st.number_input("Enter Student ID to Delete", step=1, min_value=1, format="%d", key="delete_id")
+
+    if st.button("Delete Student", type="secondary"):
+        if delete_id:
+            if rerun.student_exists(delete_id):
+                writes.submit(
+                    partial(repository.delete_student, student_id=delete_id),
+                    success=f"✅ Student ID {delete_id} deleted successfully!",
+                    describe_error=lambda err: f"❌ Error deleting: {err}",
+                    invalidates=("meals", "health_issues", "penalty", "student", "room")
+                )
+            else:
+                st.warning(f"⚠️ Student ID {delete_id} not found")
+
+    st.markdown("---")
+    st.markdown("### 🔀 Move Student")
+    col1, col2 = st.columns(2)
+    with col1:
+        move_id = st.number_input("Student ID", step=1, min_value=1, format="%d", key="move_sid")
+    with col2:
+        move_room = st.number_input("New Room ID", step=1, min_value=1, format="%d", key="move_room")
+
+    if st.button("Move Student", key="move_student_btn"):
+        writes.submit(
+            partial(occupancy.move_student, student_id=move_id, new_room_id=move_room),
+            success=lambda moved_from, sid=move_id, room=move_room: f"✅ Student ID {sid} moved from room {moved_from} to room {room}",
+            describe_error=lambda err: f"❌ {err}" if isinstance(err, (LookupError, occupancy.RoomFullError)) else f"❌ Error moving student: {err}",
+            invalidates=("student", "room")
+        )
+
+    st.markdown("---")
+
+    # Add student
+    st.markdown("### ✨ Add Student")
+    with st.expander("➕ Add New Student", expanded=False):
+        room_count = rerun.room_count()
+
+        if room_count == 0:
+            st.error("❌ No rooms available! Please add rooms to the 'room' table first.")
+        else:
+            sid = st.number_input("Student ID", step=1, min_value=1, format="%d", key="add_sid")
+            name = st.text_input("Student Name", key="add_name")
+            contact = st.text_input("Contact Number (11 digits)", key="add_contact", max_chars=11)
+
+            if contact and len(contact) == 11:
+                if rerun.contact_exists(contact):
+                    st.error("❌ This contact number is already registered!")
+                else:
+                    st.success("✓ Contact number is available")
+            elif contact:
+                st.warning("Contact number must be 11 digits")
+
+            col1, col2 = st.columns(2)
+            with col1:
+                pref_building = common.building_picker("add_pref_building", label="Preferred Building")
+            with col2:
+                pref_floor = st.number_input("Preferred Floor (0 = any)", step=1, min_value=0, format="%d", key="add_pref_floor")
+
+            available_rooms = allocator.get_allocator().candidates(pref_building, pref_floor or None)
+
+            if not available_rooms:
+                st.error("❌ No rooms with available space! All rooms are full.")
+            else:
+                # Best matches for the preferences first; fully booked rooms are never listed
+                room_display = [
+                    f"Room {r['id']} (Building {r['building_id']}, Floor {r['floor']}, Free: {r['free']} slots)"
+                    for r in available_rooms
+                ]
+                room_choice = st.selectbox("Select Room", room_display)
+                selected_index = room_display.index(room_choice)
+                selected_room = available_rooms[selected_index]
+                room_id = selected_room['id']
+                # Another clerk may fill the room between this rerun and the save
+                fallback = st.checkbox("If this room fills up first, use the next listed room", value=True,
+                                       key="add_room_fallback")
+                alternatives = [r["id"] for r in available_rooms[selected_index + 1:]] if fallback else []
+
+                col1, col2 = st.columns(2)
+                with col1:
+                    meal_type = st.selectbox("Meal Type", meal_plans.MEAL_TYPES)
+                    meal_days = st.multiselect("Meal Days", meal_plans.WEEKDAYS, default=meal_plans.WEEKDAYS)
+                    graduation_year = st.number_input("Graduation Year (0 = not set)", step=1, min_value=0,
+                                                      format="%d", key="add_graduation_year")
+                with col2:
+                    health_desc = st.text_area("Health Description (Optional)")
+                    prescription = st.text_input("Prescription (Optional)")
+                    guardian_contact = st.text_input("Guardian Contact (11 digits, required if health issues)", max_chars=11, key="guardian")
+
+                if st.button("Add Student", type="primary", key="add_student_btn"):
+                    errors = []
+                    if not sid:
+                        errors.append("Student ID is required")
+                    elif rerun.student_exists(sid):
+                        errors.append(f"Student ID {sid} already exists")
+
+                    if not name:
+                        errors.append("Student Name is required")
+
+                    if not contact:
+                        errors.append("Contact Number is required")
+                    elif len(contact) != 11:
+                        errors.append("Contact number must be exactly 11 digits")
+                    elif rerun.contact_exists(contact):
+                        errors.append("This contact number is already registered")
+
+                    if health_desc or prescription or guardian_contact:
+                        if not guardian_contact:
+                            errors.append("Guardian Contact is required when adding health issues")
+                        elif len(guardian_contact) != 11:
+                            errors.append("Guardian contact must be exactly 11 digits")
+
+                    if errors:
+                        for error in errors:
+                            st.error(f"❌ {error}")
+                    else:
+                        writes.submit(
+                            partial(repository.insert_student, sid=sid, name=name, contact=contact, room_id=room_id,
+                                    meal_plan=dict.fromkeys(meal_days, meal_type), health_desc=health_desc,
+                                    prescription=prescription, guardian_contact=guardian_contact, created=rerun.now,
+                                    alternatives=alternatives, graduation_year=graduation_year or None),
+                            success=lambda placed, name=name, sid=sid: f"✅ Student {name} (ID: {sid}) added to room {placed}!",
+                            describe_error=partial(describe_add_student_error, room_id=room_id, alternatives=alternatives),
+                            invalidates=("student", "meals", "penalty", "health_issues", "room")
+                        )
+
+    st.markdown("---")
+    st.markdown("### 📥 Bulk Import Students")
+    with st.expander("📄 Import from CSV / Excel", expanded=False):
+        st.caption(
+            "Columns: id, student_Name, contact, and optionally room_id, meal_type, weekday, "
+            "description, prescription, guardian_contact, graduation_year. Students without a room_id are "
+            "placed in the first rooms with free space."
+        )
+        upload = st.file_uploader("Student file", type=["csv", "xlsx"], key="import_file")
+        chunk_size = st.number_input("Rows per transaction", step=100, min_value=100,
+                                     value=bulk_import.DEFAULT_CHUNK_SIZE, key="import_chunk")
+
+        if upload is not None and st.button("Import Students", type="primary", key="import_btn"):
+            try:
+                import_df = bulk_import.read_file(upload)
+            except (ValueError, ImportError) as err:
+                st.error(f"❌ Could not read file: {err}")
+            else:
+                bar = st.progress(0.0, text="Validating...")
+                imported, import_errors = bulk_import.import_students(
+                    import_df, chunk_size=int(chunk_size),
+                    progress=lambda done, total: bar.progress(done / total, text=f"Imported {done:,} of {total:,} rows")
+                )
+                bar.progress(1.0, text="Done")
+                if imported:
+                    st.success(f"✅ Imported {imported:,} of {len(import_df):,} students")
+                if import_errors:
+                    st.error(f"❌ {len(import_errors):,} problem(s) found")
+                    st.dataframe(pd.DataFrame(import_errors, columns=["line", "error"]))
+
+    st.markdown("---")
+    st.markdown("### 🎓 Bulk Checkout")
+    with st.expander("📤 Check Out Students", expanded=False):
+        st.caption(
+            "Removes the students with their meals, health records and penalty history, "
+            "a few hundred per transaction. Archived rows are kept in the *_archive tables."
+        )
+        target = st.radio("Check out", ["Student IDs", "Building", "Graduating"], horizontal=True,
+                          key="checkout_target")
+        try:
+            if target == "Student IDs":
+                id_text = st.text_area("Student IDs (comma, space or newline separated)", key="checkout_ids")
+                ids = [int(i) for i in id_text.replace(",", " ").split()]
+                selected = checkout.select_students(student_ids=ids) if ids else []
+            elif target == "Building":
+                building_id = common.building_picker("checkout_building", allow_any=False)
+                selected = checkout.select_students(building_id=building_id) if building_id is not None else []
+            else:
+                year = st.number_input("Graduating in or before", step=1, min_value=2000, format="%d",
+                                       value=rerun.now.year, key="checkout_year")
+                selected = checkout.select_students(graduating=year)
+        except ValueError:
+            st.error("❌ Student IDs must be whole numbers")
+            selected = []
+        except db.Error as err:
+            st.error(f"❌ Error finding students: {err}")
+            selected = []
+
+        col1, col2 = st.columns(2)
+        with col1:
+            archive = st.checkbox("Archive removed rows first", value=True, key="checkout_archive")
+        with col2:
+            checkout_chunk = st.number_input("Students per transaction", step=100, min_value=100,
+                                             value=checkout.DEFAULT_CHUNK_SIZE, key="checkout_chunk")
+        st.info(f"👥 {len(selected):,} student(s) selected")
+        confirmed = st.checkbox(f"I understand this removes {len(selected):,} student(s)", key="checkout_confirm")
+
+        if st.button("Check Out", type="primary", key="checkout_btn", disabled=not (selected and confirmed)):
+            bar = st.progress(0.0, text="Checking out...")
+            removed, failed = checkout.checkout(
+                selected, archive=archive, chunk_size=int(checkout_chunk), now=rerun.now,
+                progress=lambda done, total: bar.progress(done / total, text=f"Processed {done:,} of {total:,} students")
+            )
+            bar.progress(1.0, text="Done")
+            if removed:
+                st.success(f"✅ Checked out {removed:,} student(s)")
+            for first, last, message in failed:
+                st.error(f"❌ Students {first}–{last} were rolled back: {message}")
@@ -0,0 +1,166 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+import cache
+import db
+import profiling
+
+# ---------------------- Background Write Pipeline ----------------------
+# Writes run on a small shared thread pool instead of the script thread.
+# The page submits a job and carries on rendering; the job runs its work in
+# one transaction, retries transient failures (deadlocks, lock wait
+# timeouts, dropped connections) with exponential backoff, then invalidates
+# the cached tables it touched.  Each session keeps its own jobs in
+# st.session_state and is told about finished ones with a toast on the next
+# rerun, which a polling fragment triggers as soon as a job completes.
+
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_PENDING = 64
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.2   # seconds, doubled on every retry
+
+SESSION_KEY = "pending_writes"
+
+
+class QueueFull(Exception):
+    pass
+
+
+class WritePipeline:
+    def __init__(self, pool, query_cache, workers=DEFAULT_WORKERS, max_pending=DEFAULT_MAX_PENDING,
+                 retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF):
+        # pool and query_cache are resolved on the script thread; worker
+        # threads have no Streamlit context to look them up themselves.
+        self.pool = pool
+        self.query_cache = query_cache
+        self.retries = retries
+        self.backoff = backoff
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dorm-write")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._stats = {"submitted": 0, "succeeded": 0, "failed": 0, "retries": 0, "rejected": 0}
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def _run(self, work, success, describe_error, invalidates, label):
+        with profiling.scope(label), cache.bind(self.query_cache):
+            return self._attempt(work, success, describe_error, invalidates)
+
+    def _attempt(self, work, success, describe_error, invalidates):
+        attempt = 0
+        while True:
+            try:
+                with db.transaction(pool=self.pool) as cursor:
+                    result = work(cursor)
+                break
+            except db.Error as err:
+                # The backend decides what is worth retrying (see backends.py)
+                if self.pool.backend.is_transient(err) and attempt < self.retries:
+                    attempt += 1
+                    self._count("retries")
+                    time.sleep(self.backoff * 2 ** (attempt - 1))
+                    continue
+                self._count("failed")
+                return False, describe_error(err)
+            except Exception as err:
+                # Domain errors raised by the work itself (full room, missing row)
+                self._count("failed")
+                return False, describe_error(err)
+        if invalidates:
+            self.query_cache.invalidate(*invalidates)
+        self._count("succeeded")
+        return True, success(result) if callable(success) else success
+
+    def submit(self, work, success, describe_error, invalidates=()):
+        # work(cursor) runs inside one transaction.  success is a message or
+        # a function of work's return value; describe_error turns an
+        # exception into a message.  Returns a Future of (ok, message).
+        if not self._slots.acquire(blocking=False):
+            self._count("rejected")
+            raise QueueFull(f"{self.max_pending} writes are already pending")
+        self._count("submitted")
+        # Queries are profiled as "<page>:<function>", e.g. "student:insert_student"
+        action = getattr(work, "func", work).__name__
+        label = f"{profiling.current_scope() or 'app'}:{action}"
+        try:
+            future = self._executor.submit(self._run, work, success, describe_error, invalidates, label)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+
+def run_transaction(work, invalidates=(), retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF):
+    # work(cursor) in one transaction on the current pool, on the calling
+    # thread, retried on transient errors the way pipeline jobs are.
+    # For batch jobs (imports, checkouts) that report their own errors.
+    backend = db.current_pool().backend
+    attempt = 0
+    while True:
+        try:
+            with db.transaction(invalidates=invalidates) as cursor:
+                return work(cursor)
+        except db.Error as err:
+            if backend.is_transient(err) and attempt < retries:
+                attempt += 1
+                time.sleep(backoff * 2 ** (attempt - 1))
+                continue
+            raise
+
+
+@st.cache_resource
+def get_pipeline():
+    config = st.secrets.get("writes", {})
+    return WritePipeline(
+        db.current_pool(), cache.current_cache(),
+        workers=int(config.get("workers", DEFAULT_WORKERS)),
+        max_pending=int(config.get("max_pending", DEFAULT_MAX_PENDING)),
+        retries=int(config.get("retries", DEFAULT_RETRIES)),
+        backoff=float(config.get("backoff", DEFAULT_BACKOFF)),
+    )
+
+
+# ---------------------- Session Notifications ----------------------
+def submit(work, success, describe_error, invalidates=()):
+    # Submits from a page and tracks the job for this session.  Returns
+    # False (after showing why) when the queue is full.
+    try:
+        future = get_pipeline().submit(work, success, describe_error, invalidates)
+    except QueueFull:
+        st.error("❌ Too many saves are pending, please try again in a moment")
+        return False
+    st.session_state.setdefault(SESSION_KEY, []).append(future)
+    st.toast("⏳ Saving…")
+    return True
+
+
+def show_notifications():
+    jobs = st.session_state.get(SESSION_KEY, [])
+    for future in [f for f in jobs if f.done()]:
+        _, message = future.result()
+        st.toast(message)
+        jobs.remove(future)
+
+
+@st.fragment(run_every=0.5)
+def _watch_pending():
+    if any(f.done() for f in st.session_state.get(SESSION_KEY, [])):
+        st.rerun()
+
+
+def watch_pending():
+    # Polls only while this session has writes in flight; a finished job
+    # triggers one full rerun that shows its toast and the fresh data.
+    if st.session_state.get(SESSION_KEY):
+        _watch_pending()